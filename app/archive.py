@@ -0,0 +1,422 @@
+# app/archive.py
+"""
+오래된 매치를 시즌별 아카이브 SQLite 파일로 옮긴다 (뜨거운 DB 를 작게 유지).
+
+- 대상: finished_at 이 ARCHIVE_AFTER_DAYS 일(KST 날짜 기준)보다 오래된 매치 + 그 참가자 행
+- 파일: <ARCHIVE_DIR>/bluewar_<season_id>.db  (시즌 구분은 app/seasons.py)
+- 옮기는 방법: 메인 연결에 ATTACH DATABASE 해서 INSERT ... SELECT / DELETE 를 배치(BATCH 판)씩.
+    1) 아카이브 파일에 복사 → 커밋
+    2) 복사된 걸 확인하고 메인에서 합계 반영 + 삭제 → 커밋
+  운영(롤백 저널)에서는 ATTACH 트랜잭션도 원자적이지만 한 번에 하면 그동안 쓰기 잠금이 길어지고,
+  WAL 로 바꾸면 파일 여러 개에 걸친 원자성이 없어지므로 일부러 두 번에 나눈다.
+  중간에 죽어도 다음 실행이 INSERT OR REPLACE 로 다시 복사하고 지우므로 기록이 빠지거나 두 번 세지지 않는다.
+
+집계는 메인 DB 에 그대로 남는다.
+    - 상대 전적 / 일별 롤업 : 원래 매치를 지워도 건드리지 않는다
+    - bluewar_archived_players : 옮긴 매치의 플레이어별 합계 → 프로필이 뜨거운 집계에 더한다
+    - bluewar_player_totals : 전체 기간 랭킹 합계라 옮겨도 그대로 (app/player_totals.py)
+    - bluewar_archives : 시즌별 파일 목록 + match_id 범위 (상세 조회 때 파일 찾기)
+
+목록/검색은 기본으로 뜨거운 DB 만 보고, ?archive=<season_id> 일 때만 그 파일을 읽기 전용으로 연다.
+전체 기록으로 집계를 다시 만들 때는 all_tiers() 안에서 돌린다(메인 + 아카이브를 합친 TEMP VIEW).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import generations, models, seasons
+from app.rollups import KST_OFFSET, kst_today
+
+logger = logging.getLogger("yume.archive")
+
+TABLES = ("bluewar_matches", "bluewar_participants")
+BATCH = 500
+ALIAS = "yume_arch"
+
+# 아카이브 파일 쪽 인덱스 (목록 정렬 / 참가자 수 / 플레이어 검색)
+_ARCHIVE_INDEXES = (
+    ("ix_bluewar_matches_created_id", "bluewar_matches (created_at, id)"),
+    ("ix_bluewar_participants_match", "bluewar_participants (match_id)"),
+    ("ix_bluewar_participants_discord_match", "bluewar_participants (discord_id, match_id)"),
+)
+
+AR = models.BlueWarArchive
+AP = models.BlueWarArchivedPlayer
+
+
+def archive_file(season_id: str) -> str:
+    return f"bluewar_{season_id}.db"
+
+
+def cutoff_utc(after_days: int) -> datetime:
+    """KST 기준 (오늘 - after_days) 0시를 UTC(naive) 로. 이보다 먼저 끝난 매치가 대상."""
+    day = kst_today() - timedelta(days=after_days)
+    return datetime(day.year, day.month, day.day) - KST_OFFSET
+
+
+# ============================
+#   스키마
+# ============================
+
+
+def _columns(conn: Connection, schema: str, table: str) -> List[Tuple[str, str]]:
+    rows = conn.exec_driver_sql(f"PRAGMA {schema}.table_info({table})").fetchall()
+    return [(r[1], r[2]) for r in rows]
+
+
+def _ensure_schema(conn: Connection, alias: str) -> None:
+    """아카이브 파일에 메인과 같은 모양의 테이블을 만든다. 메인에 나중에 추가된 컬럼도 따라 붙인다."""
+    for table in TABLES:
+        have = {name for name, _ in _columns(conn, alias, table)}
+        if not have:
+            ddl = conn.exec_driver_sql(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).scalar()
+            ddl = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {alias}.{table}", ddl.strip(), count=1)
+            conn.exec_driver_sql(ddl)
+            continue
+        for name, type_ in _columns(conn, "main", table):
+            if name not in have:
+                conn.exec_driver_sql(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {type_}")
+    for name, spec in _ARCHIVE_INDEXES:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {alias}.{name} ON {spec}")
+    conn.commit()
+
+
+# ============================
+#   옮긴 매치 합계 (bluewar_archived_players)
+# ============================
+
+_PLAYER_SUMS_SQL = """
+INSERT INTO bluewar_archived_players
+    (discord_id, mode, matches, wins, losses, gap_sum, gap_count, rounds_sum, rounds_count,
+     ranked_wins, ranked_losses, gap_plus, gap_minus)
+SELECT p.discord_id, m.mode,
+       COUNT(DISTINCT m.id),
+       SUM(CASE WHEN m.winner_discord_id = p.discord_id THEN 1 ELSE 0 END),
+       SUM(CASE WHEN m.loser_discord_id = p.discord_id THEN 1 ELSE 0 END),
+       COALESCE(SUM(m.win_gap), 0), COUNT(m.win_gap),
+       COALESCE(SUM(m.total_rounds), 0), COUNT(m.total_rounds),
+       0, 0, 0, 0
+FROM {p} p JOIN {m} m ON m.id = p.match_id
+WHERE p.discord_id IS NOT NULL AND p.discord_id != '' AND {where}
+GROUP BY p.discord_id, m.mode
+ON CONFLICT(discord_id, mode) DO UPDATE SET
+    matches = matches + excluded.matches,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    gap_sum = gap_sum + excluded.gap_sum,
+    gap_count = gap_count + excluded.gap_count,
+    rounds_sum = rounds_sum + excluded.rounds_sum,
+    rounds_count = rounds_count + excluded.rounds_count
+"""
+
+# 랭킹 기준: 승자·패자가 모두 있는 매치 (ranking_page 와 같은 규칙)
+_RANKED_SQL = """
+INSERT INTO bluewar_archived_players
+    (discord_id, mode, matches, wins, losses, gap_sum, gap_count, rounds_sum, rounds_count,
+     ranked_wins, ranked_losses, gap_plus, gap_minus)
+SELECT {who}, m.mode, 0, 0, 0, 0, 0, 0, 0, {w}, {l}, {gp}, {gm}
+FROM {m} m
+WHERE m.winner_discord_id IS NOT NULL AND m.loser_discord_id IS NOT NULL AND {where}
+GROUP BY {who}, m.mode
+ON CONFLICT(discord_id, mode) DO UPDATE SET
+    ranked_wins = ranked_wins + excluded.ranked_wins,
+    ranked_losses = ranked_losses + excluded.ranked_losses,
+    gap_plus = gap_plus + excluded.gap_plus,
+    gap_minus = gap_minus + excluded.gap_minus
+"""
+
+
+def _add_player_sums(conn: Connection, *, m: str, p: str, where: str, params: Sequence = ()) -> None:
+    conn.exec_driver_sql(_PLAYER_SUMS_SQL.format(m=m, p=p, where=where), tuple(params))
+    gap = "SUM(COALESCE(m.win_gap, 0))"
+    conn.exec_driver_sql(
+        _RANKED_SQL.format(who="m.winner_discord_id", w="COUNT(*)", l="0", gp=gap, gm="0", m=m, where=where),
+        tuple(params),
+    )
+    conn.exec_driver_sql(
+        _RANKED_SQL.format(who="m.loser_discord_id", w="0", l="COUNT(*)", gp="0", gm=gap, m=m, where=where),
+        tuple(params),
+    )
+    # 표시 이름: 참가자 행의 마지막 이름
+    names = conn.exec_driver_sql(
+        f"SELECT p.discord_id, p.name FROM {p} p JOIN {m} m ON m.id = p.match_id "
+        f"WHERE p.discord_id IS NOT NULL AND p.name IS NOT NULL AND {where} ORDER BY p.id",
+        tuple(params),
+    ).fetchall()
+    latest: Dict[str, str] = {did: name for did, name in names}
+    if latest:
+        conn.exec_driver_sql(
+            "UPDATE bluewar_archived_players SET last_name = ? WHERE discord_id = ?",
+            [(name, did) for did, name in latest.items()],
+        )
+
+
+# ============================
+#   옮기기
+# ============================
+
+
+def pending(conn: Connection, cutoff: datetime, defined: List[seasons.Season]) -> Dict[str, List[int]]:
+    """옮길 매치 id 를 시즌별로 (id 오름차순)."""
+    rows = conn.exec_driver_sql(
+        "SELECT id, date(finished_at, '+9 hours') FROM bluewar_matches "
+        "WHERE finished_at < ? ORDER BY id",
+        (cutoff.strftime("%Y-%m-%d %H:%M:%S.%f"),),
+    ).fetchall()
+    out: Dict[str, List[int]] = {}
+    cache: Dict[str, str] = {}
+    for mid, day in rows:
+        sid = cache.get(day)
+        if sid is None:
+            sid = seasons.season_for(datetime.strptime(day, "%Y-%m-%d").date(), defined).id
+            cache[day] = sid
+        out.setdefault(sid, []).append(int(mid))
+    return out
+
+
+def _move_batch(conn: Connection, season_id: str, file: str, ids: List[int]) -> int:
+    marks = ",".join("?" * len(ids))
+    ids_t = tuple(ids)
+
+    # 1) 아카이브 파일로 복사 (메인은 읽기만)
+    for table, key in (("bluewar_matches", "id"), ("bluewar_participants", "match_id")):
+        cols = ", ".join(name for name, _ in _columns(conn, "main", table))
+        conn.exec_driver_sql(
+            f"INSERT OR REPLACE INTO {ALIAS}.{table} ({cols}) "
+            f"SELECT {cols} FROM main.{table} WHERE {key} IN ({marks})",
+            ids_t,
+        )
+    conn.commit()
+
+    # 2) 복사된 것만 메인에서 합계 반영 + 삭제
+    copied = [
+        r[0]
+        for r in conn.exec_driver_sql(
+            f"SELECT a.id FROM {ALIAS}.bluewar_matches a JOIN main.bluewar_matches m ON m.id = a.id "
+            f"WHERE a.id IN ({marks})",
+            ids_t,
+        ).fetchall()
+    ]
+    if not copied:
+        return 0
+    marks = ",".join("?" * len(copied))
+    ids_t = tuple(copied)
+    _add_player_sums(
+        conn, m="main.bluewar_matches", p="main.bluewar_participants", where=f"m.id IN ({marks})", params=ids_t
+    )
+    n_parts = conn.exec_driver_sql(
+        f"DELETE FROM main.bluewar_participants WHERE match_id IN ({marks})", ids_t
+    ).rowcount
+    conn.exec_driver_sql(f"DELETE FROM main.bluewar_matches WHERE id IN ({marks})", ids_t)
+    conn.exec_driver_sql(
+        "INSERT INTO bluewar_archives "
+        "(season_id, file, matches, participants, min_match_id, max_match_id, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(season_id) DO UPDATE SET "
+        "matches = matches + excluded.matches, participants = participants + excluded.participants, "
+        "min_match_id = min(COALESCE(min_match_id, excluded.min_match_id), excluded.min_match_id), "
+        "max_match_id = max(COALESCE(max_match_id, excluded.max_match_id), excluded.max_match_id), "
+        "updated_at = excluded.updated_at",
+        (season_id, file, len(copied), int(n_parts or 0), min(copied), max(copied),
+         datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")),
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO app_meta (key, value, updated_at) VALUES (?, '1', ?) "
+        "ON CONFLICT(key) DO UPDATE SET "
+        "value = CAST(COALESCE(app_meta.value, '0') AS INTEGER) + 1, updated_at = excluded.updated_at",
+        (generations.KEY_PREFIX + generations.MATCHES, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")),
+    )
+    conn.commit()
+    return len(copied)
+
+
+def archive_old(
+    engine: Engine,
+    archive_dir: str,
+    *,
+    after_days: int,
+    batch: int = BATCH,
+    on_batch: Optional[Callable[[], None]] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    after_days 보다 오래된 매치를 시즌 파일로 옮긴다. {season_id: 옮긴 매치 수}.
+    on_batch 는 배치 사이마다 부른다(정비 스케줄러의 트래픽 양보).
+    """
+    if after_days <= 0:
+        return {}
+    cutoff = cutoff_utc(after_days)
+    moved: Dict[str, int] = {}
+    with engine.connect() as conn:
+        defined = seasons.parse(
+            conn.exec_driver_sql("SELECT value FROM app_meta WHERE key = ?", (seasons.META_KEY,)).scalar()
+        )
+        todo = pending(conn, cutoff, defined)
+        conn.rollback()
+        if dry_run:
+            return {sid: len(ids) for sid, ids in todo.items()}
+        if todo:
+            os.makedirs(archive_dir, exist_ok=True)
+        for sid, ids in sorted(todo.items()):
+            file = archive_file(sid)
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ALIAS}", (os.path.join(archive_dir, file),))
+            try:
+                _ensure_schema(conn, ALIAS)
+                for i in range(0, len(ids), batch):
+                    n = _move_batch(conn, sid, file, ids[i:i + batch])
+                    moved[sid] = moved.get(sid, 0) + n
+                    if on_batch is not None:
+                        on_batch()
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {ALIAS}")
+            logger.info("archived %d matches into %s", moved.get(sid, 0), file)
+    return moved
+
+
+# ============================
+#   읽기 (필요할 때만)
+# ============================
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _read_engine(path: str) -> Engine:
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine is None:
+            engine = create_engine(
+                f"sqlite:///file:{path}?mode=ro&uri=true",
+                connect_args={"check_same_thread": False},
+            )
+            _engines[path] = engine
+        return engine
+
+
+def list_archives(db: Session) -> List[models.BlueWarArchive]:
+    """최근 시즌부터."""
+    return db.query(AR).order_by(AR.max_match_id.desc()).all()
+
+
+def get(db: Session, season_id: str) -> Optional[models.BlueWarArchive]:
+    return db.get(AR, season_id) if season_id else None
+
+
+def find_for_match(db: Session, match_id: int) -> List[models.BlueWarArchive]:
+    """match_id 가 들어 있을 수 있는 아카이브들 (범위가 겹칠 수 있어서 여러 개)."""
+    return (
+        db.query(AR)
+        .filter(AR.min_match_id <= match_id, AR.max_match_id >= match_id)
+        .order_by(AR.max_match_id.desc())
+        .all()
+    )
+
+
+@contextmanager
+def open_session(archive_dir: str, archive: models.BlueWarArchive) -> Iterator[Session]:
+    """아카이브 파일 하나를 읽기 전용 세션으로. users 같은 다른 테이블은 없다(메인 세션으로 읽을 것)."""
+    path = os.path.join(archive_dir, archive.file)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    session = sessionmaker(bind=_read_engine(path), autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def all_tiers(engine: Engine, archive_dir: str) -> Iterator[Session]:
+    """
+    bluewar_matches / bluewar_participants 가 메인 + 모든 아카이브를 합친 것으로 보이는 세션.
+    (TEMP VIEW 가 같은 이름의 main 테이블을 가린다.) 집계 rebuild 용.
+
+    ATTACH 와 TEMP VIEW 는 연결에 붙는 상태라서 풀의 연결을 쓰지 않고 전용 연결을 열고,
+    끝나면 그 연결은 버린다(invalidate). 커밋은 with 안에서 끝낼 것.
+    """
+    conn = engine.connect()
+    db: Optional[Session] = None
+    try:
+        files = [r[0] for r in conn.exec_driver_sql("SELECT file FROM bluewar_archives").fetchall()]
+        attached: List[str] = []
+        for file in files:
+            path = os.path.join(archive_dir, file)
+            if not os.path.exists(path):
+                logger.warning("archive file missing: %s", path)
+                continue
+            alias = f"{ALIAS}_{len(attached)}"
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (path,))
+            attached.append(alias)
+        if attached:
+            for table in TABLES:
+                cols = ", ".join(name for name, _ in _columns(conn, "main", table))
+                selects = [f"SELECT {cols} FROM main.{table}"]
+                selects += [f"SELECT {cols} FROM {alias}.{table}" for alias in attached]
+                conn.exec_driver_sql(f"CREATE TEMP VIEW {table} AS " + " UNION ALL ".join(selects))
+        conn.commit()
+        db = Session(bind=conn, autoflush=False)
+        yield db
+    finally:
+        if db is not None:
+            db.close()
+        conn.invalidate()
+        conn.close()
+
+
+def rebuild_players(engine: Engine, archive_dir: str) -> int:
+    """아카이브 파일 전체로 bluewar_archived_players 를 다시 만든다. 행 수를 돌려준다."""
+    with engine.connect() as conn:
+        files = conn.exec_driver_sql("SELECT file FROM bluewar_archives ORDER BY season_id").fetchall()
+        conn.exec_driver_sql("DELETE FROM bluewar_archived_players")
+        for (file,) in files:
+            path = os.path.join(archive_dir, file)
+            if not os.path.exists(path):
+                logger.warning("archive file missing: %s", path)
+                continue
+            conn.commit()
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ALIAS}", (path,))
+            try:
+                _add_player_sums(conn, m=f"{ALIAS}.bluewar_matches", p=f"{ALIAS}.bluewar_participants", where="1")
+                conn.commit()
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {ALIAS}")
+        conn.commit()
+        return int(conn.exec_driver_sql("SELECT COUNT(*) FROM bluewar_archived_players").scalar() or 0)
+
+
+# ============================
+#   프로필 합산용 조회
+# ============================
+
+
+def player_totals(db: Session, discord_id: str) -> Dict[str, models.BlueWarArchivedPlayer]:
+    """mode -> 합계 (PK 앞부분 범위 조회)."""
+    return {r.mode: r for r in db.query(AP).filter(AP.discord_id == discord_id).all()}
+
+
+def players_totals(db: Session, discord_ids: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+    """discord_id -> 모든 모드 합친 (matches, wins, losses). 목록 페이지용 IN 쿼리 1번."""
+    if not discord_ids:
+        return {}
+    rows = (
+        db.query(AP.discord_id, func.sum(AP.matches), func.sum(AP.wins), func.sum(AP.losses))
+        .filter(AP.discord_id.in_(list(discord_ids)))
+        .group_by(AP.discord_id)
+        .all()
+    )
+    return {did: (int(m or 0), int(w or 0), int(l or 0)) for did, m, w, l in rows}
@@ -0,0 +1,194 @@
+# app/assets.py
+"""
+정적 파일(CSS/JS) 파이프라인.
+
+- fingerprint: 파일 내용 해시를 파일명에 붙인 주소를 템플릿에 넣는다.
+    css/base.css  →  /static/css/base.3f2a9c1b7d.css
+  내용이 바뀌면 주소가 바뀌므로, fingerprint 주소는 1년짜리 immutable 캐시로 내보낸다.
+- precompress: .gz (그리고 brotli 모듈이 있으면 .br) 파일을 미리 만들어 두고,
+  Accept-Encoding 에 맞춰 그 파일을 그대로 내보낸다(요청마다 압축하지 않음).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:  # 선택 의존성: 없으면 .gz 만 만든다.
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL = "/static"
+
+# fingerprint / 사전 압축 대상 확장자
+FINGERPRINT_EXTS = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".ico", ".woff2"}
+PRECOMPRESS_EXTS = {".css", ".js", ".svg", ".json", ".txt"}
+
+# 압축 변형 (선호 순서)
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LEN = 10
+
+
+def _is_variant(path: Path) -> bool:
+    return path.suffix in (".gz", ".br")
+
+
+def _fingerprinted_name(rel: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{digest[:HASH_LEN]}{ext}"
+
+
+class AssetManifest:
+    """논리 경로(css/base.css) <-> fingerprint 경로(css/base.<hash>.css) 매핑."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.by_logical: Dict[str, str] = {}
+        self.by_hashed: Dict[str, str] = {}
+
+    def build(self) -> "AssetManifest":
+        by_logical: Dict[str, str] = {}
+        by_hashed: Dict[str, str] = {}
+        if self.directory.is_dir():
+            for path in sorted(self.directory.rglob("*")):
+                if not path.is_file() or _is_variant(path):
+                    continue
+                if path.suffix.lower() not in FINGERPRINT_EXTS:
+                    continue
+                rel = path.relative_to(self.directory).as_posix()
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                hashed = _fingerprinted_name(rel, digest)
+                by_logical[rel] = hashed
+                by_hashed[hashed] = rel
+        self.by_logical = by_logical
+        self.by_hashed = by_hashed
+        return self
+
+    def url(self, logical: str) -> str:
+        logical = logical.lstrip("/")
+        return f"{STATIC_URL}/{self.by_logical.get(logical, logical)}"
+
+    def logical_for(self, path: str) -> Optional[str]:
+        return self.by_hashed.get(path.lstrip("/"))
+
+
+def precompress(directory: Path = STATIC_DIR) -> int:
+    """
+    압축 대상 파일마다 .gz/.br 를 만든다(원본보다 오래된 것만 다시 만든다).
+    만든 파일 수를 돌려준다. 배포 때 scripts/build_static.py 로 돌리고, 앱 시작 때도 한 번 확인한다.
+    """
+    made = 0
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    for path in directory.rglob("*"):
+        if not path.is_file() or _is_variant(path):
+            continue
+        if path.suffix.lower() not in PRECOMPRESS_EXTS:
+            continue
+        src_mtime = path.stat().st_mtime
+        raw: Optional[bytes] = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == "br" and brotli is None:
+                continue
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= src_mtime:
+                continue
+            if raw is None:
+                raw = path.read_bytes()
+            if encoding == "br":
+                data = brotli.compress(raw, quality=11)
+            else:
+                data = gzip.compress(raw, compresslevel=9, mtime=0)
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+            made += 1
+    return made
+
+
+def _accepted_encodings(scope: Scope) -> Dict[str, float]:
+    raw = Headers(scope=scope).get("accept-encoding", "")
+    out: Dict[str, float] = {}
+    for part in raw.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token] = q
+    return out
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    /static 마운트용 StaticFiles.
+
+    - fingerprint 경로로 오면 원본 파일을 찾아서 immutable 캐시 헤더를 붙인다.
+    - .br/.gz 변형이 있으면 Accept-Encoding 에 맞춰 그 파일을 Content-Encoding 과 함께 내보낸다.
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical = self.manifest.logical_for(path)
+        real = logical or path
+
+        response: Optional[Response] = None
+        accepted = _accepted_encodings(scope)
+        for encoding, suffix in ENCODINGS:
+            if accepted.get(encoding, 0.0) <= 0.0:
+                continue
+            full, stat_result = self.lookup_path(real + suffix)
+            if stat_result is None:
+                continue
+            response = await super().get_response(real + suffix, scope)
+            if response.status_code in (200, 304):
+                media_type, _ = mimetypes.guess_type(real)
+                if media_type:
+                    if media_type.startswith("text/"):
+                        media_type += "; charset=utf-8"
+                    response.headers["Content-Type"] = media_type
+                response.headers["Content-Encoding"] = encoding
+                break
+            response = None
+
+        if response is None:
+            response = await super().get_response(real, scope)
+
+        if response.status_code in (200, 304):
+            response.headers["Vary"] = "Accept-Encoding"
+            if logical is not None:
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+# 앱 전역 manifest (템플릿의 asset_url 과 /static 마운트가 같이 쓴다)
+manifest = AssetManifest(STATIC_DIR).build()
+
+
+def asset_url(logical: str) -> str:
+    """템플릿용: {{ asset_url('css/base.css') }} → fingerprint 주소."""
+    return manifest.url(logical)
@@ -0,0 +1,381 @@
+# app/backup.py
+"""
+운영 DB 온라인 백업 / 스냅샷 / 복원.
+
+- 파일 복사(cp) 는 봇이 쓰는 도중이면 깨진 사본이 나올 수 있다.
+  SQLite 온라인 백업 API(sqlite3.Connection.backup)를 pages 단위로 조금씩 돌리고,
+  단계 사이마다 쉬어서 쓰는 쪽이 오래 막히지 않게 한다.
+  (백업 도중 원본이 다른 연결에서 바뀌면 SQLite 가 처음부터 다시 복사한다. 쓰기가 잦아서
+  max_restarts 번 넘게 다시 시작하면 BackupBusy 로 포기하고 나중에 다시 뜬다.
+  운영은 롤백 저널이라 한 번에 복사하면 그동안 읽기 잠금이 쭉 잡혀서 쓰는 쪽이 다 막힌다 - 그래서 안 한다)
+- 복사본은 integrity_check 후 gzip 으로 압축하고, 옆에 sha256sum 형식의 ".sha256" 파일을 둔다.
+- 파일명: yume_admin-20260101-093000.db.gz (UTC). 이름 순서 == 시간 순서.
+- 정리(rotate): 최근 keep_last 개 + 최근 keep_daily 일은 하루 1개씩 남기고 지운다.
+- 복원(restore): 체크섬 → 압축 해제 → integrity_check → 기존 DB 는 *.pre-restore-<시각> 으로
+  옮겨두고 교체. 서비스를 멈춘 상태에서만 할 것.
+- archive_dir 를 주면 시즌 아카이브 파일(archive.py)도 같은 방식으로 <backup_dir>/archive/<파일>.gz 에 뜬다.
+  아카이브는 옮겨 붙기만 하므로 시각별로 쌓지 않고 최신 사본 1개만 두고, 원본이 안 바뀌었으면 건너뛴다.
+
+명령줄은 scripts/backup_db.py, 주기 실행은 maintenance 의 "backup" 작업(YUME_BACKUP_SEC).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+SUFFIX = ".db.gz"
+ARCHIVE_SUBDIR = "archive"
+CHECKSUM_SUFFIX = ".sha256"
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+_CHUNK = 1024 * 1024
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupBusy(BackupError):
+    """원본이 계속 바뀌어서 복사를 못 끝냈다. 조용할 때 다시 돌리면 된다."""
+
+
+@dataclass
+class Snapshot:
+    path: str
+    taken_at: datetime  # UTC
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    @property
+    def checksum_path(self) -> str:
+        return self.path + CHECKSUM_SUFFIX
+
+
+@dataclass
+class BackupResult:
+    snapshot: Snapshot
+    seconds: float
+    steps: int
+    pages: int
+    restarts: int
+    raw_bytes: int
+    sha256: str
+    archives: List[str] = field(default_factory=list)  # 이번에 새로 뜬 아카이브 사본 경로
+
+
+def sqlite_path(url: str) -> Optional[str]:
+    """sqlite:////abs/path.db → /abs/path.db. SQLite 파일 DB 가 아니면 None."""
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        return None
+    path = url[len(prefix):]
+    if not path or path == ":memory:":
+        return None
+    return path
+
+
+def _stem(db_path: str) -> str:
+    base = os.path.basename(db_path)
+    return base[:-3] if base.endswith(".db") else base
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _integrity_ok(path: str) -> bool:
+    con = sqlite3.connect(path)
+    try:
+        return con.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    finally:
+        con.close()
+
+
+def online_copy(
+    src_path: str,
+    dst_path: str,
+    *,
+    pages: int = 256,
+    step_sleep: float = 0.02,
+    on_step: Optional[Callable[[], None]] = None,
+    max_restarts: int = 3,
+) -> Tuple[int, int, int]:
+    """
+    src → dst 온라인 복사. (단계 수, 전체 페이지 수, 다시 시작한 횟수) 를 돌려준다.
+
+    SQLite 는 한 단계(pages 페이지)를 복사하는 동안만 원본에 읽기 잠금을 잡는다.
+    단계 사이에 step_sleep 초 쉬고, on_step 이 있으면 그것도 부른다(트래픽 양보용).
+    max_restarts 번 넘게 처음부터 다시 시작하면 BackupBusy (dst 는 지운다).
+    """
+    steps = 0
+    total = 0
+    restarts = 0
+    last_remaining: Optional[int] = None
+
+    def progress(status: int, remaining: int, count: int) -> None:
+        nonlocal steps, total, restarts, last_remaining
+        steps += 1
+        total = count
+        if last_remaining is not None and remaining > last_remaining:
+            # 남은 페이지가 늘었다 = 원본이 바뀌어서 처음부터 다시
+            restarts += 1
+            if restarts > max_restarts:
+                raise BackupBusy(
+                    f"{src_path} kept changing during backup ({restarts} restarts); retry later"
+                )
+        last_remaining = remaining
+        if remaining > 0:
+            if step_sleep > 0:
+                time.sleep(step_sleep)
+            if on_step is not None:
+                on_step()
+
+    if os.path.exists(dst_path):
+        os.remove(dst_path)
+    src = sqlite3.connect(src_path, timeout=30)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=max(1, int(pages)), progress=progress)
+    except BackupBusy:
+        dst.close()
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        raise
+    finally:
+        dst.close()
+        src.close()
+    return steps, total, restarts
+
+
+def snapshot_name(db_path: str, at: datetime) -> str:
+    return f"{_stem(db_path)}-{at.strftime(STAMP_FORMAT)}{SUFFIX}"
+
+
+def list_snapshots(backup_dir: str, db_path: str) -> List[Snapshot]:
+    """오래된 것부터."""
+    if not os.path.isdir(backup_dir):
+        return []
+    prefix = _stem(db_path) + "-"
+    out: List[Snapshot] = []
+    for name in os.listdir(backup_dir):
+        if not (name.startswith(prefix) and name.endswith(SUFFIX)):
+            continue
+        stamp = name[len(prefix):-len(SUFFIX)]
+        try:
+            taken = datetime.strptime(stamp, STAMP_FORMAT)
+        except ValueError:
+            continue
+        out.append(Snapshot(os.path.join(backup_dir, name), taken))
+    out.sort(key=lambda s: s.taken_at)
+    return out
+
+
+def _gz_copy(
+    src_path: str,
+    final: str,
+    *,
+    pages: int,
+    step_sleep: float,
+    on_step: Optional[Callable[[], None]],
+) -> Tuple[int, int, int, int, str]:
+    """src 를 온라인 복사 → integrity_check → final(.gz) + .sha256. (단계, 페이지, 재시작, 원본 바이트, sha256)"""
+    raw = final[: -len(".gz")] + ".tmp"
+    gz_tmp = final + ".tmp"
+    try:
+        steps, pages_total, restarts = online_copy(
+            src_path, raw, pages=pages, step_sleep=step_sleep, on_step=on_step
+        )
+        if not _integrity_ok(raw):
+            raise BackupError(f"integrity_check failed on copy of {src_path}")
+        raw_bytes = os.path.getsize(raw)
+        with open(raw, "rb") as src, gzip.open(gz_tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+        digest = _sha256(gz_tmp)
+        os.replace(gz_tmp, final)
+        with open(final + CHECKSUM_SUFFIX, "w", encoding="ascii") as f:
+            f.write(f"{digest}  {os.path.basename(final)}\n")
+    finally:
+        for p in (raw, gz_tmp):
+            if os.path.exists(p):
+                os.remove(p)
+    return steps, pages_total, restarts, raw_bytes, digest
+
+
+def _mtime(path: str) -> float:
+    """DB 파일과 -wal 중 늦은 수정 시각 (없으면 0)."""
+    out = 0.0
+    for p in (path, path + "-wal"):
+        if os.path.exists(p):
+            out = max(out, os.path.getmtime(p))
+    return out
+
+
+def snapshot_archives(
+    archive_dir: str,
+    backup_dir: str,
+    *,
+    pages: int = 256,
+    step_sleep: float = 0.02,
+    on_step: Optional[Callable[[], None]] = None,
+) -> List[str]:
+    """archive_dir 의 *.db 를 <backup_dir>/archive/<이름>.gz 로. 사본보다 원본이 새것만 뜬다. 뜬 경로 목록."""
+    if not archive_dir or not os.path.isdir(archive_dir):
+        return []
+    out_dir = os.path.join(backup_dir, ARCHIVE_SUBDIR)
+    done: List[str] = []
+    for name in sorted(os.listdir(archive_dir)):
+        if not name.endswith(".db"):
+            continue
+        src = os.path.join(archive_dir, name)
+        final = os.path.join(out_dir, name + ".gz")
+        if os.path.exists(final) and os.path.getmtime(final) >= _mtime(src):
+            continue
+        os.makedirs(out_dir, exist_ok=True)
+        _gz_copy(src, final, pages=pages, step_sleep=step_sleep, on_step=on_step)
+        done.append(final)
+    return done
+
+
+def create_snapshot(
+    db_path: str,
+    backup_dir: str,
+    *,
+    pages: int = 256,
+    step_sleep: float = 0.02,
+    on_step: Optional[Callable[[], None]] = None,
+    now: Optional[datetime] = None,
+    archive_dir: Optional[str] = None,
+) -> BackupResult:
+    """
+    메인 DB 스냅샷 1개. archive_dir 를 주면 바뀐 아카이브 파일도 뜬다(snapshot_archives).
+    메인을 먼저 뜬다: 그 사이 아카이브로 옮겨진 매치는 양쪽에 다 들어갈 뿐 빠지지는 않는다.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    at = (now or datetime.utcnow()).replace(microsecond=0)
+    final = os.path.join(backup_dir, snapshot_name(db_path, at))
+    if os.path.exists(final):
+        raise BackupError(f"snapshot already exists: {final}")
+
+    t0 = time.perf_counter()
+    steps, pages_total, restarts, raw_bytes, digest = _gz_copy(
+        db_path, final, pages=pages, step_sleep=step_sleep, on_step=on_step
+    )
+    archives = (
+        snapshot_archives(archive_dir, backup_dir, pages=pages, step_sleep=step_sleep, on_step=on_step)
+        if archive_dir
+        else []
+    )
+
+    return BackupResult(
+        snapshot=Snapshot(final, at),
+        seconds=time.perf_counter() - t0,
+        steps=steps,
+        pages=pages_total,
+        restarts=restarts,
+        raw_bytes=raw_bytes,
+        sha256=digest,
+        archives=archives,
+    )
+
+
+def verify(snapshot: Snapshot) -> bool:
+    """.sha256 파일과 실제 해시가 같은지. 체크섬 파일이 없으면 False."""
+    try:
+        with open(snapshot.checksum_path, "r", encoding="ascii") as f:
+            expected = f.read().split()[0].strip().lower()
+    except (OSError, IndexError):
+        return False
+    return _sha256(snapshot.path) == expected
+
+
+def rotate(backup_dir: str, db_path: str, *, keep_last: int = 14, keep_daily: int = 30) -> List[Snapshot]:
+    """지운 스냅샷 목록을 돌려준다. keep_last 가 0 이하면 아무것도 안 지운다."""
+    snaps = list_snapshots(backup_dir, db_path)
+    if keep_last <= 0 or not snaps:
+        return []
+    keep = {s.path for s in snaps[-keep_last:]}
+
+    # 하루 1개(그날 마지막 것)씩, 최근 keep_daily 일치
+    days_seen: List[str] = []
+    for s in reversed(snaps):
+        day = s.taken_at.strftime("%Y-%m-%d")
+        if day in days_seen:
+            continue
+        if len(days_seen) >= keep_daily:
+            break
+        days_seen.append(day)
+        keep.add(s.path)
+
+    removed: List[Snapshot] = []
+    for s in snaps:
+        if s.path in keep:
+            continue
+        os.remove(s.path)
+        if os.path.exists(s.checksum_path):
+            os.remove(s.checksum_path)
+        removed.append(s)
+    return removed
+
+
+def pick(backup_dir: str, db_path: str, *, name: Optional[str] = None, at: Optional[datetime] = None) -> Snapshot:
+    """이름으로, 또는 at(UTC) 시각 이전의 가장 최근 스냅샷. 둘 다 없으면 제일 최근 것."""
+    snaps = list_snapshots(backup_dir, db_path)
+    if name:
+        for s in snaps:
+            if s.name == name or s.path == name:
+                return s
+        raise BackupError(f"no such snapshot: {name}")
+    if at is not None:
+        snaps = [s for s in snaps if s.taken_at <= at]
+    if not snaps:
+        raise BackupError("no snapshot found")
+    return snaps[-1]
+
+
+def restore(snapshot: Snapshot, db_path: str, *, check: bool = True) -> str:
+    """
+    스냅샷으로 db_path 를 교체한다. 기존 DB 를 옮겨둔 경로를 돌려준다(없었으면 "").
+    앱/봇이 DB 를 쓰고 있으면 안 된다(서비스 정지 후에).
+    """
+    if check and not verify(snapshot):
+        raise BackupError(f"checksum mismatch: {snapshot.path}")
+    tmp = db_path + ".restore.tmp"
+    try:
+        with gzip.open(snapshot.path, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+        if not _integrity_ok(tmp):
+            raise BackupError(f"integrity_check failed: {snapshot.path}")
+
+        moved = ""
+        if os.path.exists(db_path):
+            moved = f"{db_path}.pre-restore-{datetime.utcnow().strftime(STAMP_FORMAT)}"
+            os.replace(db_path, moved)
+        # 옛 WAL 이 남아 있으면 새 DB 에 잘못 적용된다. 옮긴 DB 와 짝으로 같이 옮겨둔다.
+        for suffix in ("-wal", "-shm", "-journal"):
+            if os.path.exists(db_path + suffix):
+                if moved:
+                    os.replace(db_path + suffix, moved + suffix)
+                else:
+                    os.remove(db_path + suffix)
+        os.replace(tmp, db_path)
+        return moved
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
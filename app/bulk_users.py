@@ -0,0 +1,193 @@
+# app/bulk_users.py
+"""
+유저 기본 전적(base_wins/base_losses) 일괄 수정 (관리자 CSV/TSV 업로드, /users/import).
+
+입력은 한 줄에 한 명:
+
+    discord_id,base_wins,base_losses[,nickname]
+
+- 쉼표 또는 탭 구분(첫 줄에 탭이 있으면 TSV). 첫 줄이 "discord_id" 로 시작하면 머리줄로 보고 건너뛴다.
+- nickname 칸이 비었거나 없으면 기존 닉네임을 그대로 둔다(새 유저면 빈 닉네임).
+- 한 줄이라도 틀리면 아무것도 바꾸지 않는다(parse 가 errors 를 돌려주고 라우터가 미리보기에서 멈춘다).
+
+흐름: parse() → diff() 로 미리보기 → apply() 가 INSERT .. ON CONFLICT(discord_id) DO UPDATE 한 문장을
+executemany 로 한 트랜잭션에 넣고, gen:users 는 마지막에 한 번만 올린다(랭킹 캐시/ETag 가 한 번만 무효화).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import generations, models, player_totals
+
+MAX_ROWS = 5000
+MAX_BASE = 1_000_000
+DISCORD_ID_MAX = 32   # users.discord_id 길이
+NICKNAME_MAX = 100    # users.nickname 길이
+CHUNK = 500           # IN (...) 한 번에 넣는 개수
+
+
+class ImportRow(NamedTuple):
+    line: int
+    discord_id: str
+    base_wins: int
+    base_losses: int
+    nickname: Optional[str]  # None 이면 그대로 둔다
+
+
+class Change(NamedTuple):
+    row: ImportRow
+    kind: str                 # new | update | same
+    old_wins: Optional[int]
+    old_losses: Optional[int]
+    old_nickname: Optional[str]
+
+    @property
+    def new_nickname(self) -> Optional[str]:
+        return self.row.nickname if self.row.nickname is not None else self.old_nickname
+
+
+def _int(raw: str, label: str) -> Tuple[Optional[int], Optional[str]]:
+    raw = (raw or "").strip()
+    if not raw.isdigit():
+        return None, f"{label} 는 0 이상의 정수여야 해: {raw!r}"
+    value = int(raw)
+    if value > MAX_BASE:
+        return None, f"{label} 가 너무 커: {value}"
+    return value, None
+
+
+def parse(text: str) -> Tuple[List[ImportRow], List[str]]:
+    """(행들, 오류 메시지들). 오류가 하나라도 있으면 적용하지 말 것."""
+    text = (text or "").lstrip("\ufeff")  # 엑셀이 붙이는 BOM
+    lines = text.splitlines()
+    first = next((l for l in lines if l.strip()), "")
+    delimiter = "\t" if "\t" in first else ","
+
+    rows: List[ImportRow] = []
+    errors: List[str] = []
+    seen: Dict[str, int] = {}
+    for line_no, cells in enumerate(csv.reader(io.StringIO(text), delimiter=delimiter), start=1):
+        cells = [c.strip() for c in cells]
+        if not any(cells):
+            continue
+        if not rows and not errors and cells[0].lower() == "discord_id":
+            continue  # 머리줄
+        if len(cells) < 3 or len(cells) > 4:
+            errors.append(f"{line_no}행: 칸이 3~4개여야 해 (discord_id, base_wins, base_losses[, nickname])")
+            continue
+
+        discord_id = cells[0]
+        if not discord_id or len(discord_id) > DISCORD_ID_MAX or any(ch.isspace() for ch in discord_id):
+            errors.append(f"{line_no}행: discord_id 가 이상해: {discord_id!r}")
+            continue
+        if discord_id in seen:
+            errors.append(f"{line_no}행: discord_id {discord_id} 가 {seen[discord_id]}행과 겹쳐")
+            continue
+
+        wins, err_w = _int(cells[1], "base_wins")
+        losses, err_l = _int(cells[2], "base_losses")
+        bad = [e for e in (err_w, err_l) if e]
+        if bad:
+            errors.extend(f"{line_no}행: {e}" for e in bad)
+            continue
+
+        nickname = cells[3] if len(cells) == 4 and cells[3] else None
+        if nickname is not None and len(nickname) > NICKNAME_MAX:
+            errors.append(f"{line_no}행: nickname 은 {NICKNAME_MAX}자까지")
+            continue
+
+        seen[discord_id] = line_no
+        rows.append(ImportRow(line_no, discord_id, wins, losses, nickname))  # type: ignore[arg-type]
+        if len(rows) > MAX_ROWS:
+            errors.append(f"한 번에 {MAX_ROWS}명까지만 올릴 수 있어")
+            break
+
+    if not rows and not errors:
+        errors.append("올린 내용이 비어 있어")
+    return rows, errors
+
+
+def dump(rows: Sequence[ImportRow]) -> str:
+    """검증된 행 → CSV (미리보기 화면이 적용 단계로 넘겨주는 값)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(["discord_id", "base_wins", "base_losses", "nickname"])
+    for r in rows:
+        writer.writerow([r.discord_id, r.base_wins, r.base_losses, r.nickname or ""])
+    return buf.getvalue()
+
+
+def diff(db: Session, rows: Sequence[ImportRow]) -> List[Change]:
+    """지금 DB 값과 비교. users 는 discord_id 유니크 인덱스로 CHUNK 명씩 읽는다."""
+    U = models.User
+    current: Dict[str, Tuple[int, int, Optional[str]]] = {}
+    ids = [r.discord_id for r in rows]
+    for i in range(0, len(ids), CHUNK):
+        for did, wins, losses, nickname in (
+            db.query(U.discord_id, U.base_wins, U.base_losses, U.nickname)
+            .filter(U.discord_id.in_(ids[i:i + CHUNK]))
+            .all()
+        ):
+            current[did] = (int(wins or 0), int(losses or 0), nickname)
+
+    changes: List[Change] = []
+    for r in rows:
+        old = current.get(r.discord_id)
+        if old is None:
+            changes.append(Change(r, "new", None, None, None))
+            continue
+        same = (
+            old[0] == r.base_wins
+            and old[1] == r.base_losses
+            and (r.nickname is None or r.nickname == (old[2] or ""))
+        )
+        changes.append(Change(r, "same" if same else "update", old[0], old[1], old[2]))
+    return changes
+
+
+def apply(db: Session, changes: Sequence[Change]) -> int:
+    """바뀌는 행만 upsert 한 문장(executemany)으로. 커밋까지 한다. 바꾼 행 수."""
+    todo = [c.row for c in changes if c.kind != "same"]
+    if not todo:
+        return 0
+
+    now = datetime.utcnow()
+    U = models.User.__table__
+    stmt = sqlite_insert(U)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["discord_id"],
+        set_={
+            "base_wins": stmt.excluded.base_wins,
+            "base_losses": stmt.excluded.base_losses,
+            # 닉네임 칸이 빈 줄은 기존 닉네임 유지
+            "nickname": func.coalesce(func.nullif(stmt.excluded.nickname, ""), U.c.nickname),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "discord_id": r.discord_id,
+                "nickname": r.nickname if r.nickname is not None else "",
+                "note": "",
+                "base_wins": r.base_wins,
+                "base_losses": r.base_losses,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for r in todo
+        ],
+    )
+    player_totals.sync_base(db, [r.discord_id for r in todo])
+    generations.bump(db, generations.USERS)
+    db.commit()
+    return len(todo)
@@ -0,0 +1,353 @@
+# app/columnar.py
+"""
+매치 핵심 컬럼을 NumPy 배열로 들고 있는 워커 메모리 스냅샷 (즉석 분석용).
+
+- 컬럼: id, mode, status, winner, loser, win_gap, total_rounds, finished_at
+  - 플레이어(discord_id) / mode / status 는 정수 번호로 바꿔서(intern) 저장한다. 없으면 -1.
+  - win_gap / total_rounds 가 NULL 이면 -1.
+  - finished_at 은 UTC epoch 초(int64).
+- 처음 한 번은 아카이브 파일 + 메인 DB 를 다 읽어서 만들고, 그 뒤로는 gen:matches 가 바뀌었을 때
+  last_id 보다 큰 새 매치만 읽어서 이어붙인다(매치는 INSERT 만 되고 아카이브는 옮기기만 하므로).
+  개수가 안 맞으면(복원 등) 처음부터 다시 만든다.
+- 기간/모드 필터는 bool 마스크, 플레이어별 합계는 np.bincount 라서
+  50만 판 기준으로도 몇 ms 안에 끝난다(SQL 스캔이나 파이썬 루프 없이).
+
+numpy 는 선택 의존성이다. 없으면 available() 가 False 이고 snapshot() 은 RuntimeError.
+
+    cols = columnar.snapshot(db)
+    m = cols.mask(mode="pvp", since=datetime.utcnow() - timedelta(days=7))
+    rows = cols.top_players(m, limit=20)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from app import archive, generations
+from app.rollups import KST_OFFSET
+
+try:  # 선택 의존성
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger("yume.columnar")
+
+NULL = -1
+FETCH = 5000
+
+_EPOCH = datetime(1970, 1, 1)
+_KST_SEC = int(KST_OFFSET.total_seconds())
+
+# finished_at 은 SQLite 에 "YYYY-MM-DD HH:MM:SS.ffffff" 문자열로 있다. 파싱은 SQLite 에 맡긴다.
+_SELECT = (
+    "SELECT id, mode, status, winner_discord_id, loser_discord_id, "
+    "COALESCE(win_gap, -1), COALESCE(total_rounds, -1), "
+    "CAST(strftime('%s', finished_at) AS INTEGER) "
+    "FROM bluewar_matches WHERE id > ? AND id <= ? ORDER BY id"
+)
+
+# 한 문장으로 읽어야 아카이브 이동 중간 상태를 보지 않는다.
+_STATE = (
+    "SELECT (SELECT COUNT(*) FROM bluewar_matches), "
+    "(SELECT COALESCE(MAX(id), 0) FROM bluewar_matches), "
+    "(SELECT COALESCE(SUM(matches), 0) FROM bluewar_archives)"
+)
+
+
+def available() -> bool:
+    return np is not None
+
+
+def epoch(dt: datetime) -> int:
+    """naive UTC datetime → epoch 초."""
+    return int((dt.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+
+class Interner:
+    """문자열 ↔ 정수 번호. 번호는 한 번 정해지면 안 바뀐다(스냅샷끼리 공유)."""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def __call__(self, value: Optional[str]) -> int:
+        if not value:
+            return NULL
+        i = self.index.get(value)
+        if i is None:
+            i = len(self.names)
+            self.index[value] = i
+            self.names.append(value)
+        return i
+
+    def get(self, value: str) -> int:
+        return self.index.get(value, NULL)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class MatchColumns:
+    """한 시점의 스냅샷. 만든 뒤로는 바꾸지 않는다(새 매치는 extended() 가 새 객체를 만든다)."""
+
+    COLUMNS = ("id", "mode", "status", "winner", "loser", "win_gap", "total_rounds", "finished_at")
+
+    def __init__(
+        self,
+        arrays: Dict[str, Any],
+        *,
+        players: Interner,
+        modes: Interner,
+        statuses: Interner,
+        generation: Tuple[int, ...],
+        hot_max_id: int,
+    ) -> None:
+        self.id = arrays["id"]
+        self.mode = arrays["mode"]
+        self.status = arrays["status"]
+        self.winner = arrays["winner"]
+        self.loser = arrays["loser"]
+        self.win_gap = arrays["win_gap"]
+        self.total_rounds = arrays["total_rounds"]
+        self.finished_at = arrays["finished_at"]
+        self.players = players
+        self.modes = modes
+        self.statuses = statuses
+        self.generation = generation
+        self.hot_max_id = hot_max_id
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return int(self.id.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, c).nbytes for c in self.COLUMNS)
+
+    def extended(self, arrays: Dict[str, Any], *, generation: Tuple[int, ...], hot_max_id: int) -> "MatchColumns":
+        merged = {c: np.concatenate([getattr(self, c), arrays[c]]) for c in self.COLUMNS}
+        return MatchColumns(
+            merged,
+            players=self.players,
+            modes=self.modes,
+            statuses=self.statuses,
+            generation=generation,
+            hot_max_id=hot_max_id,
+        )
+
+    # ---- 필터 ----
+
+    def mask(
+        self,
+        *,
+        mode: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        """조건에 맞는 매치 bool 배열. since 포함, until 미포함(UTC)."""
+        m = np.ones(len(self), dtype=bool)
+        if mode and mode != "all":
+            m &= self.mode == self.modes.get(mode)
+        if status and status != "all":
+            m &= self.status == self.statuses.get(status)
+        if since is not None:
+            m &= self.finished_at >= epoch(since)
+        if until is not None:
+            m &= self.finished_at < epoch(until)
+        return m
+
+    # ---- 집계 ----
+
+    def player_totals(self, m) -> Dict[str, Any]:
+        """
+        플레이어 번호별 wins / losses / gap_plus / gap_minus (길이 = 플레이어 수).
+        랭킹과 같은 기준: 승자/패자가 둘 다 있는 매치만, NULL 승차는 0.
+        """
+        n = len(self.players)
+        ranked = m & (self.winner >= 0) & (self.loser >= 0)
+        w = self.winner[ranked]
+        lo = self.loser[ranked]
+        g = np.maximum(self.win_gap[ranked], 0)
+        return {
+            "wins": np.bincount(w, minlength=n),
+            "losses": np.bincount(lo, minlength=n),
+            "gap_plus": np.bincount(w, weights=g, minlength=n).astype(np.int64),
+            "gap_minus": np.bincount(lo, weights=g, minlength=n).astype(np.int64),
+        }
+
+    def top_players(self, m, *, limit: int = 20, min_games: int = 1) -> List[Dict[str, Any]]:
+        """랭킹 페이지와 같은 순서(순수 승차 → 승 → 판 수)의 상위 플레이어. 기본 전적(base)은 안 더한다."""
+        t = self.player_totals(m)
+        games = t["wins"] + t["losses"]
+        net = t["gap_plus"] - t["gap_minus"]
+        idx = np.nonzero(games >= max(1, min_games))[0]
+        if idx.size == 0:
+            return []
+        order = np.lexsort((-games[idx], -t["wins"][idx], -net[idx]))[:limit]
+        out: List[Dict[str, Any]] = []
+        for i in idx[order]:
+            out.append(
+                {
+                    "discord_id": self.players.names[i],
+                    "wins": int(t["wins"][i]),
+                    "losses": int(t["losses"][i]),
+                    "win_rate": round(float(t["wins"][i] / games[i]), 4),
+                    "net_gap": int(net[i]),
+                }
+            )
+        return out
+
+    def gap_histogram(self, m) -> Dict[int, int]:
+        g = self.win_gap[m]
+        counts = np.bincount(g[g >= 0])
+        return {int(k): int(v) for k, v in enumerate(counts) if v}
+
+    def daily_counts(self, m) -> Dict[str, int]:
+        """KST 날짜별 매치 수."""
+        days = (self.finished_at[m] + _KST_SEC) // 86400
+        uniq, counts = np.unique(days, return_counts=True)
+        return {
+            datetime.utcfromtimestamp(int(d) * 86400).strftime("%Y-%m-%d"): int(c)
+            for d, c in zip(uniq, counts)
+        }
+
+
+# ============================
+#   읽기 / 갱신
+# ============================
+
+
+def _read_columns(conn, lo: int, hi: int, players: Interner, modes: Interner, statuses: Interner) -> Dict[str, Any]:
+    """raw DBAPI 로 (lo, hi] 범위를 FETCH 행씩 읽어서 배열로."""
+    ids: List[int] = []
+    mode: List[int] = []
+    status: List[int] = []
+    winner: List[int] = []
+    loser: List[int] = []
+    gap: List[int] = []
+    rounds: List[int] = []
+    fin: List[int] = []
+    cur = conn.exec_driver_sql(_SELECT, (lo, hi))
+    while True:
+        batch = cur.fetchmany(FETCH)
+        if not batch:
+            break
+        for r in batch:
+            ids.append(r[0])
+            mode.append(modes(r[1]))
+            status.append(statuses(r[2]))
+            winner.append(players(r[3]))
+            loser.append(players(r[4]))
+            gap.append(r[5])
+            rounds.append(r[6])
+            fin.append(r[7] or 0)
+    return {
+        "id": np.array(ids, dtype=np.int64),
+        "mode": np.array(mode, dtype=np.int16),
+        "status": np.array(status, dtype=np.int16),
+        "winner": np.array(winner, dtype=np.int32),
+        "loser": np.array(loser, dtype=np.int32),
+        "win_gap": np.array(gap, dtype=np.int32),
+        "total_rounds": np.array(rounds, dtype=np.int32),
+        "finished_at": np.array(fin, dtype=np.int64),
+    }
+
+
+def _concat(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = {c: np.concatenate([p[c] for p in parts]) for c in MatchColumns.COLUMNS}
+    order = np.argsort(merged["id"], kind="stable")
+    return {c: a[order] for c, a in merged.items()}
+
+
+def build(db: Session, generation: Tuple[int, ...] = ()) -> MatchColumns:
+    """아카이브 파일 전부 + 메인 DB 로 처음부터 만든다."""
+    t0 = time.perf_counter()
+    players, modes, statuses = Interner(), Interner(), Interner()
+    parts: List[Dict[str, Any]] = []
+    for arch in archive.list_archives(db):
+        try:
+            with archive.open_session(settings.ARCHIVE_DIR, arch) as adb:
+                parts.append(_read_columns(adb.connection(), 0, arch.max_match_id, players, modes, statuses))
+        except FileNotFoundError:
+            logger.error("archive file missing, snapshot will lack season %s", arch.season_id)
+    _count, hot_max, _archived = db.connection().exec_driver_sql(_STATE).one()
+    parts.append(_read_columns(db.connection(), 0, hot_max, players, modes, statuses))
+    cols = MatchColumns(
+        _concat(parts),
+        players=players,
+        modes=modes,
+        statuses=statuses,
+        generation=generation,
+        hot_max_id=hot_max,
+    )
+    logger.info(
+        "columnar snapshot built: %d matches, %d players, %.1fMB, %.2fs",
+        len(cols), len(players), cols.nbytes / 1024 / 1024, time.perf_counter() - t0,
+    )
+    return cols
+
+
+def refresh(db: Session, cols: MatchColumns, generation: Tuple[int, ...]) -> MatchColumns:
+    """새 매치만 이어붙인다. 개수가 안 맞으면 처음부터."""
+    count, hot_max, archived = db.connection().exec_driver_sql(_STATE).one()
+    if hot_max < cols.hot_max_id:
+        logger.warning("bluewar_matches max id went backwards (%d < %d), rebuilding", hot_max, cols.hot_max_id)
+        return build(db, generation)
+    new = _read_columns(db.connection(), cols.hot_max_id, hot_max, cols.players, cols.modes, cols.statuses)
+    if len(cols) + len(new["id"]) != count + archived:
+        logger.warning(
+            "columnar snapshot out of sync (%d + %d != %d + %d), rebuilding",
+            len(cols), len(new["id"]), count, archived,
+        )
+        return build(db, generation)
+    return cols.extended(new, generation=generation, hot_max_id=hot_max)
+
+
+_lock = threading.Lock()
+_current: Optional[MatchColumns] = None
+
+
+def snapshot(db: Session) -> MatchColumns:
+    """
+    최신 스냅샷. gen:matches 가 그대로면 들고 있던 것을 그대로(app_meta PK 조회 1번),
+    바뀌었으면 새 매치만 읽어서 이어붙인 새 스냅샷을 돌려준다. 갱신은 한 스레드만 한다.
+    """
+    global _current
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    gen = generations.stamp(db, (generations.MATCHES,))
+    cols = _current
+    if cols is not None and cols.generation == gen:
+        return cols
+    with _lock:
+        cols = _current
+        if cols is not None and cols.generation == gen:
+            return cols
+        cols = build(db, gen) if cols is None else refresh(db, cols, gen)
+        _current = cols
+        return cols
+
+
+def status() -> Dict[str, Any]:
+    cols = _current
+    if cols is None:
+        return {"available": available(), "built": False}
+    return {
+        "available": True,
+        "built": True,
+        "matches": len(cols),
+        "players": len(cols.players),
+        "bytes": cols.nbytes,
+        "hot_max_id": cols.hot_max_id,
+        "generation": list(cols.generation),
+        "built_at": datetime.utcfromtimestamp(cols.built_at).isoformat(timespec="seconds") + "Z",
+    }
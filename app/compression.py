@@ -0,0 +1,282 @@
+# app/compression.py
+"""
+HTML/JSON 응답 압축 미들웨어 (gzip / brotli).
+
+- 크기 기준(min_size)과 content-type 별 규칙으로 압축 여부를 정한다.
+- StreamingResponse 는 조각마다 flush 하면서 압축하기 때문에 스트리밍이 그대로 유지된다.
+- 라우트(경로 템플릿)별로 원본/압축 바이트 수와 압축에 쓴 CPU 시간을 모아 둔다.
+  → /admin/perf/compression 에서 확인.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.routing import route_label
+
+try:  # 선택 의존성: 없으면 gzip 만 쓴다.
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# 압축 대상 기본 content-type -> 최소 크기(None 이면 전역 min_size 사용)
+DEFAULT_RULES: Dict[str, Optional[int]] = {
+    "text/html": None,
+    "application/json": None,
+    "text/plain": None,
+    "text/css": None,
+    "application/javascript": None,
+    "text/csv": None,
+    "application/x-ndjson": None,
+    "text/event-stream": None,
+}
+
+
+def parse_rules(raw: str) -> Dict[str, Optional[int]]:
+    """
+    "text/html:512,application/json" 형식 → {"text/html": 512, "application/json": None}
+    비어 있으면 DEFAULT_RULES.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return dict(DEFAULT_RULES)
+    out: Dict[str, Optional[int]] = {}
+    for part in raw.split(","):
+        ctype, _, size = part.strip().partition(":")
+        ctype = ctype.strip().lower()
+        if not ctype:
+            continue
+        try:
+            out[ctype] = int(size) if size.strip() else None
+        except ValueError:
+            out[ctype] = None
+    return out
+
+
+class CompressionStats:
+    """라우트별 압축 통계. 응답 1건마다 한 번 잠그는 정도라 부담은 거의 없다."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (route, encoding) -> [responses, bytes_in, bytes_out, cpu_seconds]
+        self._data: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, route: str, encoding: str, bytes_in: int, bytes_out: int, cpu: float) -> None:
+        key = (route, encoding)
+        with self._lock:
+            row = self._data.get(key)
+            if row is None:
+                row = [0, 0, 0, 0.0]
+                self._data[key] = row
+            row[0] += 1
+            row[1] += bytes_in
+            row[2] += bytes_out
+            row[3] += cpu
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._data.items()]
+        out: List[Dict[str, Any]] = []
+        for (route, encoding), (n, b_in, b_out, cpu) in items:
+            out.append(
+                {
+                    "route": route,
+                    "encoding": encoding,
+                    "responses": int(n),
+                    "bytes_in": int(b_in),
+                    "bytes_out": int(b_out),
+                    "bytes_saved": int(b_in - b_out),
+                    "ratio": (b_out / b_in) if b_in else 1.0,
+                    "cpu_ms_total": cpu * 1000.0,
+                    "cpu_ms_per_response": (cpu * 1000.0 / n) if n else 0.0,
+                }
+            )
+        out.sort(key=lambda r: -r["bytes_saved"])
+        return out
+
+
+stats = CompressionStats()
+
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            c = brotli.Compressor(quality=brotli_quality)
+            self._process = getattr(c, "process", None) or c.compress
+            self._flush = c.flush
+            self._finish = c.finish
+        else:
+            c = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._process = c.compress
+            self._flush = lambda: c.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = c.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        """스트리밍 조각: 지금까지 받은 데이터를 바로 내보낼 수 있게 flush 까지 한다."""
+        return self._process(data) + self._flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._process(data) + self._finish()
+
+
+def _pick_encoding(scope: Scope) -> Optional[str]:
+    raw = Headers(scope=scope).get("accept-encoding", "").lower()
+    if not raw:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in raw.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip()] = q
+    if brotli is not None and accepted.get("br", 0.0) > 0.0:
+        return "br"
+    if accepted.get("gzip", 0.0) > 0.0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        rules: Optional[Dict[str, Optional[int]]] = None,
+    ) -> None:
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.rules = dict(DEFAULT_RULES if rules is None else rules)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _pick_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressResponder:
+    def __init__(self, mw: CompressionMiddleware, scope: Scope, send: Send, encoding: str) -> None:
+        self.mw = mw
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.min_size = mw.min_size
+        self.encoder: Optional[_Encoder] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu = 0.0
+
+    def _eligible(self, message: Message) -> bool:
+        status = int(message.get("status", 200))
+        if status < 200 or status in (204, 206, 304):
+            return False
+        headers = Headers(raw=message.get("headers", []))
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        ctype = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if ctype not in self.mw.rules:
+            return False
+        rule = self.mw.rules[ctype]
+        if rule is not None:
+            self.min_size = rule
+        length = headers.get("content-length")
+        if length is not None and length.isdigit() and int(length) < self.min_size:
+            return False
+        return True
+
+    def _start_headers(self, length: Optional[int]) -> Message:
+        assert self.start is not None
+        headers = MutableHeaders(raw=list(self.start.get("headers", [])))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        if length is not None:
+            headers["Content-Length"] = str(length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # 압축하면 바이트가 바뀌므로 강한 ETag 는 약한 ETag 로 바꾼다.
+            headers["ETag"] = "W/" + etag
+        return {**self.start, "headers": headers.raw}
+
+    def _compress(self, fn, data: bytes) -> bytes:
+        t0 = time.thread_time()
+        out = fn(data)
+        self.cpu += time.thread_time() - t0
+        self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    def _record(self) -> None:
+        stats.record(route_label(self.scope), self.encoding, self.bytes_in, self.bytes_out, self.cpu)
+
+    async def send(self, message: Message) -> None:
+        mtype = message["type"]
+        if mtype == "http.response.start":
+            self.start = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self.downstream(message)
+            return
+
+        if mtype != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more = bool(message.get("more_body", False))
+
+        if self.encoder is None:
+            if not more:
+                # 한 번에 끝나는 일반 응답
+                if len(body) < self.min_size:
+                    await self.downstream(self.start)
+                    await self.downstream(message)
+                    return
+                self.encoder = _Encoder(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+                out = self._compress(self.encoder.finish, body)
+                await self.downstream(self._start_headers(len(out)))
+                await self.downstream({"type": "http.response.body", "body": out, "more_body": False})
+                self._record()
+                return
+
+            # 스트리밍 응답: 길이를 모르므로 조각마다 압축+flush
+            self.encoder = _Encoder(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+            await self.downstream(self._start_headers(None))
+
+        if more:
+            out = self._compress(self.encoder.chunk, body)
+            if out:
+                await self.downstream({"type": "http.response.body", "body": out, "more_body": True})
+            return
+
+        out = self._compress(self.encoder.finish, body)
+        await self.downstream({"type": "http.response.body", "body": out, "more_body": False})
+        self._record()
@@ -3,12 +3,14 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from config import settings
+
 # ============================================
 # 1) DB 경로
-#    - /opt/yume-web/yume_admin.db 를 사용하도록 절대 경로로 고정
-#    - 실제 파일명이 다르면 여기만 바꿔주면 됨.
+#    - 기본은 /opt/yume-web/yume_admin.db (운영 절대 경로)
+#    - 벤치마크/부하 테스트용 임시 DB 는 YUME_DATABASE_URL 로 바꿔서 띄운다.
 # ============================================
-SQLALCHEMY_DATABASE_URL = "sqlite:////opt/yume-web/yume_admin.db"
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 # SQLite인 경우 check_same_thread 옵션 필요
 connect_args = {}
@@ -0,0 +1,118 @@
+# app/etag.py
+"""
+목록/랭킹/대시보드용 ETag + 조건부 GET.
+
+검증자(validator)는 무거운 쿼리 결과가 아니라 "데이터 워터마크"로 만든다.
+- bluewar_matches : max(id)   (매치는 추가만 되고 수정되지 않는다)
+- users           : max(id), max(updated_at)   (둘 다 인덱스만 읽는다)
+- app_meta        : gen:users / gen:matches (삭제/일괄 수정/아카이브 이동처럼 위 값으로 안 보이는 변경,
+                    app/generations.py)
+여기에 요청 쿼리스트링, 보는 사람(세션), 템플릿/정적 파일 버전을 섞는다.
+
+라우터에서는 무거운 쿼리 전에:
+
+    etag = page_etag(request, db, "ranking")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    ...
+    return with_etag(templates.TemplateResponse(...), etag)
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.assets import manifest
+
+# 브라우저가 매번 재검증(If-None-Match)하도록 한다. 로그인 사용자별 페이지라 private.
+CACHE_CONTROL = "private, no-cache"
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+def _render_version() -> str:
+    """템플릿/정적 파일이 바뀌면(배포) 예전 ETag 가 전부 무효가 되도록 하는 버전 값."""
+    h = hashlib.sha1()
+    for path in sorted(TEMPLATES_DIR.rglob("*.html")):
+        h.update(path.as_posix().encode("utf-8"))
+        h.update(path.read_bytes())
+    for logical, hashed in sorted(manifest.by_logical.items()):
+        h.update(f"{logical}={hashed}".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+RENDER_VERSION = _render_version()
+
+
+def data_watermark(db: Session) -> Tuple[Any, ...]:
+    """매치/유저 워터마크를 쿼리 1번으로 읽는다(전부 PK/인덱스 조회)."""
+    row = db.execute(
+        text(
+            "SELECT "
+            "(SELECT max(id) FROM bluewar_matches), "
+            "(SELECT max(id) FROM users), "
+            "(SELECT max(updated_at) FROM users), "
+            "(SELECT value FROM app_meta WHERE key = 'gen:users'), "
+            "(SELECT value FROM app_meta WHERE key = 'gen:matches')"
+        )
+    ).one()
+    return tuple(row)
+
+
+def _viewer_key(request: Request) -> Tuple[Any, ...]:
+    # base.html 이 세션 정보(이름/관리자 여부)를 그리기 때문에 보는 사람별로 ETag 가 달라야 한다.
+    user = request.session.get("user") or {}
+    member = request.session.get("member") or {}
+    return (
+        tuple(sorted((str(k), str(v)) for k, v in user.items())),
+        tuple(sorted((str(k), str(v)) for k, v in member.items())),
+    )
+
+
+def make_etag(*parts: Any) -> str:
+    h = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{h}"'
+
+
+def page_etag(request: Request, db: Session, name: str) -> str:
+    return make_etag(
+        name,
+        RENDER_VERSION,
+        request.url.query,
+        _viewer_key(request),
+        data_watermark(db),
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 와 약한 비교(W/ 무시)로 맞춰본다."""
+    raw = request.headers.get("if-none-match")
+    if not raw:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in raw.split(","):
+        c = candidate.strip()
+        if c == "*":
+            return True
+        if c.startswith("W/"):
+            c = c[2:]
+        if c == target:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,239 @@
+# app/events.py
+"""
+실시간 매치 알림 (SSE /bluewar/events 용 프로세스 내 pub/sub).
+
+- create_match 가 커밋한 뒤 publish(match_event(...)) 로 짧은 이벤트 하나를 뿌린다.
+- 구독자(열려 있는 /bluewar/events 연결)마다 크기가 정해진 asyncio.Queue 를 둔다.
+  느린 구독자의 큐가 넘치면 쌓인 걸 버리고 "resync" 하나만 넣는다 → 브라우저는 새로고침 안내만 띄운다.
+  (구독자 하나 때문에 메모리가 늘거나 publish 가 막히지 않게)
+- 구독자 수는 max_subscribers 까지. 넘으면 TooManySubscribers (라우터가 503).
+- 최근 이벤트 몇 개는 들고 있다가, 재접속(Last-Event-ID)하면 그 뒤 것만 다시 보낸다.
+- 워커가 여러 개면 다른 워커가 받은 매치는 여기 publish 되지 않으므로,
+  watch() 가 poll_interval 마다 gen:matches 를 보고(구독자가 있을 때만) 새 매치를 읽어 뿌린다.
+  같은 매치가 두 번 나가지 않게 최근 match id 로 거른다.
+
+이벤트 모양 (event: match, id: <match id>):
+
+    {"id": 123, "mode": "pvp", "status": "finished",
+     "starter": "...", "winner": "...", "loser": "...",          # 표시 이름
+     "winner_id": "...", "loser_id": "...", "win_gap": 3, "total_rounds": 12,
+     "pcount": 2, "started_at": "2026-01-01 20:00", "finished_at": "2026-01-01 20:07", "note": "..."}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from app import generations, metrics, models
+from app.database import SessionLocal
+
+logger = logging.getLogger("yume.events")
+
+RESYNC = "event: resync\ndata: {}\n\n"
+NOTE_MAX = 160
+WATCH_BATCH = 100
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+def _format(event: Dict[str, Any]) -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: match\ndata: {data}\n\n"
+
+
+def _display(discord_id: Optional[str], names: Dict[str, str]) -> str:
+    if not discord_id:
+        return "-"
+    return names.get(discord_id) or discord_id
+
+
+def match_event(match: models.BlueWarMatch, names: Dict[str, str], pcount: int) -> Dict[str, Any]:
+    """매치 목록 한 줄 + 랭킹 갱신에 필요한 만큼만. names 는 discord_id → 표시 이름."""
+    note = match.note or ""
+    return {
+        "id": match.id,
+        "mode": match.mode,
+        "status": match.status,
+        "starter": _display(match.starter_discord_id, names),
+        "winner": _display(match.winner_discord_id, names),
+        "loser": _display(match.loser_discord_id, names),
+        "winner_id": match.winner_discord_id,
+        "loser_id": match.loser_discord_id,
+        "win_gap": match.win_gap,
+        "total_rounds": match.total_rounds,
+        "pcount": pcount,
+        "started_at": match.started_at.strftime("%Y-%m-%d %H:%M") if match.started_at else None,
+        "finished_at": match.finished_at.strftime("%Y-%m-%d %H:%M") if match.finished_at else None,
+        "note": note[:NOTE_MAX] + ("…" if len(note) > NOTE_MAX else ""),
+    }
+
+
+class Subscription:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max(1, queue_size))
+
+    def offer(self, data: str) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            metrics.sse_dropped.inc()
+
+
+class Broker:
+    """이벤트 루프 스레드에서만 구독/발행한다(create_match 와 watch 모두 루프 위에서 돈다)."""
+
+    def __init__(self, *, max_subscribers: int = 200, queue_size: int = 32, replay: int = 32) -> None:
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subs: Set[Subscription] = set()
+        self._recent: Deque[Tuple[int, str]] = deque(maxlen=replay)
+        self._seen: Deque[int] = deque(maxlen=1024)
+        self._seen_set: Set[int] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        if len(self._subs) >= self.max_subscribers:
+            raise TooManySubscribers()
+        sub = Subscription(self.queue_size)
+        if last_event_id is not None and self._recent:
+            missed = [data for mid, data in self._recent if mid > last_event_id]
+            if self._recent[0][0] > last_event_id + 1 and len(self._recent) == self._recent.maxlen:
+                # 들고 있는 것보다 더 많이 놓쳤다
+                sub.offer(RESYNC)
+            else:
+                for data in missed:
+                    sub.offer(data)
+        self._subs.add(sub)
+        metrics.sse_subscribers.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        if sub in self._subs:
+            self._subs.discard(sub)
+            metrics.sse_subscribers.dec()
+
+    def publish(self, event: Dict[str, Any], *, source: str = "local") -> bool:
+        """이미 보낸 매치면 False."""
+        mid = int(event["id"])
+        if mid in self._seen_set:
+            return False
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(mid)
+        self._seen_set.add(mid)
+
+        data = _format(event)
+        self._recent.append((mid, data))
+        for sub in list(self._subs):
+            sub.offer(data)
+        metrics.sse_events.inc((source,))
+        return True
+
+
+broker = Broker()
+
+
+def configure(settings) -> None:
+    broker.max_subscribers = settings.SSE_MAX_SUBSCRIBERS
+    broker.queue_size = settings.SSE_QUEUE
+
+
+# ============================
+#   다른 워커가 받은 매치
+# ============================
+
+
+def _names(db, matches: Iterable[models.BlueWarMatch]) -> Dict[str, str]:
+    ids: Set[str] = set()
+    match_ids: List[int] = []
+    for m in matches:
+        match_ids.append(m.id)
+        ids.update(d for d in (m.starter_discord_id, m.winner_discord_id, m.loser_discord_id) if d)
+    names: Dict[str, str] = {}
+    if match_ids:
+        P = models.BlueWarParticipant
+        for did, name in db.query(P.discord_id, P.name).filter(P.match_id.in_(match_ids)).all():
+            if did and name:
+                names[did] = name
+    if ids:
+        for u in db.query(models.User).filter(models.User.discord_id.in_(list(ids))).all():
+            if u.nickname:
+                names[u.discord_id] = u.nickname
+    return names
+
+
+def _poll(last_gen: Optional[int], watermark: Optional[int]) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """(세대, 새 watermark, 이벤트들). 세대가 그대로면 DB 는 app_meta PK 조회 1번만."""
+    db = SessionLocal()
+    try:
+        gen = generations.read(db, (generations.MATCHES,))[generations.MATCHES]
+        if gen == last_gen and watermark is not None:
+            return gen, watermark, []
+        M = models.BlueWarMatch
+        if watermark is None:
+            return gen, int(db.query(func.coalesce(func.max(M.id), 0)).scalar() or 0), []
+        matches = db.query(M).filter(M.id > watermark).order_by(M.id.asc()).limit(WATCH_BATCH).all()
+        if not matches:
+            return gen, watermark, []
+        names = _names(db, matches)
+        P = models.BlueWarParticipant
+        pcounts = dict(
+            db.query(P.match_id, func.count(P.id))
+            .filter(P.match_id.in_([m.id for m in matches]))
+            .group_by(P.match_id)
+            .all()
+        )
+        events = [match_event(m, names, int(pcounts.get(m.id, 0))) for m in matches]
+        return gen, matches[-1].id, events
+    finally:
+        db.close()
+
+
+async def watch(interval: float) -> None:
+    """구독자가 있는 동안 interval 마다 gen:matches 를 보고 새 매치를 뿌린다."""
+    last_gen: Optional[int] = None
+    watermark: Optional[int] = None
+    while True:
+        await asyncio.sleep(interval)
+        if not broker.subscribers:
+            # 아무도 안 보고 있으면 DB 도 안 본다. 다시 구독하면 그때의 최신부터.
+            last_gen = watermark = None
+            continue
+        try:
+            last_gen, watermark, events = await asyncio.to_thread(_poll, last_gen, watermark)
+        except Exception:
+            logger.exception("sse watch poll failed")
+            continue
+        for event in events:
+            broker.publish(event, source="poll")
+
+
+_watch_task: Optional["asyncio.Task[None]"] = None
+
+
+def start(settings) -> None:
+    global _watch_task
+    configure(settings)
+    if settings.SSE_ENABLED and settings.SSE_POLL_INTERVAL > 0 and _watch_task is None:
+        _watch_task = asyncio.get_running_loop().create_task(watch(settings.SSE_POLL_INTERVAL))
+
+
+def stop() -> None:
+    global _watch_task
+    if _watch_task is not None:
+        _watch_task.cancel()
+        _watch_task = None
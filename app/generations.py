@@ -0,0 +1,133 @@
+# app/generations.py
+"""
+데이터 영역별 세대(generation) 번호. 워커가 여러 개여도 캐시가 최신인지 확인하는 용도.
+
+- app_meta 에 "gen:matches" / "gen:users" / "gen:members" 키로 정수를 둔다.
+- 쓰기 라우트는 커밋 직전에 bump(db, "matches") 를 불러서 같은 트랜잭션에서 +1 한다.
+  (롤백되면 번호도 같이 롤백 → 번호가 바뀌었으면 데이터도 반드시 바뀐 것)
+- 읽기는 app_meta PK 조회 1번(read()).
+- GenerationCache 는 "이 캐시는 matches/users 세대에 의존" 처럼 걸어두고,
+  세대가 그대로면 워커 메모리의 값을 그대로 쓴다.
+
+    ranking_cache = GenerationCache()
+    rows = ranking_cache.get(db, ("ranking", mode), ("matches", "users"), lambda: build(db, mode))
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+MATCHES = "matches"
+USERS = "users"
+MEMBERS = "members"
+DOMAINS = (MATCHES, USERS, MEMBERS)
+
+KEY_PREFIX = "gen:"
+
+_BUMP_SQL = text(
+    "INSERT INTO app_meta (key, value, updated_at) VALUES (:key, '1', :now) "
+    "ON CONFLICT(key) DO UPDATE SET "
+    "value = CAST(COALESCE(app_meta.value, '0') AS INTEGER) + 1, updated_at = excluded.updated_at"
+)
+
+
+def _key(domain: str) -> str:
+    if domain not in DOMAINS:
+        raise ValueError(f"unknown generation domain: {domain}")
+    return KEY_PREFIX + domain
+
+
+def bump(db: Session, *domains: str) -> None:
+    """세대 번호를 +1 한다. 커밋은 호출한 쪽(같은 트랜잭션에 묶이도록)."""
+    now = datetime.utcnow()
+    for domain in sorted(set(domains)):
+        db.execute(_BUMP_SQL, {"key": _key(domain), "now": now})
+
+
+def read(db: Session, domains: Iterable[str] = DOMAINS) -> Dict[str, int]:
+    """세대 번호들을 쿼리 1번으로 읽는다. 한 번도 bump 안 된 영역은 0."""
+    wanted = [d for d in dict.fromkeys(domains)]
+    keys = [_key(d) for d in wanted]
+    params = {f"k{i}": k for i, k in enumerate(keys)}
+    placeholders = ", ".join(f":k{i}" for i in range(len(keys)))
+    rows = db.execute(
+        text(f"SELECT key, value FROM app_meta WHERE key IN ({placeholders})"),
+        params,
+    ).all()
+    found = {k: int(v or 0) for k, v in rows}
+    return {d: found.get(_key(d), 0) for d in wanted}
+
+
+def stamp(db: Session, domains: Iterable[str] = DOMAINS) -> Tuple[int, ...]:
+    gens = read(db, domains)
+    return tuple(gens[d] for d in gens)
+
+
+class GenerationCache:
+    """
+    워커(프로세스) 메모리 캐시. 항목마다 의존하는 세대를 같이 저장해 두고,
+    꺼낼 때 현재 세대와 다르면 loader() 로 다시 만든다.
+
+    같은 키를 여러 스레드가 동시에 다시 만들지 않도록 키별 락을 쓴다.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Tuple[int, ...], Any]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._key_locks[key] = lock
+            return lock
+
+    def get(
+        self,
+        db: Session,
+        key: Hashable,
+        domains: Iterable[str],
+        loader: Callable[[], Any],
+    ) -> Any:
+        domains = tuple(domains)
+        current = stamp(db, domains)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == current:
+            self.hits += 1
+            return entry[1]
+
+        with self._key_lock(key):
+            # 기다리는 동안 다른 스레드가 이미 만들었을 수 있다.
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == current:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = loader()
+            with self._lock:
+                if key not in self._entries and len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = (current, value)
+            return value
+
+    def peek(self, db: Session, key: Hashable, domains: Iterable[str]) -> Any:
+        """세대가 그대로인 값이 있으면 그것, 없거나 낡았으면 None (loader 를 부르지 않는다)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp(db, tuple(domains)):
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
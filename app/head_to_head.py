@@ -0,0 +1,160 @@
+# app/head_to_head.py
+"""
+상대 전적(head-to-head) 테이블 유지/조회.
+
+- apply_match(): create_match 안에서 호출 (커밋은 호출한 쪽이 한다)
+- rebuild():     bluewar_matches 전체 기록으로 다시 만든다 (set 기반 INSERT ... SELECT 1번)
+- lookup():      (a, b, mode) PK 조회 1번
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+H2H = models.BlueWarHeadToHead
+
+BACKFILL_META_KEY = "head_to_head_backfill_v1"
+
+
+def _upsert(
+    db: Session,
+    *,
+    player_id: str,
+    opponent_id: str,
+    mode: str,
+    win: bool,
+    gap: int,
+    match_id: int,
+) -> None:
+    now = datetime.utcnow()
+    stmt = sqlite_insert(H2H.__table__).values(
+        player_id=player_id,
+        opponent_id=opponent_id,
+        mode=mode,
+        wins=1 if win else 0,
+        losses=0 if win else 1,
+        gap_for=gap if win else 0,
+        gap_against=0 if win else gap,
+        last_match_id=match_id,
+        updated_at=now,
+    )
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_id", "opponent_id", "mode"],
+        set_={
+            "wins": H2H.__table__.c.wins + excluded.wins,
+            "losses": H2H.__table__.c.losses + excluded.losses,
+            "gap_for": H2H.__table__.c.gap_for + excluded.gap_for,
+            "gap_against": H2H.__table__.c.gap_against + excluded.gap_against,
+            "last_match_id": excluded.last_match_id,
+            "updated_at": excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_match(db: Session, match: models.BlueWarMatch) -> None:
+    """승자/패자가 모두 있는 매치 1건을 상대 전적에 반영한다."""
+    winner = match.winner_discord_id
+    loser = match.loser_discord_id
+    if not winner or not loser or winner == loser:
+        return
+    gap = int(match.win_gap or 0)
+    _upsert(db, player_id=winner, opponent_id=loser, mode=match.mode, win=True, gap=gap, match_id=match.id)
+    _upsert(db, player_id=loser, opponent_id=winner, mode=match.mode, win=False, gap=gap, match_id=match.id)
+
+
+_REBUILD_SQL = """
+INSERT INTO bluewar_head_to_head
+    (player_id, opponent_id, mode, wins, losses, gap_for, gap_against, last_match_id, updated_at)
+SELECT player_id, opponent_id, mode, SUM(w), SUM(l), SUM(gf), SUM(ga), MAX(id), :now
+FROM (
+    SELECT winner_discord_id AS player_id, loser_discord_id AS opponent_id, mode,
+           1 AS w, 0 AS l, COALESCE(win_gap, 0) AS gf, 0 AS ga, id
+    FROM bluewar_matches
+    WHERE winner_discord_id IS NOT NULL AND loser_discord_id IS NOT NULL
+      AND winner_discord_id != loser_discord_id
+    UNION ALL
+    SELECT loser_discord_id, winner_discord_id, mode,
+           0, 1, 0, COALESCE(win_gap, 0), id
+    FROM bluewar_matches
+    WHERE winner_discord_id IS NOT NULL AND loser_discord_id IS NOT NULL
+      AND winner_discord_id != loser_discord_id
+)
+GROUP BY player_id, opponent_id, mode
+"""
+
+
+def rebuild(db: Session) -> int:
+    """전체 기록으로 다시 만든다. 만들어진 행 수를 돌려준다(커밋은 호출한 쪽)."""
+    db.execute(text("DELETE FROM bluewar_head_to_head"))
+    db.execute(text(_REBUILD_SQL), {"now": datetime.utcnow()})
+    return int(db.execute(text("SELECT COUNT(*) FROM bluewar_head_to_head")).scalar() or 0)
+
+
+def ensure_backfill(db: Session) -> bool:
+    """테이블이 처음 생겼을 때 기존 기록으로 1회 채운다. 채웠으면 True."""
+    meta = db.query(models.AppMeta).filter(models.AppMeta.key == BACKFILL_META_KEY).first()
+    if meta:
+        return False
+    rebuild(db)
+    db.add(models.AppMeta(key=BACKFILL_META_KEY, value="done"))
+    db.commit()
+    return True
+
+
+def _row_dict(player_id: str, opponent_id: str, mode: str, rows: List[H2H]) -> Dict[str, Any]:
+    wins = sum(int(r.wins) for r in rows)
+    losses = sum(int(r.losses) for r in rows)
+    gap_for = sum(int(r.gap_for) for r in rows)
+    gap_against = sum(int(r.gap_against) for r in rows)
+    last_ids = [r.last_match_id for r in rows if r.last_match_id is not None]
+    return {
+        "player_id": player_id,
+        "opponent_id": opponent_id,
+        "mode": mode,
+        "matches": wins + losses,
+        "wins": wins,
+        "losses": losses,
+        "gap_for": gap_for,
+        "gap_against": gap_against,
+        "net_gap": gap_for - gap_against,
+        "last_match_id": max(last_ids) if last_ids else None,
+    }
+
+
+def lookup(db: Session, player_id: str, opponent_id: str, mode: str = "pvp") -> Dict[str, Any]:
+    """
+    player_id 관점의 opponent_id 상대 전적.
+    mode="all" 이면 (player_id, opponent_id) PK 앞부분 범위 조회로 모드 합계를 낸다.
+    """
+    if mode == "all":
+        rows = (
+            db.query(H2H)
+            .filter(H2H.player_id == player_id, H2H.opponent_id == opponent_id)
+            .all()
+        )
+    else:
+        row: Optional[H2H] = db.get(H2H, (player_id, opponent_id, mode))
+        rows = [row] if row else []
+    return _row_dict(player_id, opponent_id, mode, rows)
+
+
+def opponents(db: Session, player_id: str, *, mode: str = "all", limit: int = 20) -> List[Dict[str, Any]]:
+    """player_id 의 상대별 전적 (판 수 많은 순). PK 앞부분(player_id) 범위 조회."""
+    q = db.query(H2H).filter(H2H.player_id == player_id)
+    if mode != "all":
+        q = q.filter(H2H.mode == mode)
+    grouped: Dict[str, List[H2H]] = {}
+    for r in q.all():
+        grouped.setdefault(r.opponent_id, []).append(r)
+    out = [_row_dict(player_id, opp, mode, rows) for opp, rows in grouped.items()]
+    out.sort(key=lambda r: (-r["matches"], -r["net_gap"], r["opponent_id"]))
+    return out[: max(1, limit)]
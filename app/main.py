@@ -1,23 +1,29 @@
 # app/main.py
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
 from config import settings
-from app.routers import auth, dashboard, records, users, api_bluewar, ranking, bluewar, home, member, admin_members
+from app.routers import auth, dashboard, records, users, api_bluewar, ranking, bluewar, home, member, admin_members, admin_perf, export, words as words_router, metrics as metrics_router
 from app.database import Base, engine
 from app.database import SessionLocal
 from app.schema import ensure_sqlite_schema
 from app.seed_import import ensure_blue_records_seed
-from app import models
+from app import archive, events, generations, head_to_head, maintenance, metrics, models, player_totals, rollups, slowlog, sqlstats, words
 from app.security import hash_password
+from app.assets import AssetStaticFiles, STATIC_DIR, manifest, precompress
+from app.compression import CompressionMiddleware, parse_rules
+from app.metrics import MetricsMiddleware
 
 # 🔵 여기서 한 번 모든 모델 기반으로 테이블 생성
 # - 이미 있는 테이블은 건드리지 않고
 # - 없는 테이블만 새로 만든다 (데이터는 그대로 유지)
 Base.metadata.create_all(bind=engine)
 ensure_sqlite_schema(engine)
+metrics.instrument_engine(engine)
+if settings.SQL_STATS_ENABLED:
+    sqlstats.install(engine)
+slowlog.install(engine, threshold_ms=settings.SLOW_QUERY_MS, max_shapes=settings.SLOW_QUERY_KEEP)
 
 app = FastAPI(
     title="Yume Admin",
@@ -29,8 +35,30 @@ app = FastAPI(
 # - public repo에서는 하드코딩을 피하기 위해 env 기반으로 설정한다.
 app.add_middleware(SessionMiddleware, secret_key=settings.SESSION_SECRET)
 
+# 응답 압축 (HTML/JSON). 스트리밍 응답은 조각 단위로 압축해서 스트리밍을 유지한다.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        rules=parse_rules(settings.COMPRESSION_TYPES),
+    )
+
+# 요청별 쿼리 수/DB 시간 → Server-Timing 헤더, 반복 쿼리(N+1) 경고
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(
+        sqlstats.SQLStatsMiddleware,
+        n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+    )
+
+# 라우트별 요청 수/응답 시간/진행 중 요청 수 (/metrics). 압축보다 바깥에 둬서 전송 시간까지 잰다.
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 # 정적 파일 (CSS, JS)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# - fingerprint 주소(css/base.<hash>.css)는 immutable 캐시 + 미리 압축한 .br/.gz 로 내보낸다.
+precompress(STATIC_DIR)
+app.mount("/static", AssetStaticFiles(directory=STATIC_DIR, manifest=manifest), name="static")
 
 # 라우터 등록
 app.include_router(home.router)
@@ -42,7 +70,11 @@ app.include_router(bluewar.router)
 app.include_router(users.router)
 app.include_router(api_bluewar.router)
 app.include_router(ranking.router)
+app.include_router(words_router.router)
 app.include_router(admin_members.router)
+app.include_router(admin_perf.router)
+app.include_router(export.router)
+app.include_router(metrics_router.router)
 
 
 
@@ -53,6 +85,14 @@ def _startup_seed_import() -> None:
     try:
         ensure_blue_records_seed(db)
 
+        # 상대 전적 / 플레이어 합계 / 일별 롤업 / 단어 색인 테이블이 새로 생겼거나 컬럼이 늘었으면 기존 기록으로 1회 채운다.
+        # (아카이브로 옮긴 매치까지 포함해야 하므로 메인 + 아카이브를 합친 세션에서)
+        with archive.all_tiers(engine, settings.ARCHIVE_DIR) as tdb:
+            head_to_head.ensure_backfill(tdb)
+            player_totals.ensure_backfill(tdb)
+            rollups.ensure_backfill(tdb)
+            words.ensure_backfill(tdb)
+
         # ✅ 요청사항: 멤버 로그인 아이디를 "디스코드 ID" 강제에서 해제하고,
         #    관리자 계정 1개만 유지 (ID: 시호, PW: miyo) - 1회성 부트스트랩
         bootstrap_key = "member_bootstrap_admin_v1"
@@ -74,6 +114,29 @@ def _startup_seed_import() -> None:
             )
             db.add(m)
             db.add(models.AppMeta(key=bootstrap_key, value="done"))
+            generations.bump(db, generations.MEMBERS)
             db.commit()
     finally:
         db.close()
+
+
+@app.on_event("startup")
+def _startup_maintenance() -> None:
+    # DB 정비 스케줄러 (파일 잠금을 잡은 워커 1개에서만 실제로 돈다)
+    maintenance.start(engine, settings)
+
+
+@app.on_event("shutdown")
+def _shutdown_maintenance() -> None:
+    maintenance.stop()
+
+
+@app.on_event("startup")
+async def _startup_events() -> None:
+    # 실시간 매치 알림: 다른 워커가 받은 매치를 가져오는 감시 작업 (이벤트 루프 위에서 돈다)
+    events.start(settings)
+
+
+@app.on_event("shutdown")
+async def _shutdown_events() -> None:
+    events.stop()
@@ -0,0 +1,407 @@
+# app/maintenance.py
+"""
+백그라운드 DB 정비 스케줄러 (워커 1개에서만).
+
+- 앱 startup 에서 start(), shutdown 에서 stop().
+- DB 파일 옆 "<db>.maint.lock" 에 flock 을 잡은 워커만 작업을 돌린다.
+  (잡은 워커가 죽으면 다른 워커가 다음 확인 때 이어받는다)
+- 작업마다 주기 + 지터(±jitter 비율). 다음 실행 시각이 된 작업만 돈다.
+- 요청 처리 중이면 기다렸다가(최대 yield_max_wait 초) 돌고, 긴 작업은 작은 단위로 쪼개서
+  단위 사이마다 쉬면서 쓰기 잠금을 오래 잡지 않는다.
+
+작업:
+    optimize          PRAGMA optimize (통계가 필요한 인덱스만 ANALYZE)
+    wal_checkpoint    PRAGMA wal_checkpoint(PASSIVE) - WAL 모드일 때만, 쓰는 쪽을 막지 않는다
+    incremental_vacuum  PRAGMA incremental_vacuum(N) 반복 - auto_vacuum=INCREMENTAL 일 때만
+    rollup_compaction   오래된 시간대 롤업(bluewar_hourly_stats) 정리 - 대시보드는 최근 30일만 쓴다
+    backup            온라인 백업 스냅샷 + 정리 (app/backup.py) - YUME_BACKUP_SEC 를 줬을 때만
+                      원본이 계속 바뀌어서 못 뜨면 "busy" → YUME_BACKUP_RETRY_SEC 뒤에 다시
+    archive           오래된 매치를 시즌 아카이브 파일로 (app/archive.py) - YUME_ARCHIVE_AFTER_DAYS 를 줬을 때만
+
+실행 횟수/시간은 /metrics 의 yume_maintenance_* 로 나간다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app import archive, backup, metrics
+from app.rollups import kst_today
+
+try:  # 선택: 윈도우 개발 환경에는 없다 → 잠금 없이 그냥 돈다.
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger("yume.maintenance")
+
+job_runs = metrics.registry.register(
+    metrics.Counter("yume_maintenance_runs_total", "정비 작업 실행 수", ("job", "result"))
+)
+job_duration = metrics.registry.register(
+    metrics.Histogram(
+        "yume_maintenance_duration_seconds",
+        "정비 작업 실행 시간(초, 양보 대기 제외)",
+        ("job",),
+        (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+    )
+)
+
+
+class Yield:
+    """요청 트래픽에 양보하는 도우미. 작업 함수는 단위 작업 사이마다 pause() 를 부른다."""
+
+    def __init__(self, stop: threading.Event, *, max_wait: float, step_pause: float) -> None:
+        self.stop = stop
+        self.max_wait = max_wait
+        self.step_pause = step_pause
+        self.waited = 0.0
+
+    def until_idle(self) -> None:
+        t0 = time.monotonic()
+        while metrics.in_flight_total() > 0 and not self.stop.is_set():
+            if time.monotonic() - t0 >= self.max_wait:
+                break
+            self.stop.wait(0.05)
+        self.waited += time.monotonic() - t0
+
+    def pause(self) -> None:
+        t0 = time.monotonic()
+        self.stop.wait(self.step_pause)
+        self.waited += time.monotonic() - t0
+        self.until_idle()
+
+
+# ============================
+#   작업들
+# ============================
+
+
+def job_optimize(engine: Engine, y: Yield) -> str:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+        conn.commit()
+    return "ok"
+
+
+def job_wal_checkpoint(engine: Engine, y: Yield) -> str:
+    with engine.connect() as conn:
+        mode = str(conn.exec_driver_sql("PRAGMA journal_mode").scalar() or "").lower()
+        if mode != "wal":
+            return "skipped"
+        busy, log_frames, done = conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)").one()
+    return "ok" if not busy else "busy"
+
+
+def job_incremental_vacuum(engine: Engine, y: Yield, *, pages_per_step: int = 200, max_steps: int = 50) -> str:
+    with engine.connect() as conn:
+        auto_vacuum = int(conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() or 0)
+        if auto_vacuum != 2:
+            # NONE(0)/FULL(1) 이면 incremental_vacuum 은 아무것도 안 한다.
+            return "skipped"
+    for _ in range(max_steps):
+        with engine.connect() as conn:
+            free = int(conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0)
+            if free <= 0:
+                break
+            conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages_per_step)})").fetchall()
+            conn.commit()
+        y.pause()
+    return "ok"
+
+
+def job_rollup_compaction(engine: Engine, y: Yield, *, keep_days: int = 90, batch: int = 2000) -> str:
+    cutoff = (kst_today() - timedelta(days=keep_days)).isoformat()
+    while True:
+        with engine.begin() as conn:
+            res = conn.execute(
+                text(
+                    "DELETE FROM bluewar_hourly_stats WHERE rowid IN ("
+                    "SELECT rowid FROM bluewar_hourly_stats WHERE day < :cutoff LIMIT :n)"
+                ),
+                {"cutoff": cutoff, "n": batch},
+            )
+            deleted = res.rowcount or 0
+        if deleted < batch:
+            break
+        y.pause()
+    return "ok"
+
+
+def job_backup(engine: Engine, y: Yield, *, settings) -> str:
+    db_path = _sqlite_path(engine)
+    if db_path is None:
+        return "skipped"
+    # 단계마다 YUME_BACKUP_STEP_SLEEP 초 쉬고, 요청이 끝나길 기다린다(y.pause 가 step_pause 만큼도 쉰다).
+    try:
+        result = backup.create_snapshot(
+            db_path,
+            settings.BACKUP_DIR,
+            pages=settings.BACKUP_PAGES,
+            step_sleep=settings.BACKUP_STEP_SLEEP,
+            on_step=y.pause,
+            archive_dir=settings.ARCHIVE_DIR,
+        )
+    except backup.BackupBusy as exc:
+        # 한 번에 복사하면 쓰는 쪽이 다 막히므로 포기하고 retry_interval 뒤에 다시
+        logger.warning("backup: %s", exc)
+        return "busy"
+    removed = backup.rotate(
+        settings.BACKUP_DIR,
+        db_path,
+        keep_last=settings.BACKUP_KEEP_LAST,
+        keep_daily=settings.BACKUP_KEEP_DAILY,
+    )
+    logger.info(
+        "backup %s: %d pages in %d steps (%d restarts), %.1fs, %d archive files, rotated %d",
+        result.snapshot.name, result.pages, result.steps, result.restarts, result.seconds,
+        len(result.archives), len(removed),
+    )
+    return "ok"
+
+
+def job_archive(engine: Engine, y: Yield, *, settings) -> str:
+    moved = archive.archive_old(
+        engine,
+        settings.ARCHIVE_DIR,
+        after_days=settings.ARCHIVE_AFTER_DAYS,
+        on_batch=y.pause,
+    )
+    if moved:
+        logger.info("archive: %s", ", ".join(f"{sid}={n}" for sid, n in sorted(moved.items())))
+    return "ok"
+
+
+# ============================
+#   스케줄러
+# ============================
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    fn: Callable[[Engine, Yield], str]
+    next_run: float = 0.0
+    last_result: Optional[str] = None
+    last_duration: Optional[float] = None
+    last_finished: Optional[float] = None
+    runs: int = field(default=0)
+    retry_interval: float = 0.0  # "busy" 로 끝나면 interval 대신 이만큼 뒤에 다시 (0 이면 그냥 interval)
+
+
+class MaintenanceScheduler:
+    def __init__(
+        self,
+        engine: Engine,
+        jobs: List[Job],
+        *,
+        lock_path: Optional[str],
+        jitter: float = 0.1,
+        tick: float = 5.0,
+        initial_delay: float = 60.0,
+        yield_max_wait: float = 30.0,
+        step_pause: float = 0.2,
+    ) -> None:
+        self.engine = engine
+        self.jobs = jobs
+        self.lock_path = lock_path
+        self.jitter = jitter
+        self.tick = tick
+        self.initial_delay = initial_delay
+        self.yield_max_wait = yield_max_wait
+        self.step_pause = step_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_fd: Optional[int] = None
+
+    # ---------- 워커 1개만 ----------
+
+    def _try_lock(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        if fcntl is None or not self.lock_path:
+            self._lock_fd = -1
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode("ascii"))
+        self._lock_fd = fd
+        return True
+
+    def _unlock(self) -> None:
+        if self._lock_fd is not None and self._lock_fd >= 0:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._lock_fd)
+        self._lock_fd = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    # ---------- 실행 ----------
+
+    def _schedule(self, job: Job, now: float) -> None:
+        if job.last_result == "busy" and job.retry_interval > 0:
+            job.next_run = now + job.retry_interval
+            return
+        spread = job.interval * self.jitter
+        job.next_run = now + job.interval + random.uniform(-spread, spread)
+
+    def run_job(self, job: Job) -> None:
+        y = Yield(self._stop, max_wait=self.yield_max_wait, step_pause=self.step_pause)
+        y.until_idle()
+        waited_before = y.waited
+        t0 = time.monotonic()
+        try:
+            result = job.fn(self.engine, y)
+        except Exception:
+            result = "error"
+            logger.exception("maintenance job %s failed", job.name)
+        # 양보하느라 쉰 시간은 빼고 실제로 DB 를 쓴 시간만
+        spent = max(0.0, time.monotonic() - t0 - (y.waited - waited_before))
+        job.runs += 1
+        job.last_result = result
+        job.last_duration = spent
+        job.last_finished = time.time()
+        job_runs.inc((job.name, result))
+        job_duration.observe((job.name,), spent)
+
+    def _loop(self) -> None:
+        start = time.monotonic()
+        for job in self.jobs:
+            # 처음에는 initial_delay 뒤에 작업들이 흩어져서 돌도록
+            job.next_run = start + self.initial_delay + random.uniform(0, min(job.interval, 300.0) * self.jitter)
+        while not self._stop.is_set():
+            if self._try_lock():
+                now = time.monotonic()
+                for job in self.jobs:
+                    if self._stop.is_set():
+                        break
+                    if now >= job.next_run:
+                        self.run_job(job)
+                        self._schedule(job, time.monotonic())
+            self._stop.wait(self.tick)
+        self._unlock()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="yume-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self) -> List[Dict[str, object]]:
+        now = time.monotonic()
+        return [
+            {
+                "job": j.name,
+                "interval_s": j.interval,
+                "runs": j.runs,
+                "last_result": j.last_result,
+                "last_duration_s": j.last_duration,
+                "last_finished": j.last_finished,
+                "next_run_in_s": max(0.0, j.next_run - now) if j.next_run else None,
+            }
+            for j in self.jobs
+        ]
+
+
+scheduler: Optional[MaintenanceScheduler] = None
+
+
+def _last_success() -> Dict[metrics.Labels, float]:
+    if scheduler is None:
+        return {}
+    return {(j.name,): float(j.last_finished) for j in scheduler.jobs if j.last_finished}
+
+
+metrics.registry.register(
+    metrics.CallbackGauge(
+        "yume_maintenance_last_run_timestamp_seconds",
+        "정비 작업이 마지막으로 끝난 시각(unix time)",
+        _last_success,
+        ("job",),
+    )
+)
+
+
+def _sqlite_path(engine: Engine) -> Optional[str]:
+    db = engine.url.database
+    if engine.url.get_backend_name() != "sqlite" or not db or db == ":memory:":
+        return None
+    return db
+
+
+def build_scheduler(engine: Engine, settings) -> MaintenanceScheduler:
+    keep_days = settings.MAINTENANCE_HOURLY_KEEP_DAYS
+    jobs = [
+        Job("optimize", settings.MAINTENANCE_OPTIMIZE_INTERVAL, job_optimize),
+        Job("wal_checkpoint", settings.MAINTENANCE_CHECKPOINT_INTERVAL, job_wal_checkpoint),
+        Job(
+            "incremental_vacuum",
+            settings.MAINTENANCE_VACUUM_INTERVAL,
+            lambda e, y: job_incremental_vacuum(e, y, pages_per_step=settings.MAINTENANCE_VACUUM_PAGES),
+        ),
+        Job(
+            "rollup_compaction",
+            settings.MAINTENANCE_COMPACTION_INTERVAL,
+            lambda e, y: job_rollup_compaction(e, y, keep_days=keep_days),
+        ),
+        Job(
+            "backup",
+            settings.BACKUP_INTERVAL,
+            lambda e, y: job_backup(e, y, settings=settings),
+            retry_interval=settings.BACKUP_RETRY_INTERVAL,
+        ),
+        Job(
+            "archive",
+            settings.ARCHIVE_INTERVAL if settings.ARCHIVE_AFTER_DAYS > 0 else 0,
+            lambda e, y: job_archive(e, y, settings=settings),
+        ),
+    ]
+    path = _sqlite_path(engine)
+    return MaintenanceScheduler(
+        engine,
+        [j for j in jobs if j.interval > 0],
+        lock_path=(path + ".maint.lock") if path else None,
+        jitter=settings.MAINTENANCE_JITTER,
+    )
+
+
+def start(engine: Engine, settings) -> Optional[MaintenanceScheduler]:
+    global scheduler
+    if not settings.MAINTENANCE_ENABLED or _sqlite_path(engine) is None:
+        return None
+    if scheduler is None:
+        scheduler = build_scheduler(engine, settings)
+    scheduler.start()
+    return scheduler
+
+
+def stop() -> None:
+    if scheduler is not None:
+        scheduler.stop()
@@ -0,0 +1,461 @@
+# app/metrics.py
+"""
+Prometheus 텍스트 형식 메트릭 (/metrics).
+
+- 카운터/히스토그램은 스레드별 조각(shard)에 쌓고, 수집할 때만 합친다.
+  → 요청 처리 중에는 락을 잡지 않는다. (조각은 자기 스레드만 쓰므로 GIL 로 충분)
+  → 끝난 스레드(anyio 워커 등)의 조각은 수집할 때 retired 로 접어서 목록이 계속 늘지 않게 한다.
+- 게이지(연결 수 등)는 수집 시점에 콜백으로 읽는다.
+- 프로세스(워커)별 값이다. uvicorn 워커를 여러 개 띄우면 워커마다 따로 모인다.
+
+노출되는 것:
+    yume_http_requests_total{method,route,status}
+    yume_http_request_duration_seconds{method,route}      (histogram)
+    yume_http_requests_in_flight{method,route}
+    yume_db_pool_checkouts_total
+    yume_db_pool_checkout_wait_seconds                    (histogram)
+    yume_db_pool_connections_checked_out
+    yume_bluewar_ingest_total{mode,result}
+    yume_bluewar_ingest_participants_total{mode}
+    yume_sse_subscribers / yume_sse_events_total{source} / yume_sse_dropped_total
+    yume_ratelimit_rejected_total{policy} / yume_ratelimit_keys{policy}
+    yume_compression_*{route,encoding}
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.routing import current_route, route_label
+
+Labels = Tuple[str, ...]
+
+# 초 단위. 대부분 페이지가 수~수십 ms 라 아래쪽을 촘촘하게 둔다.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0,
+)
+# 풀 대기는 보통 0 에 가깝고, 막히면 SQLite busy/풀 고갈이라 초 단위로 튄다.
+POOL_WAIT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class _Sharded:
+    """스레드별 dict 조각. 값 합치기는 서브클래스의 _fold 가 한다."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()  # 조각 등록/수집 때만 쓴다
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def _shard(self) -> dict:
+        d = getattr(self._local, "d", None)
+        if d is None:
+            d = {}
+            self._local.d = d
+            with self._lock:
+                self._shards.append((threading.current_thread(), d))
+        return d
+
+    def _fold(self, into: dict, src: dict) -> None:  # pragma: no cover - 서브클래스에서 구현
+        raise NotImplementedError
+
+    def _merged(self) -> dict:
+        with self._lock:
+            alive: List[Tuple[threading.Thread, dict]] = []
+            for thread, d in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, d))
+                else:
+                    # 끝난 스레드는 더 이상 쓰지 않으므로 안전하게 접어 둔다.
+                    self._fold(self._retired, d)
+            self._shards = alive
+            out: dict = {}
+            self._fold(out, self._retired)
+            for _, d in alive:
+                # dict(d) 는 C 레벨 복사라 다른 스레드가 키를 추가하는 중에도 안전하다.
+                self._fold(out, dict(d))
+        return out
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        d = self._shard()
+        d[labels] = d.get(labels, 0.0) + amount
+
+    def _fold(self, into: dict, src: dict) -> None:
+        for k, v in src.items():
+            into[k] = into.get(k, 0.0) + v
+
+    def samples(self) -> Dict[Labels, float]:
+        return self._merged()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    """inc/dec 가능한 게이지 (진행 중 요청 수 등). 조각 합이 현재 값이다."""
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, v in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Labels, value: float) -> None:
+        d = self._shard()
+        row = d.get(labels)
+        if row is None:
+            # [버킷별 개수..., +Inf 개수, 합계]
+            row = [0] * (len(self.buckets) + 1) + [0.0]
+            d[labels] = row
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def _fold(self, into: dict, src: dict) -> None:
+        for k, row in src.items():
+            cur = into.get(k)
+            if cur is None:
+                into[k] = list(row)
+            else:
+                for i, v in enumerate(row):
+                    cur[i] += v
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, row in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                lb = _fmt_labels(self.labelnames + ("le",), labels + (_fmt_value(bound),))
+                lines.append(f"{self.name}_bucket{lb} {cumulative}")
+            cumulative += row[len(self.buckets)]
+            lb = _fmt_labels(self.labelnames + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{lb} {cumulative}")
+            base = _fmt_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_fmt_value(row[-1])}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class CallbackGauge:
+    """수집 시점에 fn() 으로 값을 읽는 게이지. fn 은 {labels: value} 를 돌려준다."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.fn()
+        except Exception:
+            return lines
+        for labels, v in sorted(values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}")
+        return lines
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    inner = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + inner + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())  # type: ignore[attr-defined]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter("yume_http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+)
+http_latency = registry.register(
+    Histogram("yume_http_request_duration_seconds", "HTTP 응답 시간(초, 본문 전송 끝까지)", ("method", "route"))
+)
+http_in_flight = registry.register(
+    Gauge("yume_http_requests_in_flight", "처리 중인 HTTP 요청 수", ("method", "route"))
+)
+
+db_checkouts = registry.register(
+    Counter("yume_db_pool_checkouts_total", "DB 커넥션 풀 checkout 횟수")
+)
+db_checkout_wait = registry.register(
+    Histogram("yume_db_pool_checkout_wait_seconds", "DB 커넥션을 얻기까지 기다린 시간(초)", (), POOL_WAIT_BUCKETS)
+)
+
+ingest_total = registry.register(
+    Counter("yume_bluewar_ingest_total", "봇 매치 업로드 수", ("mode", "result"))
+)
+ingest_participants = registry.register(
+    Counter("yume_bluewar_ingest_participants_total", "업로드된 매치 참가자 수", ("mode",))
+)
+
+
+sse_subscribers = registry.register(
+    Gauge("yume_sse_subscribers", "SSE 구독자 수 (/bluewar/events)")
+)
+sse_events = registry.register(
+    Counter("yume_sse_events_total", "SSE 로 보낸 이벤트 수", ("source",))
+)
+sse_dropped = registry.register(
+    Counter("yume_sse_dropped_total", "느린 구독자 큐가 넘쳐서 버린 횟수")
+)
+
+ratelimit_rejected = registry.register(
+    Counter("yume_ratelimit_rejected_total", "요청 수 제한으로 막은 요청 수 (429)", ("policy",))
+)
+
+
+def _ratelimit_keys() -> Dict[Labels, float]:
+    from app import ratelimit
+
+    return {(name,): float(n) for name, n in ratelimit.snapshot().items()}
+
+
+registry.register(
+    CallbackGauge("yume_ratelimit_keys", "요청 수 제한이 기억하는 IP/계정 키 수", _ratelimit_keys, ("policy",))
+)
+
+# 계속 열려 있는 연결(SSE 등)의 라우트. 진행 중 요청 수(양보 판단)와 응답 시간 히스토그램에서 뺀다.
+LONG_LIVED_ROUTES: Set[str] = set()
+
+
+def in_flight_total() -> int:
+    """지금 이 워커에서 처리 중인 HTTP 요청 수 (백그라운드 작업이 양보할 때 쓴다)."""
+    return int(
+        sum(v for labels, v in http_in_flight.samples().items() if v > 0 and labels[1] not in LONG_LIVED_ROUTES)
+    )
+
+
+# ============================
+#   HTTP 미들웨어
+# ============================
+
+
+class MetricsMiddleware:
+    """
+    요청 수 / 응답 시간 / 진행 중 요청 수를 라우트 템플릿 단위로 모은다.
+
+    진행 중 요청 수는 요청이 "들어왔을 때" 라우트를 알아야 해서,
+    router.routes 로 직접 매칭한다(경로별 결과는 캐시).
+    """
+
+    CACHE_MAX = 2048
+
+    def __init__(self, app: ASGIApp, *, router=None) -> None:
+        self.app = app
+        self.router = router
+        self._cache: Dict[Tuple[str, str], str] = {}
+
+    def _resolve(self, scope: Scope) -> str:
+        key = (scope.get("method", ""), scope.get("path", ""))
+        label = self._cache.get(key)
+        if label is not None:
+            return label
+        label = "<unmatched>"
+        partial: Optional[str] = None
+        for route in getattr(self.router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                label = str(getattr(route, "path", "") or label)
+                break
+            if match == Match.PARTIAL and partial is None:
+                partial = str(getattr(route, "path", "") or "")
+        else:
+            if partial:
+                label = partial
+        if len(self._cache) >= self.CACHE_MAX:
+            # ID 가 들어간 경로가 많아서 가끔 통째로 비운다 (계산은 싸다)
+            self._cache.clear()
+        self._cache[key] = label
+        return label
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        route = self._resolve(scope) if self.router is not None else route_label(scope)
+        labels = (method, route)
+        status_code = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message.get("status", 200))
+            await send(message)
+
+        http_in_flight.inc(labels)
+        token = current_route.set(route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_route.reset(token)
+            http_in_flight.dec(labels)
+            if route not in LONG_LIVED_ROUTES:
+                http_latency.observe(labels, time.perf_counter() - t0)
+            http_requests.inc((method, route, str(status_code)))
+
+
+# ============================
+#   DB 커넥션 풀
+# ============================
+
+
+def instrument_engine(engine) -> None:
+    """
+    engine.pool 의 checkout 횟수 / 대기 시간 / 사용 중 연결 수를 모은다.
+
+    대기 시간은 pool.connect() 를 감싸서 잰다(풀 이벤트에는 "기다리기 시작" 시점이 없다).
+    engine.dispose() 로 풀이 새로 만들어지면 다시 불러야 한다.
+    """
+    from sqlalchemy import event
+
+    pool = engine.pool
+    if getattr(pool, "_yume_metrics", False):
+        return
+    original_connect = pool.connect
+
+    def connect():
+        t0 = time.perf_counter()
+        try:
+            return original_connect()
+        finally:
+            db_checkout_wait.observe((), time.perf_counter() - t0)
+
+    pool.connect = connect  # type: ignore[method-assign]
+    pool._yume_metrics = True  # type: ignore[attr-defined]
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):  # noqa: ANN001
+        db_checkouts.inc()
+
+    def _pool_state() -> Dict[Labels, float]:
+        fn = getattr(engine.pool, "checkedout", None)
+        return {(): float(fn())} if fn else {}
+
+    registry.register(
+        CallbackGauge("yume_db_pool_connections_checked_out", "지금 사용 중인 DB 커넥션 수", _pool_state)
+    )
+
+    def _pool_size() -> Dict[Labels, float]:
+        fn = getattr(engine.pool, "size", None)
+        return {(): float(fn())} if fn else {}
+
+    registry.register(CallbackGauge("yume_db_pool_size", "DB 커넥션 풀 크기", _pool_size))
+
+
+# ============================
+#   압축 통계 (app/compression.py)
+# ============================
+
+
+def _compression_values(field: str) -> Callable[[], Dict[Labels, float]]:
+    def fn() -> Dict[Labels, float]:
+        from app import compression
+
+        return {(r["route"], r["encoding"]): float(r[field]) for r in compression.stats.snapshot()}
+
+    return fn
+
+
+for _name, _field, _help in (
+    ("yume_compression_responses_total", "responses", "압축한 응답 수"),
+    ("yume_compression_bytes_in_total", "bytes_in", "압축 전 바이트"),
+    ("yume_compression_bytes_out_total", "bytes_out", "압축 후 바이트"),
+):
+    registry.register(
+        CallbackGauge(_name, _help, _compression_values(_field), ("route", "encoding"), kind="counter")
+    )
+
+
+def _compression_cpu() -> Dict[Labels, float]:
+    from app import compression
+
+    return {(r["route"], r["encoding"]): r["cpu_ms_total"] / 1000.0 for r in compression.stats.snapshot()}
+
+
+registry.register(
+    CallbackGauge(
+        "yume_compression_cpu_seconds_total",
+        "압축에 쓴 CPU 시간(초)",
+        _compression_cpu,
+        ("route", "encoding"),
+        kind="counter",
+    )
+)
+
+
+def render() -> str:
+    return registry.render()
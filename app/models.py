@@ -7,6 +7,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -41,8 +42,8 @@ class User(Base):
     # 디스코드 ID (snowflake)
     discord_id = Column(String(32), unique=True, nullable=False)
 
-    # 닉네임 / 이름
-    nickname = Column(String(100), nullable=True)
+    # 닉네임 / 이름 (유저 관리 목록의 접두사 검색용 인덱스)
+    nickname = Column(String(100), nullable=True, index=True)
 
     # 관리자 메모
     note = Column(Text, nullable=True)
@@ -53,6 +54,9 @@ class User(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # 마지막 변경 시각 (ETag 용 users 테이블 변경 스탬프: max(updated_at) 을 인덱스로 바로 읽는다)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
     # 블루전 매치 참가 이력
     participants = relationship(
         "BlueWarParticipant",
@@ -172,6 +176,222 @@ class BlueWarParticipant(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 플레이어 → 매치 경로 (유저 목록 집계, 플레이어 프로필)
+        Index("ix_bluewar_participants_discord_match", "discord_id", "match_id"),
+    )
+
+
+class BlueWarHeadToHead(Base):
+    """
+    플레이어 간 상대 전적 (미리 집계해 둔 테이블).
+
+    - (player_id, opponent_id, mode) 가 PK 라서 "나 vs X" 는 PK 조회 1번이면 끝난다.
+    - 한 판이 끝나면 양쪽 관점으로 2줄이 갱신된다(create_match 안에서 같은 트랜잭션).
+    - gap_for / gap_against : 이긴 판 / 진 판의 win_gap 합
+    """
+    __tablename__ = "bluewar_head_to_head"
+
+    player_id = Column(String(32), primary_key=True)
+    opponent_id = Column(String(32), primary_key=True)
+    mode = Column(String(20), primary_key=True)
+
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    gap_for = Column(Integer, default=0, nullable=False)
+    gap_against = Column(Integer, default=0, nullable=False)
+
+    last_match_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BlueWarPlayerTotal(Base):
+    """
+    플레이어별 · 모드별 전체 기간 랭킹 합계 (app/player_totals.py).
+
+    - 랭킹 기준(승자·패자가 둘 다 있는 판) 승/패/gap 합계. 아카이브로 옮긴 매치도 포함된 값이다.
+    - mode="all" 줄은 모든 모드 합계 (랭킹 mode=all 용).
+    - base_wins/base_losses 는 users 의 기본 전적 사본, total_wins = wins + base_wins.
+    - 정렬 키(net_gap, total_wins, matches)를 컬럼으로 둬서 순위는 인덱스 범위 COUNT 로 낸다.
+    """
+    __tablename__ = "bluewar_player_totals"
+
+    mode = Column(String(20), primary_key=True)
+    discord_id = Column(String(32), primary_key=True)
+
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    gap_plus = Column(Integer, default=0, nullable=False)
+    gap_minus = Column(Integer, default=0, nullable=False)
+    base_wins = Column(Integer, default=0, nullable=False)
+    base_losses = Column(Integer, default=0, nullable=False)
+
+    matches = Column(Integer, default=0, nullable=False)     # wins + losses
+    net_gap = Column(Integer, default=0, nullable=False)     # gap_plus - gap_minus
+    total_wins = Column(Integer, default=0, nullable=False)  # wins + base_wins
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # 랭킹 정렬 키 (순위 = 나보다 앞선 줄 수 + 1)
+        Index("ix_bluewar_player_totals_rank", "mode", "net_gap", "total_wins", "matches"),
+    )
+
+
+class BlueWarDailyStats(Base):
+    """
+    일별(KST) · 모드별 매치 롤업. 대시보드는 이 테이블 몇백 줄만 읽는다.
+
+    - 평균은 합계/개수로 저장해 두고 읽을 때 나눈다(증분 갱신이 가능하도록).
+    """
+    __tablename__ = "bluewar_daily_stats"
+
+    day = Column(String(10), primary_key=True)  # "YYYY-MM-DD" (KST)
+    mode = Column(String(20), primary_key=True)
+
+    matches = Column(Integer, default=0, nullable=False)
+    players = Column(Integer, default=0, nullable=False)  # 그날 해당 모드에 참가한 서로 다른 사람 수
+
+    rounds_sum = Column(Integer, default=0, nullable=False)
+    rounds_count = Column(Integer, default=0, nullable=False)
+    gap_sum = Column(Integer, default=0, nullable=False)
+    gap_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BlueWarDailyPlayer(Base):
+    """
+    일별(KST) · 모드별 · 플레이어별 기록.
+    - matches : 참가 판 수 (일별 고유 참가자 수 계산용)
+    - wins / losses / gap_plus / gap_minus : 랭킹 기준(승자·패자가 둘 다 있는 판) 합계 → 기간/시즌 랭킹
+    """
+    __tablename__ = "bluewar_daily_players"
+
+    day = Column(String(10), primary_key=True)
+    mode = Column(String(20), primary_key=True)
+    discord_id = Column(String(32), primary_key=True)
+
+    matches = Column(Integer, default=0, nullable=False)
+
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    gap_plus = Column(Integer, default=0, nullable=False)
+    gap_minus = Column(Integer, default=0, nullable=False)
+
+
+class BlueWarHourlyStats(Base):
+    """일별(KST) · 모드별 · 시간대(0~23시)별 매치 수 (시간대 히스토그램)."""
+    __tablename__ = "bluewar_hourly_stats"
+
+    day = Column(String(10), primary_key=True)
+    mode = Column(String(20), primary_key=True)
+    hour = Column(Integer, primary_key=True)
+
+    matches = Column(Integer, default=0, nullable=False)
+
+
+class BlueWarWordUse(Base):
+    """
+    복기 로그 단어 역색인 (app/words.py): 단어 → (매치, 몇 번째 턴, 사이드).
+
+    - PK (word, match_id, turn) 순서라 "브로콜리 쓴 매치" 는 PK 범위 조회로 최근 매치부터 읽는다.
+    - rowid 없는 테이블(PK 가 곧 저장 순서)이라 인덱스를 따로 두지 않아도 된다.
+    - 아카이브로 옮긴 매치의 줄도 그대로 둔다(매치 상세는 아카이브에서 찾는다).
+    """
+    __tablename__ = "bluewar_word_uses"
+
+    word = Column(String(32), primary_key=True)
+    match_id = Column(Integer, primary_key=True)
+    turn = Column(Integer, primary_key=True)
+
+    side = Column(Integer, nullable=False)
+    mode = Column(String(20), nullable=False)
+
+    __table_args__ = (
+        Index("ix_bluewar_word_uses_match", "match_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+
+class BlueWarWordStat(Base):
+    """
+    모드별 단어 통계 (미리 집계, create_match 에서 같은 트랜잭션으로 갱신).
+
+    - uses     : 쓴 횟수,  matches : 그 단어가 나온 매치 수
+    - openings : 첫 턴(시작한 사람)에 쓴 횟수
+    - opening_wins / opening_decided : 그 단어로 시작한 판 중 시작한 사람이 이긴 판 / 승패가 난 판
+    """
+    __tablename__ = "bluewar_word_stats"
+
+    mode = Column(String(20), primary_key=True)
+    word = Column(String(32), primary_key=True)
+
+    uses = Column(Integer, default=0, nullable=False)
+    matches = Column(Integer, default=0, nullable=False)
+    openings = Column(Integer, default=0, nullable=False)
+    opening_wins = Column(Integer, default=0, nullable=False)
+    opening_decided = Column(Integer, default=0, nullable=False)
+
+    last_match_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        # 모드별 많이 쓴 단어 / 많이 쓴 첫 단어 TOP N
+        Index("ix_bluewar_word_stats_mode_uses", "mode", "uses"),
+        Index("ix_bluewar_word_stats_mode_openings", "mode", "openings"),
+    )
+
+
+class BlueWarArchive(Base):
+    """
+    시즌별 아카이브 파일 목록 (app/archive.py).
+
+    - 오래된 매치/참가자 행은 <ARCHIVE_DIR>/bluewar_<season_id>.db 로 옮겨지고 여기엔 요약만 남는다.
+    - match_id 는 기록 순서대로 늘어나므로 [min_match_id, max_match_id] 로 상세 조회 시 파일을 찾는다.
+    """
+    __tablename__ = "bluewar_archives"
+
+    season_id = Column(String(32), primary_key=True)
+    file = Column(String(255), nullable=False)
+
+    matches = Column(Integer, default=0, nullable=False)
+    participants = Column(Integer, default=0, nullable=False)
+    min_match_id = Column(Integer, nullable=True)
+    max_match_id = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BlueWarArchivedPlayer(Base):
+    """
+    아카이브로 옮긴 매치의 플레이어별 · 모드별 합계.
+    랭킹/프로필은 뜨거운 테이블 집계에 이 값을 더해서 전체 기간 전적을 낸다.
+
+    - matches/wins/losses, gap_sum/gap_count, rounds_sum/rounds_count : 프로필 모드별 요약 기준
+      (참가한 매치 전부, winner/loser 일치 여부로 승패)
+    - ranked_wins/ranked_losses, gap_plus/gap_minus : 랭킹 기준 (승자·패자가 모두 있는 매치만)
+    """
+    __tablename__ = "bluewar_archived_players"
+
+    discord_id = Column(String(32), primary_key=True)
+    mode = Column(String(20), primary_key=True)
+
+    matches = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    gap_sum = Column(Integer, default=0, nullable=False)
+    gap_count = Column(Integer, default=0, nullable=False)
+    rounds_sum = Column(Integer, default=0, nullable=False)
+    rounds_count = Column(Integer, default=0, nullable=False)
+
+    ranked_wins = Column(Integer, default=0, nullable=False)
+    ranked_losses = Column(Integer, default=0, nullable=False)
+    gap_plus = Column(Integer, default=0, nullable=False)
+    gap_minus = Column(Integer, default=0, nullable=False)
+
+    # 마지막으로 본 참가자 표시 이름 (users 에 닉네임이 없을 때)
+    last_name = Column(String(100), nullable=True)
+
 
 class AppMeta(Base):
     """앱 내부 메타데이터(단발성 마이그레이션/시드 적용 여부 등)."""
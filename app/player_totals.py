@@ -0,0 +1,201 @@
+# app/player_totals.py
+"""
+플레이어별 전체 기간 랭킹 합계 테이블(bluewar_player_totals) 유지/조회.
+
+- apply_match(): create_match 안에서 호출 (커밋은 호출한 쪽이 한다). 승자/패자 × (모드, "all") 4줄 upsert
+- sync_base():   users 의 기본 전적이 바뀌었을 때 사본(base_wins/base_losses/total_wins)을 맞춘다
+- rebuild():     bluewar_matches 전체 기록으로 다시 만든다. 아카이브까지 넣으려면 archive.all_tiers() 안에서
+- ahead()/ties(): 정렬 키 인덱스 범위 COUNT 로 "나보다 앞선 사람 수" → 랭킹 전체를 안 만들고 순위를 낸다
+
+아카이브로 옮겨도 전체 기간 합계는 그대로라서 archive.py 는 이 테이블을 건드리지 않는다.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+PT = models.BlueWarPlayerTotal
+
+BACKFILL_META_KEY = "player_totals_backfill_v1"
+ALL = "all"
+_CHUNK = 500
+
+
+def _modes(mode: str) -> List[str]:
+    # 봇이 mode="all" 로 보낸 판은 "all" 줄에 한 번만
+    return [ALL] if mode == ALL else [mode, ALL]
+
+
+def _upsert(db: Session, *, mode: str, discord_id: str, win: bool, gap: int) -> None:
+    U = models.User
+    base_wins = func.coalesce(select(U.base_wins).where(U.discord_id == discord_id).scalar_subquery(), 0)
+    base_losses = func.coalesce(select(U.base_losses).where(U.discord_id == discord_id).scalar_subquery(), 0)
+    wins = 1 if win else 0
+    gap_plus = gap if win else 0
+    gap_minus = 0 if win else gap
+    stmt = sqlite_insert(PT.__table__).values(
+        mode=mode,
+        discord_id=discord_id,
+        wins=wins,
+        losses=1 - wins,
+        gap_plus=gap_plus,
+        gap_minus=gap_minus,
+        base_wins=base_wins,
+        base_losses=base_losses,
+        matches=1,
+        net_gap=gap_plus - gap_minus,
+        total_wins=base_wins + wins,
+        updated_at=datetime.utcnow(),
+    )
+    c = PT.__table__.c
+    excluded = stmt.excluded
+    # 기본 전적은 이미 있는 줄의 사본을 그대로 둔다(바뀌면 sync_base 가 맞춘다).
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["mode", "discord_id"],
+        set_={
+            "wins": c.wins + excluded.wins,
+            "losses": c.losses + excluded.losses,
+            "gap_plus": c.gap_plus + excluded.gap_plus,
+            "gap_minus": c.gap_minus + excluded.gap_minus,
+            "matches": c.matches + excluded.matches,
+            "net_gap": c.net_gap + excluded.net_gap,
+            "total_wins": c.total_wins + excluded.wins,
+            "updated_at": excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_match(db: Session, match: models.BlueWarMatch) -> None:
+    """승자/패자가 모두 있는 매치 1건을 반영한다(랭킹과 같은 기준)."""
+    winner = match.winner_discord_id
+    loser = match.loser_discord_id
+    if not winner or not loser:
+        return
+    gap = int(match.win_gap or 0)
+    for mode in _modes(match.mode):
+        _upsert(db, mode=mode, discord_id=winner, win=True, gap=gap)
+        _upsert(db, mode=mode, discord_id=loser, win=False, gap=gap)
+
+
+_SYNC_BASE_SQL = """
+UPDATE bluewar_player_totals SET
+    base_wins = COALESCE((SELECT u.base_wins FROM users u WHERE u.discord_id = bluewar_player_totals.discord_id), 0),
+    base_losses = COALESCE((SELECT u.base_losses FROM users u WHERE u.discord_id = bluewar_player_totals.discord_id), 0),
+    total_wins = wins + COALESCE((SELECT u.base_wins FROM users u WHERE u.discord_id = bluewar_player_totals.discord_id), 0)
+"""
+
+
+def sync_base(db: Session, discord_ids: Optional[Iterable[str]] = None) -> None:
+    """
+    users 기본 전적 사본을 다시 맞춘다. discord_ids 가 None 이면 전체(시드 반영 등).
+    유저의 discord_id 를 바꿨으면 옛 값과 새 값 둘 다 넘길 것. 커밋은 호출한 쪽.
+    """
+    if discord_ids is None:
+        db.execute(text(_SYNC_BASE_SQL))
+        return
+    ids = [d for d in dict.fromkeys(discord_ids) if d]
+    stmt = text(_SYNC_BASE_SQL + " WHERE discord_id IN :ids").bindparams(bindparam("ids", expanding=True))
+    for i in range(0, len(ids), _CHUNK):
+        db.execute(stmt, {"ids": ids[i:i + _CHUNK]})
+
+
+_REBUILD_SQL = """
+WITH sides AS (
+    SELECT mode, winner_discord_id AS discord_id, 1 AS w, 0 AS l, COALESCE(win_gap, 0) AS gp, 0 AS gm
+    FROM bluewar_matches
+    WHERE winner_discord_id IS NOT NULL AND loser_discord_id IS NOT NULL
+    UNION ALL
+    SELECT mode, loser_discord_id, 0, 1, 0, COALESCE(win_gap, 0)
+    FROM bluewar_matches
+    WHERE winner_discord_id IS NOT NULL AND loser_discord_id IS NOT NULL
+),
+totals AS (
+    SELECT mode, discord_id, SUM(w) AS w, SUM(l) AS l, SUM(gp) AS gp, SUM(gm) AS gm
+    FROM sides WHERE mode != 'all' GROUP BY mode, discord_id
+    UNION ALL
+    SELECT 'all', discord_id, SUM(w), SUM(l), SUM(gp), SUM(gm)
+    FROM sides GROUP BY discord_id
+)
+INSERT INTO bluewar_player_totals
+    (mode, discord_id, wins, losses, gap_plus, gap_minus, base_wins, base_losses,
+     matches, net_gap, total_wins, updated_at)
+SELECT t.mode, t.discord_id, t.w, t.l, t.gp, t.gm, COALESCE(u.base_wins, 0), COALESCE(u.base_losses, 0),
+       t.w + t.l, t.gp - t.gm, t.w + COALESCE(u.base_wins, 0), :now
+FROM totals t LEFT JOIN users u ON u.discord_id = t.discord_id
+"""
+
+
+def rebuild(db: Session) -> int:
+    """전체 기록으로 다시 만든다. 만들어진 행 수를 돌려준다(커밋은 호출한 쪽)."""
+    db.execute(text("DELETE FROM bluewar_player_totals"))
+    db.execute(text(_REBUILD_SQL), {"now": datetime.utcnow()})
+    return int(db.execute(text("SELECT COUNT(*) FROM bluewar_player_totals")).scalar() or 0)
+
+
+def ensure_backfill(db: Session) -> bool:
+    """테이블이 처음 생겼을 때 기존 기록으로 1회 채운다. 채웠으면 True."""
+    meta = db.query(models.AppMeta).filter(models.AppMeta.key == BACKFILL_META_KEY).first()
+    if meta:
+        return False
+    rebuild(db)
+    db.add(models.AppMeta(key=BACKFILL_META_KEY, value="done"))
+    db.commit()
+    return True
+
+
+def all_rows(db: Session, mode: str) -> List[PT]:
+    """모드의 전체 줄 (랭킹 전체를 만들 때). PK 앞부분(mode) 범위 조회."""
+    return db.query(PT).filter(PT.mode == mode).all()
+
+
+def rows(db: Session, mode: str, discord_ids: Iterable[str]) -> Dict[str, PT]:
+    """요청한 플레이어들의 줄. PK 조회를 _CHUNK 명씩."""
+    ids = list(discord_ids)
+    out: Dict[str, PT] = {}
+    for i in range(0, len(ids), _CHUNK):
+        for r in db.query(PT).filter(PT.mode == mode, PT.discord_id.in_(ids[i:i + _CHUNK])):
+            out[r.discord_id] = r
+    return out
+
+
+def count(db: Session, mode: str) -> int:
+    return int(db.query(func.count()).select_from(PT).filter(PT.mode == mode).scalar() or 0)
+
+
+_AHEAD_SQL = text(
+    "SELECT"
+    " (SELECT COUNT(*) FROM bluewar_player_totals WHERE mode = :mode AND net_gap > :g)"
+    " + (SELECT COUNT(*) FROM bluewar_player_totals WHERE mode = :mode AND net_gap = :g AND total_wins > :w)"
+    " + (SELECT COUNT(*) FROM bluewar_player_totals"
+    "    WHERE mode = :mode AND net_gap = :g AND total_wins = :w AND matches > :n)"
+)
+
+
+def ahead(db: Session, row: PT) -> int:
+    """정렬 키(net_gap, total_wins, matches 내림차순)가 row 보다 앞선 줄 수. 인덱스 범위 COUNT 3번을 쿼리 1번으로."""
+    return int(
+        db.execute(_AHEAD_SQL, {"mode": row.mode, "g": row.net_gap, "w": row.total_wins, "n": row.matches}).scalar()
+        or 0
+    )
+
+
+def ties(db: Session, row: PT) -> List[str]:
+    """정렬 키가 row 와 똑같은 다른 플레이어들 (랭킹은 이름순으로 가른다)."""
+    return [
+        did
+        for (did,) in db.query(PT.discord_id).filter(
+            PT.mode == row.mode,
+            PT.net_gap == row.net_gap,
+            PT.total_wins == row.total_wins,
+            PT.matches == row.matches,
+            PT.discord_id != row.discord_id,
+        )
+    ]
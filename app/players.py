@@ -0,0 +1,160 @@
+# app/players.py
+"""
+플레이어(디스코드 ID) 단위 조회.
+
+모든 조회는 bluewar_participants(discord_id, match_id) 인덱스에서 시작해서
+bluewar_matches 는 PK 로만 붙인다. → 판 수가 수천 개여도 그 플레이어 행만 읽는다.
+(ILIKE 로 bluewar_matches 전체를 훑지 않는다)
+
+최근 매치는 match_id 기준 keyset 페이지네이션(?before=<match_id>)이다.
+match_id 는 기록 순서대로 증가하므로 finished_at 순서와 사실상 같다.
+
+아카이브로 옮긴 매치(app/archive.py)는 모드별 요약에만 합계로 더해지고,
+최근 매치 목록은 뜨거운 DB 에 남아 있는 것만 보여준다.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app import archive, models
+
+P = models.BlueWarParticipant
+M = models.BlueWarMatch
+
+
+def display_names(db: Session, discord_ids: Set[str]) -> Dict[str, str]:
+    """discord_id -> 표시 이름 (User.nickname 우선, 없으면 최근 Participant.name)."""
+    out: Dict[str, str] = {}
+    ids = [d for d in discord_ids if d]
+    if not ids:
+        return out
+    for u in db.query(models.User).filter(models.User.discord_id.in_(ids)).all():
+        if u.nickname:
+            out[u.discord_id] = u.nickname
+    missing = [d for d in ids if d not in out]
+    if missing:
+        rows = (
+            db.query(P.discord_id, P.name)
+            .filter(P.discord_id.in_(missing), P.name.isnot(None))
+            .order_by(P.id.desc())
+            .all()
+        )
+        for did, name in rows:
+            if did not in out and name:
+                out[did] = name
+    return out
+
+
+def mode_summary(db: Session, discord_id: str) -> List[Dict[str, Any]]:
+    """모드별 판 수 / 승 / 패 / 평균 승차 / 평균 라운드 (집계 쿼리 1번 + 아카이브 합계 PK 조회)."""
+    rows = (
+        db.query(
+            M.mode,
+            func.count(func.distinct(M.id)),
+            func.sum(case((M.winner_discord_id == discord_id, 1), else_=0)),
+            func.sum(case((M.loser_discord_id == discord_id, 1), else_=0)),
+            func.sum(M.win_gap),
+            func.count(M.win_gap),
+            func.sum(M.total_rounds),
+            func.count(M.total_rounds),
+        )
+        .join(P, P.match_id == M.id)
+        .filter(P.discord_id == discord_id)
+        .group_by(M.mode)
+        .order_by(M.mode.asc())
+        .all()
+    )
+    sums: Dict[str, List[int]] = {}
+    for mode, *values in rows:
+        sums[mode] = [int(v or 0) for v in values]
+    for mode, a in archive.player_totals(db, discord_id).items():
+        s = sums.setdefault(mode, [0] * 7)
+        for i, v in enumerate(
+            (a.matches, a.wins, a.losses, a.gap_sum, a.gap_count, a.rounds_sum, a.rounds_count)
+        ):
+            s[i] += int(v or 0)
+
+    out: List[Dict[str, Any]] = []
+    for mode in sorted(sums):
+        matches, wins, losses, gap_sum, gap_n, rounds_sum, rounds_n = sums[mode]
+        decided = wins + losses
+        out.append(
+            {
+                "mode": mode,
+                "matches": matches,
+                "wins": wins,
+                "losses": losses,
+                "win_rate": (wins / decided * 100.0) if decided else 0.0,
+                "avg_gap": (gap_sum / gap_n) if gap_n else None,
+                "avg_rounds": (rounds_sum / rounds_n) if rounds_n else None,
+            }
+        )
+    return out
+
+
+def recent_matches(
+    db: Session,
+    discord_id: str,
+    *,
+    before: Optional[int] = None,
+    limit: int = 20,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    최근 매치 한 페이지와 다음 페이지용 before 값을 돌려준다(더 없으면 None).
+    """
+    q = db.query(P.match_id).filter(P.discord_id == discord_id)
+    if before is not None:
+        q = q.filter(P.match_id < before)
+    # (discord_id, match_id) 인덱스만 역순으로 읽는다.
+    ids: List[int] = []
+    for (mid,) in q.order_by(P.match_id.desc()).limit(limit + 1).all():
+        if not ids or ids[-1] != mid:
+            ids.append(mid)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+    if not ids:
+        return [], None
+
+    matches = db.query(M).filter(M.id.in_(ids)).order_by(M.id.desc()).all()
+
+    # 상대 이름: 같은 매치의 다른 참가자 (연습 모드면 AI 이름)
+    opponents: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+    for p in db.query(P).filter(P.match_id.in_(ids)).order_by(P.side.asc()).all():
+        if p.discord_id == discord_id:
+            continue
+        if p.match_id not in opponents:
+            opponents[p.match_id] = (p.discord_id, p.ai_name or p.name)
+
+    names = display_names(db, {did for did, _ in opponents.values() if did})
+
+    out: List[Dict[str, Any]] = []
+    for m in matches:
+        if m.winner_discord_id == discord_id:
+            result = "W"
+        elif m.loser_discord_id == discord_id:
+            result = "L"
+        else:
+            result = "-"
+        opp_id, opp_fallback = opponents.get(m.id, (None, None))
+        if opp_id and opp_id in names:
+            opp_name = names[opp_id]
+        else:
+            opp_name = opp_fallback or opp_id or "-"
+        out.append(
+            {
+                "id": m.id,
+                "mode": m.mode,
+                "status": m.status,
+                "result": result,
+                "opponent": opp_name,
+                "opponent_id": opp_id,
+                "win_gap": m.win_gap,
+                "total_rounds": m.total_rounds,
+                "finished_at": m.finished_at,
+            }
+        )
+    return out, (ids[-1] if has_more else None)
@@ -0,0 +1,193 @@
+# app/ratelimit.py
+"""
+로그인/가입/업로드 요청 수 제한 (토큰 버킷, 워커 메모리).
+
+- 정책(policy)마다 Limiter 하나. 키(IP 나 계정)마다 버킷 [남은 토큰, 마지막 시각] 만 둔다.
+  요청이 오면 지난 시간만큼 토큰을 채우고 1개를 쓴다 → 확인은 O(1), 타이머/청소 작업 없음.
+- 키는 OrderedDict 에 최근 사용 순서로 두고, max_keys 를 넘으면 가장 오래 안 쓴 키부터 버린다.
+  (오래 안 쓴 키는 어차피 토큰이 가득 찬 상태라 버려도 결과가 같다)
+- 라우트에는 limit("member_login", account_field="discord_id") 의존성으로 붙인다.
+  라우트 dependencies 는 get_db/본문 검증보다 먼저 돌기 때문에, 막히면 DB 조회나
+  PBKDF2(verify_password) 없이 바로 429 + Retry-After 로 끝난다.
+- 계정 버킷은 계정 하나(IP 무관)에 **실패한 로그인만** 센다. 의존성은 남은 토큰만 보고(peek),
+  토큰은 라우트가 실패했을 때 login_failed(request) 로 쓴다.
+  → IP 를 바꿔 가며 한 계정을 찍는 시도도 계정 쪽에서 걸리고,
+    같은 IP 에서 여러 세션이 로그인해도(부하 테스트 등) 성공은 세지 않는다.
+  → 남이 틀린 비번으로 계정을 잠글 수는 있어서 버스트/주기를 IP 버킷보다 크게 둔다
+    (한 IP 에서 몰아치는 건 ":ip" 버킷이 먼저 막는다).
+- 값은 워커(프로세스)별이다. 워커가 N 개면 실제 허용량은 최대 N 배.
+
+정책 문자열: "이름=횟수/초" (예: "member_login:ip=20/60" → 60초에 20번, 한 번에 최대 20번)
+YUME_RATE_LIMITS 로 기본값(DEFAULT_POLICIES) 중 일부만 바꿀 수 있다.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Request, status as http_status
+
+from config import settings
+from app import metrics
+
+
+class Policy(NamedTuple):
+    burst: int      # 버킷 크기 (연속으로 허용하는 횟수)
+    period: float   # burst 개가 다시 다 차는 데 걸리는 초
+
+    @property
+    def rate(self) -> float:
+        return self.burst / self.period
+
+
+# 로그인은 한 번에 PBKDF2 21만 번이라(수십~100ms CPU) IP 쪽을 빡빡하게 둔다.
+# (":account" 는 계정별 실패 횟수. 여러 IP 합산이라 크게: 15분에 30번)
+DEFAULT_POLICIES: Dict[str, Policy] = {
+    "member_login:ip": Policy(20, 60),
+    "member_login:account": Policy(30, 900),
+    "member_register:ip": Policy(5, 600),
+    "admin_login:ip": Policy(10, 60),
+    "admin_login:account": Policy(20, 900),
+    "ingest:ip": Policy(120, 60),
+}
+
+
+def parse_policies(raw: str) -> Dict[str, Policy]:
+    """
+    "member_login:ip=20/60,ingest:ip=300/60" → 기본값에 덮어쓴 정책 표.
+    모르는 이름이나 잘못된 값은 건너뛴다.
+    """
+    out = dict(DEFAULT_POLICIES)
+    for part in (raw or "").split(","):
+        name, _, spec = part.strip().partition("=")
+        name = name.strip()
+        if name not in out:
+            continue
+        burst, _, period = spec.partition("/")
+        try:
+            policy = Policy(int(burst), float(period))
+        except ValueError:
+            continue
+        if policy.burst > 0 and policy.period > 0:
+            out[name] = policy
+    return out
+
+
+class Limiter:
+    def __init__(self, policy: Policy, max_keys: int = 10000) -> None:
+        self.policy = policy
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+        # key -> [남은 토큰, 마지막으로 채운 시각(monotonic)]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """토큰 1개를 쓴다. 통과면 0, 막히면 다음 토큰까지 남은 초."""
+        if now is None:
+            now = time.monotonic()
+        burst, rate = self.policy.burst, self.policy.rate
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[key] = [float(burst), now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / rate
+
+    def peek(self, key: str, now: Optional[float] = None) -> float:
+        """토큰을 쓰지 않고 본다. 1개 이상 남았으면 0, 아니면 다음 토큰까지 남은 초."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0.0
+            tokens = min(float(self.policy.burst), bucket[0] + (now - bucket[1]) * self.policy.rate)
+            return 0.0 if tokens >= 1.0 else (1.0 - tokens) / self.policy.rate
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_limiters: Dict[str, Limiter] = {
+    name: Limiter(policy, settings.RATE_LIMIT_MAX_KEYS)
+    for name, policy in parse_policies(settings.RATE_LIMITS).items()
+}
+
+
+def snapshot() -> Dict[str, int]:
+    """정책별 들고 있는 키 수 (/metrics)."""
+    return {name: len(limiter) for name, limiter in _limiters.items()}
+
+
+def client_ip(request: Request) -> str:
+    # nginx 뒤라면 uvicorn 이 X-Forwarded-For 로 client 를 바꿔 준다(--forwarded-allow-ips 기본 127.0.0.1).
+    return request.client.host if request.client else "unknown"
+
+
+def _reject(name: str, wait: float) -> None:
+    metrics.ratelimit_rejected.inc((name,))
+    raise HTTPException(
+        status_code=http_status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="요청이 너무 많아. 잠시 뒤에 다시 시도해줘.",
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+def check(name: str, key: str, *, consume: bool = True) -> None:
+    """name 정책으로 key 를 센다(consume=False 면 보기만). 넘으면 HTTPException(429)."""
+    limiter = _limiters.get(name)
+    if limiter is None or not key:
+        return
+    wait = limiter.hit(key) if consume else limiter.peek(key)
+    if wait > 0:
+        _reject(name, wait)
+
+
+def limit(route: str, *, account_field: Optional[str] = None) -> Callable:
+    """
+    라우트용 의존성: "<route>:ip" 로 IP 를 센다.
+    account_field 가 있으면 폼의 그 값(계정)으로 "<route>:account" 버킷이 비었는지만 보고,
+    실패 횟수는 라우트가 login_failed(request) 로 센다.
+    폼은 FastAPI 가 이미 읽어둔 걸 다시 쓰는 거라 추가 비용이 없다.
+    """
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        ip = client_ip(request)
+        check(f"{route}:ip", ip)
+        if account_field:
+            form = await request.form()
+            account = str(form.get(account_field) or "").strip().lower()
+            if account:
+                name, key = f"{route}:account", account
+                check(name, key, consume=False)
+                request.state.ratelimit_account = (name, key)
+
+    return dependency
+
+
+def login_failed(request: Request) -> None:
+    """로그인 실패 1번을 계정 버킷에 센다. 여기서는 막지 않고 다음 시도부터 429."""
+    target = getattr(request.state, "ratelimit_account", None)
+    if not target:
+        return
+    limiter = _limiters.get(target[0])
+    if limiter is not None:
+        limiter.hit(target[1])
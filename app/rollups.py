@@ -0,0 +1,286 @@
+# app/rollups.py
+"""
+대시보드용 일별 활동 롤업 (KST 하루 단위).
+
+- bluewar_daily_stats   : (day, mode) → 매치 수, 고유 참가자 수, 라운드/승차 합계
+- bluewar_daily_players : (day, mode, discord_id) → 참가 판 수 (고유 참가자 판별용)
+                          + 승/패/승차 합계 (기간·시즌 랭킹: window_totals)
+- bluewar_hourly_stats  : (day, mode, hour) → 매치 수 (시간대 히스토그램)
+
+create_match 에서 apply_match() 로 한 판씩 갱신하고(같은 트랜잭션),
+rebuild() 는 전체 기록으로 set 기반 INSERT ... SELECT 를 돌려 다시 만든다.
+
+저장된 finished_at 은 UTC(naive) 로 보고 +9시간 해서 KST 날짜/시각을 정한다.
+(ingest 와 rebuild 가 같은 규칙을 쓰도록 _kst() 와 SQL 의 '+9 hours' 를 맞춰 둘 것)
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+KST_OFFSET = timedelta(hours=9)
+
+# v2: daily_players 에 승/패/승차 컬럼이 붙어서 한 번 더 채운다.
+BACKFILL_META_KEY = "daily_rollups_backfill_v2"
+
+DS = models.BlueWarDailyStats
+DP = models.BlueWarDailyPlayer
+HS = models.BlueWarHourlyStats
+
+
+def _kst(dt: datetime) -> datetime:
+    # SQLite DateTime 은 tz 를 버리고 벽시계 값만 저장하므로, 저장될 값과 같은 기준으로 맞춘다.
+    return dt.replace(tzinfo=None) + KST_OFFSET
+
+
+def kst_day_hour(dt: datetime) -> Tuple[str, int]:
+    k = _kst(dt)
+    return k.strftime("%Y-%m-%d"), k.hour
+
+
+def kst_today() -> date:
+    return (datetime.utcnow() + KST_OFFSET).date()
+
+
+def apply_match(db: Session, match: models.BlueWarMatch, discord_ids: Iterable[str]) -> None:
+    """매치 1건을 일별 롤업에 반영한다 (커밋은 호출한 쪽)."""
+    day, hour = kst_day_hour(match.finished_at)
+    mode = match.mode
+    now = datetime.utcnow()
+
+    winner = match.winner_discord_id
+    loser = match.loser_discord_id
+    gap = match.win_gap
+
+    # 승자/패자도 참가자로 본다(참가자 목록에서 빠져 있어도 랭킹 행이 있어야 하므로).
+    new_players = 0
+    for did in sorted({d for d in (*discord_ids, winner, loser) if d}):
+        ins = sqlite_insert(DP.__table__).values(day=day, mode=mode, discord_id=did, matches=1)
+        res = db.execute(ins.on_conflict_do_nothing(index_elements=["day", "mode", "discord_id"]))
+        if res.rowcount == 1:
+            new_players += 1
+        else:
+            db.execute(
+                DP.__table__.update()
+                .where(DP.day == day, DP.mode == mode, DP.discord_id == did)
+                .values(matches=DP.matches + 1)
+            )
+
+    # 랭킹 기준(승자·패자 둘 다 있는 판)이면 승/패/승차도 더한다.
+    if winner and loser:
+        key = (DP.day == day, DP.mode == mode)
+        db.execute(
+            DP.__table__.update()
+            .where(*key, DP.discord_id == winner)
+            .values(wins=DP.wins + 1, gap_plus=DP.gap_plus + int(gap or 0))
+        )
+        db.execute(
+            DP.__table__.update()
+            .where(*key, DP.discord_id == loser)
+            .values(losses=DP.losses + 1, gap_minus=DP.gap_minus + int(gap or 0))
+        )
+
+    rounds = match.total_rounds
+    values = {
+        "day": day,
+        "mode": mode,
+        "matches": 1,
+        "players": new_players,
+        "rounds_sum": int(rounds or 0),
+        "rounds_count": 1 if rounds is not None else 0,
+        "gap_sum": int(gap or 0),
+        "gap_count": 1 if gap is not None else 0,
+        "updated_at": now,
+    }
+    stmt = sqlite_insert(DS.__table__).values(**values)
+    c = DS.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "mode"],
+        set_={
+            "matches": c.matches + stmt.excluded.matches,
+            "players": c.players + stmt.excluded.players,
+            "rounds_sum": c.rounds_sum + stmt.excluded.rounds_sum,
+            "rounds_count": c.rounds_count + stmt.excluded.rounds_count,
+            "gap_sum": c.gap_sum + stmt.excluded.gap_sum,
+            "gap_count": c.gap_count + stmt.excluded.gap_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+    hstmt = sqlite_insert(HS.__table__).values(day=day, mode=mode, hour=hour, matches=1)
+    hstmt = hstmt.on_conflict_do_update(
+        index_elements=["day", "mode", "hour"],
+        set_={"matches": HS.__table__.c.matches + 1},
+    )
+    db.execute(hstmt)
+
+
+_KST_DAY = "strftime('%Y-%m-%d', m.finished_at, '+9 hours')"
+_KST_HOUR = "CAST(strftime('%H', m.finished_at, '+9 hours') AS INTEGER)"
+
+# apply_match 와 같은 규칙: 승자·패자가 둘 다 있을 때만 랭킹 승/패
+_RANKED_WIN = "(loser_discord_id IS NOT NULL AND loser_discord_id != '')"
+_RANKED_LOSS = "(winner_discord_id IS NOT NULL AND winner_discord_id != '')"
+
+_REBUILD_SQL = [
+    "DELETE FROM bluewar_daily_players",
+    "DELETE FROM bluewar_daily_stats",
+    "DELETE FROM bluewar_hourly_stats",
+    f"""
+    INSERT INTO bluewar_daily_players (day, mode, discord_id, matches, wins, losses, gap_plus, gap_minus)
+    SELECT {_KST_DAY}, m.mode, x.discord_id, COUNT(DISTINCT m.id),
+           SUM(x.win), SUM(x.loss), SUM(x.gap_plus), SUM(x.gap_minus)
+    FROM (
+        SELECT match_id, discord_id, 0 AS win, 0 AS loss, 0 AS gap_plus, 0 AS gap_minus
+        FROM bluewar_participants
+        WHERE discord_id IS NOT NULL AND discord_id != ''
+        UNION ALL
+        SELECT id, winner_discord_id, {_RANKED_WIN}, 0, {_RANKED_WIN} * COALESCE(win_gap, 0), 0
+        FROM bluewar_matches
+        WHERE winner_discord_id IS NOT NULL AND winner_discord_id != ''
+        UNION ALL
+        SELECT id, loser_discord_id, 0, {_RANKED_LOSS}, 0, {_RANKED_LOSS} * COALESCE(win_gap, 0)
+        FROM bluewar_matches
+        WHERE loser_discord_id IS NOT NULL AND loser_discord_id != ''
+    ) x
+    JOIN bluewar_matches m ON m.id = x.match_id
+    GROUP BY 1, 2, 3
+    """,
+    f"""
+    INSERT INTO bluewar_daily_stats
+        (day, mode, matches, players, rounds_sum, rounds_count, gap_sum, gap_count, updated_at)
+    SELECT d.day, d.mode, d.matches,
+           COALESCE((SELECT COUNT(*) FROM bluewar_daily_players dp
+                     WHERE dp.day = d.day AND dp.mode = d.mode), 0),
+           d.rounds_sum, d.rounds_count, d.gap_sum, d.gap_count, :now
+    FROM (
+        SELECT {_KST_DAY} AS day, m.mode AS mode, COUNT(*) AS matches,
+               COALESCE(SUM(m.total_rounds), 0) AS rounds_sum, COUNT(m.total_rounds) AS rounds_count,
+               COALESCE(SUM(m.win_gap), 0) AS gap_sum, COUNT(m.win_gap) AS gap_count
+        FROM bluewar_matches m
+        GROUP BY 1, 2
+    ) d
+    """,
+    f"""
+    INSERT INTO bluewar_hourly_stats (day, mode, hour, matches)
+    SELECT {_KST_DAY}, m.mode, {_KST_HOUR}, COUNT(*)
+    FROM bluewar_matches m
+    GROUP BY 1, 2, 3
+    """,
+]
+
+
+def rebuild(db: Session) -> int:
+    """전체 기록으로 롤업을 다시 만든다. daily_stats 행 수를 돌려준다(커밋은 호출한 쪽)."""
+    for sql in _REBUILD_SQL:
+        db.execute(text(sql), {"now": datetime.utcnow()})
+    return int(db.execute(text("SELECT COUNT(*) FROM bluewar_daily_stats")).scalar() or 0)
+
+
+def ensure_backfill(db: Session) -> bool:
+    """롤업 테이블이 처음 생겼을 때 기존 기록으로 1회 채운다. 채웠으면 True."""
+    meta = db.query(models.AppMeta).filter(models.AppMeta.key == BACKFILL_META_KEY).first()
+    if meta:
+        return False
+    rebuild(db)
+    db.add(models.AppMeta(key=BACKFILL_META_KEY, value="done"))
+    db.commit()
+    return True
+
+
+# ============================
+#   대시보드 조회
+# ============================
+
+
+def totals_by_mode(db: Session) -> Dict[str, int]:
+    """모드별 누적 매치 수 (daily_stats 전체 합: 하루 × 모드 수 만큼의 행만 읽는다)."""
+    rows = db.query(DS.mode, func.sum(DS.matches)).group_by(DS.mode).all()
+    return {mode: int(n or 0) for mode, n in rows}
+
+
+def daily_series(db: Session, days: int = 30) -> List[Dict[str, Any]]:
+    """최근 days 일(KST) 일별 추이. 매치가 없는 날도 0 으로 채운다."""
+    today = kst_today()
+    start = today - timedelta(days=days - 1)
+    rows = db.query(DS).filter(DS.day >= start.isoformat()).all()
+
+    by_day: Dict[str, Dict[str, Any]] = {}
+    for i in range(days):
+        d = (start + timedelta(days=i)).isoformat()
+        by_day[d] = {
+            "day": d,
+            "matches": 0,
+            "pvp_matches": 0,
+            "pvp_players": 0,
+            "rounds_sum": 0,
+            "rounds_count": 0,
+            "gap_sum": 0,
+            "gap_count": 0,
+        }
+    for r in rows:
+        out = by_day.get(r.day)
+        if out is None:
+            continue
+        out["matches"] += int(r.matches)
+        if r.mode == "pvp":
+            out["pvp_matches"] += int(r.matches)
+            out["pvp_players"] += int(r.players)
+        out["rounds_sum"] += int(r.rounds_sum)
+        out["rounds_count"] += int(r.rounds_count)
+        out["gap_sum"] += int(r.gap_sum)
+        out["gap_count"] += int(r.gap_count)
+
+    series = list(by_day.values())
+    for s in series:
+        s["avg_rounds"] = (s["rounds_sum"] / s["rounds_count"]) if s["rounds_count"] else None
+        s["avg_gap"] = (s["gap_sum"] / s["gap_count"]) if s["gap_count"] else None
+    return series
+
+
+def hour_histogram(db: Session, days: int = 30) -> List[int]:
+    """최근 days 일 동안 시간대(KST 0~23시)별 매치 수."""
+    start = kst_today() - timedelta(days=days - 1)
+    hist = [0] * 24
+    rows = (
+        db.query(HS.hour, func.sum(HS.matches))
+        .filter(HS.day >= start.isoformat())
+        .group_by(HS.hour)
+        .all()
+    )
+    for hour, n in rows:
+        if hour is not None and 0 <= int(hour) < 24:
+            hist[int(hour)] = int(n or 0)
+    return hist
+
+
+# ============================
+#   기간 / 시즌 랭킹
+# ============================
+
+
+def window_totals(db: Session, mode: str, start: date, end: date) -> List[Tuple[str, int, int, int, int]]:
+    """
+    [start, end) (KST 날짜) 동안 플레이어별 (discord_id, wins, losses, gap_plus, gap_minus).
+    mode="all" 이면 모든 모드 합. 랭킹 기준 판이 하나도 없는 플레이어는 빠진다.
+    매치 테이블이 아니라 일별 행(플레이어 × 날짜 수 만큼)만 더한다.
+    """
+    q = db.query(
+        DP.discord_id,
+        func.sum(DP.wins),
+        func.sum(DP.losses),
+        func.sum(DP.gap_plus),
+        func.sum(DP.gap_minus),
+    ).filter(DP.day >= start.isoformat(), DP.day < end.isoformat())
+    if mode != "all":
+        q = q.filter(DP.mode == mode)
+    q = q.group_by(DP.discord_id).having(func.sum(DP.wins) + func.sum(DP.losses) > 0)
+    return [(did, int(w or 0), int(lo or 0), int(gp or 0), int(gm or 0)) for did, w, lo, gp, gm in q.all()]
@@ -4,14 +4,14 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
-from app import models
+from app import generations, models
 from app.dependencies import get_current_admin_user, get_db
+from app.streaming import BATCH_SIZE, iter_with_session, stream_template
+from app.templating import templates
 
 router = APIRouter(prefix="/admin/members", tags=["admin-members"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/")
@@ -20,8 +20,13 @@ def members_page(
     db: Session = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    members = db.query(models.MemberUser).order_by(models.MemberUser.created_at.desc()).all()
-    return templates.TemplateResponse(
+    members = iter_with_session(
+        lambda s: s.query(models.MemberUser)
+        .order_by(models.MemberUser.created_at.desc())
+        .yield_per(BATCH_SIZE)
+    )
+    return stream_template(
+        templates,
         "admin_members.html",
         {"request": request, "members": members},
     )
@@ -38,5 +43,6 @@ def set_admin(
     target = db.query(models.MemberUser).filter(models.MemberUser.discord_id == discord_id).first()
     if target:
         target.is_admin = (make_admin == "1")
+        generations.bump(db, generations.MEMBERS)
         db.commit()
     return RedirectResponse(url="/admin/members/", status_code=303)
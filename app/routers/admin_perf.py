@@ -0,0 +1,102 @@
+# app/routers/admin_perf.py
+"""관리자 전용 성능 점검 페이지/JSON."""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+
+from app import columnar, compression, maintenance
+from app.dependencies import get_current_admin_user, get_db
+from app.slowlog import slowlog
+from app.templating import templates
+
+router = APIRouter(prefix="/admin/perf", tags=["admin-perf"])
+
+
+@router.get("/compression")
+def compression_stats(_admin=Depends(get_current_admin_user)):
+    """라우트별 압축 효과(절약 바이트)와 압축에 쓴 CPU 시간. 워커(프로세스)별 값이다."""
+    return {
+        "brotli_available": compression.brotli is not None,
+        "routes": compression.stats.snapshot(),
+    }
+
+
+@router.get("/maintenance")
+def maintenance_status(_admin=Depends(get_current_admin_user)):
+    """DB 정비 작업 상태. 잠금을 잡은 워커에서만 leader=True 이고 실행 기록이 쌓인다."""
+    s = maintenance.scheduler
+    if s is None:
+        return {"enabled": False, "jobs": []}
+    return {"enabled": True, "leader": s.is_leader, "pid": os.getpid(), "jobs": s.status()}
+
+
+@router.get("/columnar")
+def columnar_analytics(
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+    mode: str = Query(default="all", description="all|pvp|practice"),
+    days: int = Query(default=0, ge=0, le=3650, description="최근 N 일 (0 이면 전체)"),
+    limit: int = Query(default=20, ge=1, le=200),
+):
+    """
+    NumPy 매치 스냅샷(app/columnar.py)으로 즉석 집계. 워커(프로세스)별 스냅샷이다.
+    상위 플레이어 / 승차 분포 / KST 일별 매치 수와 각각 걸린 시간(ms).
+    """
+    if not columnar.available():
+        return {"available": False}
+    t0 = time.perf_counter()
+    cols = columnar.snapshot(db)
+    t1 = time.perf_counter()
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+    m = cols.mask(mode=mode, since=since)
+    top = cols.top_players(m, limit=limit)
+    t2 = time.perf_counter()
+    gaps = cols.gap_histogram(m)
+    daily = cols.daily_counts(m)
+    t3 = time.perf_counter()
+    return {
+        **columnar.status(),
+        "selected": int(m.sum()),
+        "timings_ms": {
+            "snapshot": round((t1 - t0) * 1000, 2),
+            "top_players": round((t2 - t1) * 1000, 2),
+            "gap_and_daily": round((t3 - t2) * 1000, 2),
+        },
+        "top_players": top,
+        "gap_histogram": gaps,
+        "daily_matches": daily,
+    }
+
+
+@router.get("/slow-queries", response_class=HTMLResponse)
+def slow_queries(
+    request: Request,
+    sort: str = "total",
+    _admin=Depends(get_current_admin_user),
+):
+    """느린 쿼리 모양별 누적 시간/최대 시간/EXPLAIN QUERY PLAN. 워커(프로세스)별 값이다."""
+    if sort not in {"total", "max", "count"}:
+        sort = "total"
+    return templates.TemplateResponse(
+        "admin_slow_queries.html",
+        {
+            "request": request,
+            "rows": slowlog.worst(limit=50, sort=sort),
+            "sort": sort,
+            "threshold_ms": slowlog.threshold_ms,
+            "enabled": slowlog.enabled,
+        },
+    )
+
+
+@router.post("/slow-queries/clear")
+def slow_queries_clear(_admin=Depends(get_current_admin_user)):
+    slowlog.clear()
+    return RedirectResponse(url="/admin/perf/slow-queries", status_code=303)
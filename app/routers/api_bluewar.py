@@ -1,15 +1,17 @@
 # app/routers/api_bluewar.py
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from config import settings
 from app.database import get_db
-from app import models
+from app import events, generations, head_to_head, metrics, models, player_totals, ratelimit, rollups, words
+from app.routers.ranking import cached_ranking, peek_ranking, ranked_rows
 
 router = APIRouter(
     prefix="/bluewar",
@@ -77,6 +79,17 @@ class BlueWarMatchIn(BaseModel):
     participants: List[BlueWarParticipantIn]
 
 
+# 한 번에 물어볼 수 있는 플레이어 수
+MAX_STATS_IDS = 500
+# 캐시가 낡았을 때 이 수까지는 한 명씩 순위를 내고(ranked_rows), 넘으면 랭킹 전체를 만든다(그게 더 싸다)
+RANK_LOOKUP_MAX_IDS = 50
+
+
+class PlayerStatsIn(BaseModel):
+    discord_ids: List[str]
+    mode: str = "pvp"
+
+
 # ============================
 #   엔드포인트
 # ============================
@@ -84,7 +97,8 @@ class BlueWarMatchIn(BaseModel):
 
 @router.post(
     "/matches",
-    dependencies=[Depends(verify_api_token)],
+    # 토큰 확인보다 먼저 센다(토큰 맞추기 시도도 같이 막힌다).
+    dependencies=[Depends(ratelimit.limit("ingest")), Depends(verify_api_token)],
 )
 async def create_match(
     data: BlueWarMatchIn,
@@ -127,6 +141,8 @@ async def create_match(
     db.flush()  # match.id 확보용
 
     # 2) 참가자 정보 저장
+    users_changed = False
+    names: Dict[str, str] = {}  # 실시간 알림용 표시 이름
     for p in data.participants:
         # discord_id 가 있으면 users 테이블 upsert + 연결
         user_obj = None
@@ -146,10 +162,17 @@ async def create_match(
                 )
                 db.add(user_obj)
                 db.flush()
+                users_changed = True
             else:
                 # 닉네임이 비어 있을 때만 채우기
                 if (not user_obj.nickname) and p.name:
                     user_obj.nickname = p.name
+                    users_changed = True
+
+        if p.discord_id:
+            display = (user_obj.nickname if user_obj is not None else None) or p.name
+            if display:
+                names[p.discord_id] = display
 
         participant = models.BlueWarParticipant(
             match=match,
@@ -164,7 +187,198 @@ async def create_match(
         )
         db.add(participant)
 
-    db.commit()
+    # 3) 미리 집계해 둔 테이블 갱신 (같은 트랜잭션)
+    head_to_head.apply_match(db, match)
+    player_totals.apply_match(db, match)
+    rollups.apply_match(db, match, [p.discord_id for p in data.participants if p.discord_id])
+    words.apply_match(db, match)
+
+    # 4) 세대 번호 (다른 워커의 캐시 무효화용, 같은 트랜잭션)
+    if users_changed:
+        generations.bump(db, generations.MATCHES, generations.USERS)
+    else:
+        generations.bump(db, generations.MATCHES)
+
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        metrics.ingest_total.inc((mode, "error"))
+        raise
     db.refresh(match)
 
+    metrics.ingest_total.inc((mode, "ok"))
+    metrics.ingest_participants.inc((mode,), len(data.participants))
+
+    # 5) 커밋된 뒤에만 알린다 (열려 있는 /bluewar/events 연결들)
+    events.broker.publish(events.match_event(match, names, len(data.participants)))
+
     return {"ok": True, "match_id": match.id}
+
+
+@router.get(
+    "/h2h/{player_id}/{opponent_id}",
+    dependencies=[Depends(verify_api_token)],
+)
+def get_head_to_head(
+    player_id: str,
+    opponent_id: str,
+    mode: str = "pvp",
+    db: Session = Depends(get_db),
+):
+    """
+    "나 vs X" 상대 전적 (봇용). bluewar_head_to_head PK 조회 1번.
+    mode: pvp | practice | all
+    """
+    mode = (mode or "pvp").strip().lower()
+    return head_to_head.lookup(db, player_id.strip(), opponent_id.strip(), mode)
+
+
+@router.post(
+    "/players/stats",
+    dependencies=[Depends(verify_api_token)],
+)
+def get_player_stats(
+    data: PlayerStatsIn,
+    db: Session = Depends(get_db),
+):
+    """
+    여러 플레이어 전적을 한 번에 (봇용, /ranking/ 과 같은 집계·정렬).
+
+    - 워커 캐시(cached_ranking)가 최신이면 app_meta 조회 1번 + 메모리 조회로 끝난다.
+    - 새 매치로 캐시가 낡았으면 랭킹 전체를 다시 만들지 않고 bluewar_player_totals 에서
+      그 사람들 줄 + 정렬 키 인덱스 COUNT 로 순위만 낸다(ranked_rows). 전체 재계산은 /ranking/ 이 볼 때.
+      (RANK_LOOKUP_MAX_IDS 명보다 많이 물으면 랭킹 전체를 만드는 쪽이 싸서 cached_ranking)
+    - 랭킹에 없는(매치 기록이 없는) 플레이어는 users 의 기본 전적만, rank 는 null.
+    - 요청 순서대로, 중복은 한 번만. 모르는 discord_id 는 found=false.
+    """
+    mode = (data.mode or "pvp").strip().lower()
+    if mode not in {"pvp", "practice", "all"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="mode must be pvp|practice|all")
+
+    ids = [d for d in dict.fromkeys((d or "").strip() for d in data.discord_ids) if d]
+    if len(ids) > MAX_STATS_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"too many discord_ids (max {MAX_STATS_IDS})",
+        )
+
+    ranking = peek_ranking(db, mode)
+    if ranking is None and len(ids) > RANK_LOOKUP_MAX_IDS:
+        ranking = cached_ranking(db, mode)
+    if ranking is not None:
+        by_id = ranking.by_id
+        ranked_players = len(ranking.rows)
+    else:
+        by_id = ranked_rows(db, mode, ids)
+        ranked_players = player_totals.count(db, mode)
+
+    unranked = [d for d in ids if d not in by_id]
+    users: Dict[str, models.User] = {}
+    if unranked:
+        users = {
+            u.discord_id: u
+            for u in db.query(models.User).filter(models.User.discord_id.in_(unranked)).all()
+        }
+
+    players = []
+    for did in ids:
+        row = by_id.get(did)
+        if row is not None:
+            players.append(
+                {
+                    "discord_id": did,
+                    "found": True,
+                    "name": row["name"],
+                    "rank": row["rank"],
+                    "matches": row["matches"],
+                    "wins": row["wins"],
+                    "losses": row["losses"],
+                    "base_wins": row["base_wins"],
+                    "base_losses": row["base_losses"],
+                    "total_wins": row["total_wins"],
+                    "total_losses": row["total_losses"],
+                    "win_rate": round(row["win_rate"], 1),
+                    "net_gap": row["net_gap"],
+                }
+            )
+            continue
+
+        u = users.get(did)
+        base_wins = int(u.base_wins or 0) if u else 0
+        base_losses = int(u.base_losses or 0) if u else 0
+        total = base_wins + base_losses
+        players.append(
+            {
+                "discord_id": did,
+                "found": u is not None,
+                "name": (u.nickname or did) if u else None,
+                "rank": None,
+                "matches": 0,
+                "wins": 0,
+                "losses": 0,
+                "base_wins": base_wins,
+                "base_losses": base_losses,
+                "total_wins": base_wins,
+                "total_losses": base_losses,
+                "win_rate": round(base_wins / total * 100.0, 1) if total else 0.0,
+                "net_gap": 0,
+            }
+        )
+
+    # 값이 전부 str/int/float/None 이라 jsonable_encoder 를 건너뛴다(수백 명이면 그게 제일 느리다).
+    return JSONResponse({"mode": mode, "ranked_players": ranked_players, "players": players})
+
+
+@router.get(
+    "/word-stats",
+    dependencies=[Depends(verify_api_token)],
+)
+def get_word_stats(
+    mode: str = "pvp",
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    """
+    많이 쓴 단어 / 많이 쓴 첫 단어(+ 시작한 사람 승률) TOP N (봇용). bluewar_word_stats 만 읽는다.
+    mode: pvp | practice | all
+    """
+    mode = (mode or "pvp").strip().lower()
+    if mode not in {"pvp", "practice", "all"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="mode must be pvp|practice|all")
+    limit = max(1, min(int(limit), 100))
+    return {
+        "mode": mode,
+        "top_words": words.top_words(db, mode, limit),
+        "top_openings": words.top_openings(db, mode, limit),
+    }
+
+
+@router.get(
+    "/word-stats/{word}",
+    dependencies=[Depends(verify_api_token)],
+)
+def get_word(
+    word: str,
+    mode: str = "pvp",
+    limit: int = 20,
+    before: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    단어 하나: 통계 + 쓴 매치(최근 것부터 매치당 1줄, 마지막 match_id 를 before 로 다음 페이지).
+    단어 역색인 PK 범위 조회.
+    """
+    mode = (mode or "pvp").strip().lower()
+    if mode not in {"pvp", "practice", "all"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="mode must be pvp|practice|all")
+    normalized = words.normalize(word)
+    if not normalized:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="not a word")
+    limit = max(1, min(int(limit), 200))
+    return {
+        "mode": mode,
+        "word": normalized,
+        "stats": words.word_stats(db, normalized, mode),
+        "matches": words.matches_with(db, normalized, mode, limit=limit, before_id=before),
+    }
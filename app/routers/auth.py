@@ -2,19 +2,18 @@
 
 from typing import Optional, Dict, Any
 
-from fastapi import APIRouter, Form, Request
+from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 
 from config import settings  # /opt/yume-web/config.py 에서 settings 사용
+from app import ratelimit
+from app.templating import templates
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
-
 
 def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
     """세션에서 현재 로그인한 유저 정보 조회"""
@@ -40,7 +39,7 @@ def login_form(request: Request):
     )
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(ratelimit.limit("admin_login", account_field="username"))])
 async def login_submit(
     request: Request,
     username: str = Form(...),
@@ -61,6 +60,7 @@ async def login_submit(
         return RedirectResponse(url="/dashboard/", status_code=303)
 
     # 실패 시 다시 로그인 폼 + 에러 메시지
+    ratelimit.login_failed(request)
     return templates.TemplateResponse(
         "login.html",
         {
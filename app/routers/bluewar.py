@@ -1,17 +1,21 @@
 # app/routers/bluewar.py
 from __future__ import annotations
 
+import asyncio
+import logging
 import math
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status as http_status
+from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlalchemy import func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
+from config import settings
 from app.dependencies import get_db, get_current_member_or_admin
-from app import models
+from app import archive, events, head_to_head, metrics, models, players
+from app.etag import etag_matches, not_modified, page_etag, with_etag
+from app.templating import templates
 
 
 router = APIRouter(
@@ -19,7 +23,57 @@ router = APIRouter(
     tags=["bluewar"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
+logger = logging.getLogger("yume.bluewar")
+
+
+class MatchSource(NamedTuple):
+    db: Session
+    archive: Optional[models.BlueWarArchive]
+
+
+def get_match_source(
+    season_id: str = Query(default="", alias="archive", description="아카이브 시즌 ID (비우면 최근 기록)"),
+    db: Session = Depends(get_db),
+) -> Iterator[MatchSource]:
+    """
+    매치/참가자 행을 읽을 세션. 기본은 메인(뜨거운) DB, ?archive=<season_id> 면 그 시즌 파일(읽기 전용).
+    users 같은 나머지 테이블은 항상 메인 세션(get_db)으로 읽는다.
+    """
+    season_id = (season_id or "").strip()
+    if not season_id:
+        yield MatchSource(db, None)
+        return
+    arch = archive.get(db, season_id)
+    if arch is None:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="archive not found")
+    try:
+        with archive.open_session(settings.ARCHIVE_DIR, arch) as adb:
+            yield MatchSource(adb, arch)
+    except FileNotFoundError:
+        logger.error("archive file missing: %s", arch.file)
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="archive file missing")
+
+
+def _find_archived_match(
+    db: Session, match_id: int
+) -> Tuple[Optional[models.BlueWarMatch], List[models.BlueWarParticipant], Optional[models.BlueWarArchive]]:
+    """메인에 없는 매치를 match_id 범위가 맞는 아카이브에서 찾는다(세션을 닫아도 읽을 수 있게 다 읽어 둔다)."""
+    for arch in archive.find_for_match(db, match_id):
+        try:
+            with archive.open_session(settings.ARCHIVE_DIR, arch) as adb:
+                match = adb.get(models.BlueWarMatch, match_id)
+                if match is None:
+                    continue
+                parts = (
+                    adb.query(models.BlueWarParticipant)
+                    .filter(models.BlueWarParticipant.match_id == match_id)
+                    .order_by(models.BlueWarParticipant.side.asc())
+                    .all()
+                )
+                return match, parts, arch
+        except FileNotFoundError:
+            logger.error("archive file missing: %s", arch.file)
+    return None, [], None
 
 
 def _resolve_display_name(
@@ -38,10 +92,39 @@ def _resolve_display_name(
     return discord_id
 
 
+def filter_matches(query, *, mode: str = "all", status: str = "all", q: str = ""):
+    """
+    매치 목록 필터(mode/status/검색어). 목록 페이지와 내보내기(/admin/export)가 같이 쓴다.
+    Query 든 select() 든 .filter() 가 있으면 된다.
+    """
+    mode = (mode or "all").strip().lower()
+    if mode in ("pvp", "practice"):
+        query = query.filter(models.BlueWarMatch.mode == mode)
+
+    status = (status or "all").strip().lower()
+    if status in ("finished", "aborted", "running"):
+        query = query.filter(models.BlueWarMatch.status == status)
+
+    q = (q or "").strip()
+    if q:
+        like = f"%{q}%"
+        query = query.filter(
+            or_(
+                models.BlueWarMatch.starter_discord_id.ilike(like),
+                models.BlueWarMatch.winner_discord_id.ilike(like),
+                models.BlueWarMatch.loser_discord_id.ilike(like),
+                models.BlueWarMatch.note.ilike(like),
+                models.BlueWarMatch.review_log.ilike(like),
+            )
+        )
+    return query
+
+
 @router.get("/matches/", response_class=HTMLResponse)
 def list_bluewar_matches(
     request: Request,
     db: Session = Depends(get_db),
+    source: MatchSource = Depends(get_match_source),
     viewer=Depends(get_current_member_or_admin),
     mode: str = Query(default="all", description="all|pvp|practice"),
     status: str = Query(default="all", description="all|finished|aborted|running"),
@@ -56,11 +139,18 @@ def list_bluewar_matches(
     - 검색: starter/winner/loser discord_id, note, review_log
     - 페이지네이션
     - 참가자 수 표시
+    - 기본은 최근(뜨거운) 기록만. ?archive=<season_id> 면 그 시즌 아카이브 파일에서 같은 조건으로 찾는다.
+    - 새 매치/유저 변경이 없으면 쿼리 전에 304 (ETag)
     """
+    mdb = source.db
+
+    etag = page_etag(request, db, "bluewar_matches")
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
     # 참가자 수 서브쿼리(매치 1건당 1row)
     pcount_subq = (
-        db.query(
+        mdb.query(
             models.BlueWarParticipant.match_id.label("match_id"),
             func.count(models.BlueWarParticipant.id).label("pcount"),
         )
@@ -69,7 +159,7 @@ def list_bluewar_matches(
     )
 
     query = (
-        db.query(
+        mdb.query(
             models.BlueWarMatch,
             func.coalesce(pcount_subq.c.pcount, 0).label("pcount"),
         )
@@ -77,25 +167,9 @@ def list_bluewar_matches(
     )
 
     mode = (mode or "all").strip().lower()
-    if mode in ("pvp", "practice"):
-        query = query.filter(models.BlueWarMatch.mode == mode)
-
     status = (status or "all").strip().lower()
-    if status in ("finished", "aborted", "running"):
-        query = query.filter(models.BlueWarMatch.status == status)
-
     q = (q or "").strip()
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                models.BlueWarMatch.starter_discord_id.ilike(like),
-                models.BlueWarMatch.winner_discord_id.ilike(like),
-                models.BlueWarMatch.loser_discord_id.ilike(like),
-                models.BlueWarMatch.note.ilike(like),
-                models.BlueWarMatch.review_log.ilike(like),
-            )
-        )
+    query = filter_matches(query, mode=mode, status=status, q=q)
 
     query = query.order_by(
         models.BlueWarMatch.created_at.desc().nullslast(),
@@ -132,7 +206,7 @@ def list_bluewar_matches(
     if discord_ids:
         # 같은 discord_id가 여러 번 있을 수 있으니, 최신(큰 id) 것을 우선으로 잡는다.
         parts = (
-            db.query(models.BlueWarParticipant)
+            mdb.query(models.BlueWarParticipant)
             .filter(models.BlueWarParticipant.discord_id.in_(list(discord_ids)))
             .order_by(models.BlueWarParticipant.id.desc())
             .all()
@@ -177,7 +251,7 @@ def list_bluewar_matches(
             }
         )
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "bluewar/matches.html",
         {
             "request": request,
@@ -190,8 +264,13 @@ def list_bluewar_matches(
             "mode": mode,
             "status": status,
             "q": q,
+            "archive_id": source.archive.season_id if source.archive else "",
+            "archives": archive.list_archives(db),
+            # 첫 페이지 + 최근 기록 + 검색어 없음일 때만 새 매치를 실시간으로 끼워 넣는다(/bluewar/events).
+            "live": settings.SSE_ENABLED and page == 1 and not q and source.archive is None,
         },
     )
+    return with_etag(response, etag)
 
 
 @router.get("/matches/{match_id}", response_class=HTMLResponse)
@@ -202,6 +281,19 @@ def bluewar_match_detail(
     viewer=Depends(get_current_member_or_admin),
 ):
     match = db.query(models.BlueWarMatch).filter(models.BlueWarMatch.id == match_id).first()
+    archived_in: Optional[models.BlueWarArchive] = None
+    if match:
+        # p.user 를 참가자마다 lazy load 하지 않도록 같이 읽어 온다.
+        participants = (
+            db.query(models.BlueWarParticipant)
+            .options(joinedload(models.BlueWarParticipant.user))
+            .filter(models.BlueWarParticipant.match_id == match_id)
+            .order_by(models.BlueWarParticipant.side.asc())
+            .all()
+        )
+    else:
+        # 아카이브 파일에는 users 가 없으므로 p.user 는 쓰지 않고 아래 users_by_discord 로만 이름을 찾는다.
+        match, participants, archived_in = _find_archived_match(db, match_id)
     if not match:
         return templates.TemplateResponse(
             "bluewar/match_detail.html",
@@ -209,17 +301,14 @@ def bluewar_match_detail(
             status_code=404,
         )
 
-    participants = (
-        db.query(models.BlueWarParticipant)
-        .filter(models.BlueWarParticipant.match_id == match_id)
-        .order_by(models.BlueWarParticipant.side.asc())
-        .all()
-    )
+    def linked_user(p: models.BlueWarParticipant) -> Optional[models.User]:
+        return p.user if archived_in is None else None
 
     # discord_id -> 표시 이름 매핑 (users 테이블 우선)
     discord_ids: Set[str] = set()
     for p in participants:
-        if p.discord_id:
+        u = linked_user(p)
+        if p.discord_id and not (u and u.nickname):
             discord_ids.add(p.discord_id)
     users_by_discord: Dict[str, models.User] = {}
     if discord_ids:
@@ -227,8 +316,9 @@ def bluewar_match_detail(
             users_by_discord[u.discord_id] = u
 
     def resolve_name(p: models.BlueWarParticipant) -> str:
-        if p.user_id and p.user and p.user.nickname:
-            return p.user.nickname
+        u = linked_user(p)
+        if p.user_id and u and u.nickname:
+            return u.nickname
         if p.discord_id and p.discord_id in users_by_discord and users_by_discord[p.discord_id].nickname:
             return users_by_discord[p.discord_id].nickname
         if p.name:
@@ -260,6 +350,111 @@ def bluewar_match_detail(
             "match": match,
             "participants": view_parts,
             "is_admin": is_admin,
+            "archived_in": archived_in,
             "error": None,
         },
     )
+
+
+@router.get("/players/{discord_id}", response_class=HTMLResponse)
+def bluewar_player_profile(
+    discord_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    viewer=Depends(get_current_member_or_admin),
+    before: Optional[int] = Query(default=None, ge=1, description="이 match_id 보다 이전 매치부터"),
+    page_size: int = Query(default=20, ge=5, le=100),
+):
+    """
+    플레이어 프로필: 모드별 전적 요약 + 최근 매치(keyset 페이지네이션).
+    """
+    discord_id = (discord_id or "").strip()
+    summary = players.mode_summary(db, discord_id)
+    recent, next_before = players.recent_matches(db, discord_id, before=before, limit=page_size)
+
+    user = db.query(models.User).filter(models.User.discord_id == discord_id).first()
+    if not summary and user is None:
+        return templates.TemplateResponse(
+            "bluewar/player.html",
+            {"request": request, "player": None, "error": "플레이어를 찾을 수 없어."},
+            status_code=404,
+        )
+
+    # 아카이브로 옮긴 판이 있으면 최근 매치 목록 끝에 시즌 보관함 링크를 단다.
+    archived = sum(int(a.matches) for a in archive.player_totals(db, discord_id).values())
+    archives = archive.list_archives(db) if archived else []
+
+    versus = head_to_head.opponents(db, discord_id, limit=15)
+    names = players.display_names(db, {discord_id} | {v["opponent_id"] for v in versus})
+    for v in versus:
+        v["opponent_name"] = names.get(v["opponent_id"], v["opponent_id"])
+    name = names.get(discord_id, discord_id)
+
+    return templates.TemplateResponse(
+        "bluewar/player.html",
+        {
+            "request": request,
+            "player": {
+                "discord_id": discord_id,
+                "name": name,
+                "base_wins": int(user.base_wins) if user else 0,
+                "base_losses": int(user.base_losses) if user else 0,
+            },
+            "summary": summary,
+            "versus": versus,
+            "recent": recent,
+            "before": before,
+            "next_before": next_before,
+            "page_size": page_size,
+            "archives": archives,
+            "error": None,
+        },
+    )
+
+
+# 라우트 템플릿 그대로 (진행 중 요청 수 / 응답 시간 히스토그램에서 뺀다)
+metrics.LONG_LIVED_ROUTES.add("/bluewar/events")
+
+
+@router.get("/events")
+async def match_events(
+    request: Request,
+    _viewer=Depends(get_current_member_or_admin),
+):
+    """
+    새 매치 알림 (Server-Sent Events). 매치 목록 / 랭킹 페이지가 열어 두고 스스로 고친다.
+    연결 하나에 DB 조회는 없다(app/events.py 의 프로세스 내 pub/sub 에서 받기만 한다).
+    """
+    if not settings.SSE_ENABLED:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="events disabled")
+
+    raw_last = (request.headers.get("last-event-id") or "").strip()
+    try:
+        sub = events.broker.subscribe(int(raw_last) if raw_last.isdigit() else None)
+    except events.TooManySubscribers:
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="too many subscribers",
+            headers={"Retry-After": "30"},
+        )
+
+    async def stream():
+        try:
+            # 끊기면 브라우저가 5초 뒤에 Last-Event-ID 를 달고 다시 붙는다.
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    data = await asyncio.wait_for(sub.queue.get(), timeout=settings.SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # 프록시가 idle 연결을 끊지 않게 + 죽은 연결 정리
+                    yield ": ping\n\n"
+                    continue
+                yield data
+        finally:
+            events.broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
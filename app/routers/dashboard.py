@@ -2,18 +2,22 @@
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app import rollups
 from app.dependencies import get_db, get_current_admin_user
 from app.models import User, BlueWarMatch
+from app.etag import etag_matches, not_modified, page_etag, with_etag
+from app.templating import templates
 
 router = APIRouter(
     prefix="/dashboard",
     tags=["dashboard"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
+# 대시보드 차트 구간 (KST 기준 일 수)
+DAYS = 30
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -26,29 +30,52 @@ def dashboard(
     관리자 대시보드 화면.
 
     - 세션에 로그인 정보가 없으면 /auth/login 으로 리다이렉트
-    - 간단한 통계 + 최근 매치 목록을 보여준다.
+    - 간단한 통계 + 최근 30일 활동 차트 + 최근 매치 목록을 보여준다.
+    - 통계/차트는 일별 롤업 테이블(app/rollups.py)에서 읽는다.
+    - 새 매치/유저 변경이 없으면 쿼리 전에 304 (ETag)
     """
 
-    # 유저 수
-    total_users = db.query(User).count()
+    # 날짜가 바뀌면 차트 구간도 바뀌므로 KST 오늘 날짜를 ETag 에 섞는다.
+    today = rollups.kst_today()
+    etag = page_etag(request, db, f"dashboard:{today.isoformat()}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    # 블루전 매치 수
-    total_matches = db.query(BlueWarMatch).count()
+    # 유저 수: 실제 행 수. users 는 수만 행이라 COUNT(*) 도 가장 작은 인덱스만 훑고 끝난다
+    # (PK 끝값은 지운 행이 있으면 부풀려진다).
+    total_users = db.query(func.count(User.id)).scalar() or 0
 
-    # 최근 매치 10개 (최신순)
+    # 블루전 매치 수: 일별 롤업(하루 × 모드 행)만 더한다.
+    totals = rollups.totals_by_mode(db)
+    total_matches = sum(totals.values())
+
+    series = rollups.daily_series(db, days=DAYS)
+    hours = rollups.hour_histogram(db, days=DAYS)
+    max_daily = max((s["matches"] for s in series), default=0)
+    max_hourly = max(hours, default=0)
+
+    # 최근 매치 10개 (최신순) - started_at 대신 PK 역순
     recent_matches = (
         db.query(BlueWarMatch)
-        .order_by(BlueWarMatch.started_at.desc())
+        .order_by(BlueWarMatch.id.desc())
         .limit(10)
         .all()
     )
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
             "total_users": total_users,
             "total_matches": total_matches,
+            "totals_by_mode": sorted(totals.items()),
+            "days": DAYS,
+            "series": series,
+            "recent_days": list(reversed(series[-14:])),
+            "max_daily": max_daily,
+            "hours": hours,
+            "max_hourly": max_hourly,
             "recent_matches": recent_matches,
         },
     )
+    return with_etag(response, etag)
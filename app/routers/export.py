@@ -0,0 +1,194 @@
+# app/routers/export.py
+"""
+관리자용 전적 내보내기 (CSV / NDJSON).
+
+- /admin/export/matches.csv|.ndjson      : 매치. 필터는 /bluewar/matches/ 와 같다(mode/status/q).
+- /admin/export/participants.csv|.ndjson : 참가자. 같은 매치 필터 + discord_id.
+- ?archive=<season_id> 면 그 시즌 아카이브 파일, ?archive=all 이면 모든 아카이브(오래된 시즌부터) + 최근 기록.
+- ?gzip=1 이면 .gz 파일로 내려준다(그냥 받으면 CompressionMiddleware 가 전송 구간만 압축한다).
+
+행은 전용 세션에서 yield_per 로 조금씩 읽어서 바로 흘려보낸다.
+ORM 객체를 만들지 않고 Core select 로 튜플만 읽기 때문에 전체 기록을 내보내도 워커 메모리가 거의 일정하다.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Table, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from app import archive, models
+from app.dependencies import get_current_admin_user, get_db
+from app.routers.bluewar import filter_matches
+from app.streaming import CHUNK_SIZE, iter_with_session
+
+router = APIRouter(prefix="/admin/export", tags=["admin-export"])
+
+logger = logging.getLogger("yume.export")
+
+# 내보낼 때 한 번에 DB 에서 가져올 행 수 (템플릿용 BATCH_SIZE 보다 크게: 행이 가볍다)
+EXPORT_BATCH = 1000
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+M = models.BlueWarMatch
+P = models.BlueWarParticipant
+
+
+def _sources(db: Session, season_id: str) -> List[Optional[models.BlueWarArchive]]:
+    """읽을 곳 목록. None 은 메인(최근 기록) DB."""
+    season_id = (season_id or "").strip()
+    if not season_id:
+        return [None]
+    if season_id == "all":
+        # list_archives 는 최근 시즌부터라서 뒤집는다(match_id 오름차순에 가깝게).
+        return list(reversed(archive.list_archives(db))) + [None]
+    arch = archive.get(db, season_id)
+    if arch is None:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="archive not found")
+    return [arch]
+
+
+def _iter_rows(sources: Sequence[Optional[models.BlueWarArchive]], build) -> Iterator[Sequence[Any]]:
+    """source 마다 세션을 열어 build() 의 select 결과를 yield_per 로 흘린다."""
+    for arch in sources:
+        if arch is None:
+            yield from iter_with_session(
+                lambda s: s.execute(build().execution_options(yield_per=EXPORT_BATCH))
+            )
+            continue
+        try:
+            with archive.open_session(settings.ARCHIVE_DIR, arch) as adb:
+                yield from adb.execute(build().execution_options(yield_per=EXPORT_BATCH))
+        except FileNotFoundError:
+            # 이미 보내기 시작한 응답이라 상태 코드를 바꿀 수 없다. 로그만 남기고 다음 파일로.
+            logger.error("archive file missing during export: %s", arch.file)
+
+
+def _cell(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return int(v)
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def _json_value(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def _encode(fmt: str, columns: List[str], rows: Iterable[Sequence[Any]], counter: List[int]) -> Iterator[bytes]:
+    """행 → CSV/NDJSON 바이트. CHUNK_SIZE 정도씩 모아서 내보낸다."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n") if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(columns)
+    for row in rows:
+        counter[0] += 1
+        if writer is not None:
+            writer.writerow([_cell(v) for v in row])
+        else:
+            buf.write(json.dumps({k: _json_value(v) for k, v in zip(columns, row)}, ensure_ascii=False))
+            buf.write("\n")
+        if buf.tell() >= CHUNK_SIZE:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip 헤더
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def _respond(name: str, fmt: str, table: Table, sources, build, gzip: bool) -> StreamingResponse:
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="unknown format")
+    columns = [c.name for c in table.columns]
+    counter = [0]
+
+    def body() -> Iterator[bytes]:
+        chunks = _encode(fmt, columns, _iter_rows(sources, build), counter)
+        yield from (_gzipped(chunks) if gzip else chunks)
+        logger.info("export %s.%s: %d rows", name, fmt, counter[0])
+
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if gzip else FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/matches.{fmt}")
+def export_matches(
+    fmt: str,
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+    mode: str = Query(default="all", description="all|pvp|practice"),
+    status: str = Query(default="all", description="all|finished|aborted|running"),
+    q: str = Query(default="", description="검색어(Discord ID/메모/복기 로그)"),
+    season_id: str = Query(default="", alias="archive", description="아카이브 시즌 ID, all 이면 전체"),
+    gzip: bool = Query(default=False),
+):
+    sources = _sources(db, season_id)
+
+    def build():
+        return filter_matches(select(M.__table__), mode=mode, status=status, q=q).order_by(M.id.asc())
+
+    return _respond("bluewar_matches", fmt, M.__table__, sources, build, gzip)
+
+
+@router.get("/participants.{fmt}")
+def export_participants(
+    fmt: str,
+    db: Session = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+    mode: str = Query(default="all", description="all|pvp|practice"),
+    status: str = Query(default="all", description="all|finished|aborted|running"),
+    q: str = Query(default="", description="매치 검색어(매치 목록과 같다)"),
+    discord_id: str = Query(default=""),
+    season_id: str = Query(default="", alias="archive", description="아카이브 시즌 ID, all 이면 전체"),
+    gzip: bool = Query(default=False),
+):
+    sources = _sources(db, season_id)
+    discord_id = (discord_id or "").strip()
+    filtered = any(
+        [(mode or "all").strip().lower() != "all", (status or "all").strip().lower() != "all", (q or "").strip()]
+    )
+
+    def build():
+        stmt = select(P.__table__)
+        if filtered:
+            stmt = stmt.where(P.match_id.in_(filter_matches(select(M.id), mode=mode, status=status, q=q)))
+        if discord_id:
+            stmt = stmt.where(P.discord_id == discord_id)
+        return stmt.order_by(P.id.asc())
+
+    return _respond("bluewar_participants", fmt, P.__table__, sources, build, gzip)
@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from fastapi.templating import Jinja2Templates
 
 from config import settings
+from app.templating import templates
 
 router = APIRouter(tags=["home"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/")
@@ -8,20 +8,19 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db, get_current_member_user, get_current_member_or_admin
 from app.security import hash_password, verify_password
 from config import settings
-from app import models
+from app import generations, models, ratelimit
+from app.templating import templates
 
 router = APIRouter(
     prefix="/member",
     tags=["member"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
 
 def _sync_member_admin_flag(db: Session, m: models.MemberUser) -> None:
     """환경설정 기반으로 회원 관리자 권한을 부여한다(필요 시 DB 반영)."""
@@ -33,11 +32,11 @@ def _sync_member_admin_flag(db: Session, m: models.MemberUser) -> None:
 
     if should_admin and (not getattr(m, "is_admin", False)):
         m.is_admin = True
+        generations.bump(db, generations.MEMBERS)
         db.commit()
         db.refresh(m)
 
 
-
 def _is_valid_discord_id(s: str) -> bool:
     """로그인용 ID 검증.
 
@@ -69,7 +68,7 @@ def register_form(request: Request):
     )
 
 
-@router.post("/register")
+@router.post("/register", dependencies=[Depends(ratelimit.limit("member_register"))])
 def register(
     request: Request,
     db: Session = Depends(get_db),
@@ -130,6 +129,7 @@ def register(
         created_at=datetime.utcnow(),
     )
     db.add(m)
+    generations.bump(db, generations.MEMBERS)
     db.commit()
     db.refresh(m)
 
@@ -152,7 +152,7 @@ def login_form(request: Request):
     )
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(ratelimit.limit("member_login", account_field="discord_id"))])
 def login(
     request: Request,
     db: Session = Depends(get_db),
@@ -168,6 +168,7 @@ def login(
     )
 
     if (not m) or (not m.is_active) or (not verify_password(password, m.password_hash)):
+        ratelimit.login_failed(request)
         return templates.TemplateResponse(
             "member_login.html",
             {"request": request, "error": "아이디 또는 비밀번호가 올바르지 않습니다."},
@@ -176,6 +177,7 @@ def login(
 
     m.last_login_at = datetime.utcnow()
     db.add(m)
+    generations.bump(db, generations.MEMBERS)
     db.commit()
 
     request.session["member"] = {"member_id": m.id, "id": m.discord_id, "nickname": m.nickname, "is_admin": bool(getattr(m, "is_admin", False))}
@@ -0,0 +1,38 @@
+# app/routers/metrics.py
+"""Prometheus 스크레이프용 /metrics (토큰 필요)."""
+
+from __future__ import annotations
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from app import metrics
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _token_ok(authorization: Optional[str], x_metrics_token: Optional[str]) -> bool:
+    expected = settings.METRICS_TOKEN
+    given = x_metrics_token or ""
+    if authorization and authorization.lower().startswith("bearer "):
+        given = authorization[7:].strip()
+    return bool(given) and hmac.compare_digest(given.encode("utf-8"), expected.encode("utf-8"))
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics_endpoint(
+    authorization: Optional[str] = Header(None),
+    x_metrics_token: Optional[str] = Header(None, alias="X-Metrics-Token"),
+):
+    # 토큰이 설정 안 돼 있으면 엔드포인트 자체가 없는 것처럼 404
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not _token_ok(authorization, x_metrics_token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
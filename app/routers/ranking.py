@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Set, TypedDict
+import re
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, TypedDict
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from config import settings
 from app.dependencies import get_db, get_current_member_or_admin
-from app import models
+from app import generations, models, player_totals, rollups, seasons
+from app.etag import etag_matches, not_modified, page_etag, with_etag
+from app.templating import templates
 
 
 router = APIRouter(
@@ -18,8 +23,6 @@ router = APIRouter(
     tags=["ranking"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
-
 
 class RankingRow(TypedDict):
     rank: int
@@ -39,6 +42,46 @@ class RankingRow(TypedDict):
     net_gap: int
 
 
+class Window(NamedTuple):
+    key: str     # 쿼리스트링 값 (7d / season:s1)
+    label: str
+    start: date  # KST, 포함
+    end: date    # KST, 미포함
+
+    @property
+    def last(self) -> date:
+        return self.end - timedelta(days=1)
+
+
+_DAYS_RE = re.compile(r"^(\d{1,3})d$")
+MAX_WINDOW_DAYS = 365
+
+
+def _parse_window(raw: str, defined: List[seasons.Season], today: date) -> Optional[Window]:
+    """?window= 값 → 기간. 비었으면 None(전체 기간), 모르는 값이면 HTTPException(400)."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    m = _DAYS_RE.match(raw.lower())
+    if m and 1 <= int(m.group(1)) <= MAX_WINDOW_DAYS:
+        days = int(m.group(1))
+        return Window(f"{days}d", f"최근 {days}일", today - timedelta(days=days - 1), today + timedelta(days=1))
+    if raw.startswith("season:"):
+        season = seasons.get(raw[len("season:"):], defined)
+        if season is not None:
+            return Window(f"season:{season.id}", season.name, season.start, season.end)
+    raise HTTPException(status_code=400, detail=f"unknown window: {raw}")
+
+
+def _window_choices(defined: List[seasons.Season], today: date) -> List[Tuple[str, str]]:
+    """랭킹 페이지 기간 탭: 전체 / 7일 / 30일 / 시즌들(최근 것부터, 정의가 없으면 이번 분기)."""
+    choices = [("", "전체 기간"), ("7d", "최근 7일"), ("30d", "최근 30일")]
+    shown = [s for s in defined if s.start <= today] or [seasons.season_for(today, defined)]
+    for s in sorted(shown, key=lambda s: s.start, reverse=True):
+        choices.append((f"season:{s.id}", s.name))
+    return choices
+
+
 def _resolve_display_name(
     *,
     discord_id: str,
@@ -53,12 +96,208 @@ def _resolve_display_name(
     return discord_id
 
 
+def _names(
+    db: Session, ids: List[str]
+) -> Tuple[Dict[str, models.User], Dict[str, str]]:
+    """
+    표시 이름 재료: users + 가장 최근 참가 기록의 이름 + 아카이브 마지막 이름 (500명씩).
+    닉네임이 있는 사람은 대체 이름을 안 쓰므로 참가 기록을 읽지 않는다(판 수만큼 행을 읽는 쿼리라서).
+    """
+    users_by_discord: Dict[str, models.User] = {}
+    fallback_names_by_discord: Dict[str, str] = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for u in db.query(models.User).filter(models.User.discord_id.in_(chunk)).all():
+            users_by_discord[u.discord_id] = u
+        chunk = [d for d in chunk if not (d in users_by_discord and users_by_discord[d].nickname)]
+        if not chunk:
+            continue
+        # 가장 최근 참가 기록의 이름 (discord_id 인덱스로 플레이어당 1행)
+        latest = (
+            db.query(func.max(models.BlueWarParticipant.id))
+            .filter(models.BlueWarParticipant.discord_id.in_(chunk), models.BlueWarParticipant.name.isnot(None))
+            .group_by(models.BlueWarParticipant.discord_id)
+        )
+        for did, name in (
+            db.query(models.BlueWarParticipant.discord_id, models.BlueWarParticipant.name)
+            .filter(models.BlueWarParticipant.id.in_(latest))
+            .all()
+        ):
+            fallback_names_by_discord[did] = name
+        for a in db.query(models.BlueWarArchivedPlayer).filter(models.BlueWarArchivedPlayer.discord_id.in_(chunk)):
+            if a.last_name and a.discord_id not in fallback_names_by_discord:
+                fallback_names_by_discord[a.discord_id] = a.last_name
+    return users_by_discord, fallback_names_by_discord
+
+
+def _total_stats(t: models.BlueWarPlayerTotal) -> Dict[str, int]:
+    return {
+        "wins": int(t.wins),
+        "losses": int(t.losses),
+        "gap_plus": int(t.gap_plus),
+        "gap_minus": int(t.gap_minus),
+        "base_wins": int(t.base_wins),
+        "base_losses": int(t.base_losses),
+    }
+
+
+def _all_time_stats(db: Session, mode: str) -> Tuple[Dict[str, Dict[str, int]], Dict[str, models.User], Dict[str, str]]:
+    """전체 기간: 플레이어별 합계 테이블(메인 + 아카이브 매치, 기본 전적까지 들어 있다)."""
+    stats = {t.discord_id: _total_stats(t) for t in player_totals.all_rows(db, mode)}
+    users_by_discord, fallback_names_by_discord = _names(db, list(stats))
+    return stats, users_by_discord, fallback_names_by_discord
+
+
+def _window_stats(
+    db: Session, mode: str, win: Window
+) -> Tuple[Dict[str, Dict[str, int]], Dict[str, models.User], Dict[str, str]]:
+    """기간/시즌: 일별 플레이어 롤업 합계만 (기본 전적은 기간이 없어서 더하지 않는다)."""
+    stats: Dict[str, Dict[str, int]] = {}
+    for did, wins, losses, gap_plus, gap_minus in rollups.window_totals(db, mode, win.start, win.end):
+        stats[did] = {
+            "wins": wins,
+            "losses": losses,
+            "gap_plus": gap_plus,
+            "gap_minus": gap_minus,
+            "base_wins": 0,
+            "base_losses": 0,
+        }
+    users_by_discord, fallback_names_by_discord = _names(db, list(stats))
+    return stats, users_by_discord, fallback_names_by_discord
+
+
+class Ranking(NamedTuple):
+    rows: List[RankingRow]          # 정렬 + rank 까지 매긴 전체 목록 (캐시 공유: 고치지 말 것)
+    by_id: Dict[str, RankingRow]    # discord_id → 줄
+
+
+# 워커 메모리 캐시. 새 매치(gen:matches)나 유저 기본 전적/닉네임(gen:users)이 바뀌면 다시 만든다.
+ranking_cache = generations.GenerationCache()
+
+
+def _make_row(
+    did: str,
+    s: Dict[str, int],
+    mode: str,
+    users_by_discord: Dict[str, models.User],
+    fallback_names_by_discord: Dict[str, str],
+) -> RankingRow:
+    wins = int(s.get("wins", 0))
+    losses = int(s.get("losses", 0))
+    matches_cnt = wins + losses
+
+    base_wins = int(s.get("base_wins", 0))
+    base_losses = int(s.get("base_losses", 0))
+
+    total_wins = wins + base_wins
+    total_losses = losses + base_losses
+    total_battles = total_wins + total_losses
+
+    gap_plus = int(s.get("gap_plus", 0))
+    gap_minus = int(s.get("gap_minus", 0))
+    net_gap = gap_plus - gap_minus
+
+    win_rate = (total_wins / total_battles * 100.0) if total_battles > 0 else 0.0
+
+    return {
+        "rank": 0,
+        "discord_id": did,
+        "name": _resolve_display_name(
+            discord_id=did,
+            users_by_discord=users_by_discord,
+            fallback_names_by_discord=fallback_names_by_discord,
+        ),
+        "mode": mode,
+        "matches": matches_cnt,
+        "wins": wins,
+        "losses": losses,
+        "base_wins": base_wins,
+        "base_losses": base_losses,
+        "total_wins": total_wins,
+        "total_losses": total_losses,
+        "win_rate": win_rate,
+        "gap_plus": gap_plus,
+        "gap_minus": gap_minus,
+        "net_gap": net_gap,
+    }
+
+
+def _sort_key(r: RankingRow) -> Tuple:
+    # 정렬: net_gap DESC, total_wins DESC, matches DESC, name ASC (이름까지 같으면 discord_id)
+    return (-r["net_gap"], -r["total_wins"], -r["matches"], r["name"], r["discord_id"])
+
+
+def build_ranking(db: Session, mode: str, win: Optional[Window] = None) -> Ranking:
+    """랭킹 전체를 만든다. 정렬: net_gap DESC, total_wins DESC, matches DESC, name ASC."""
+    if win is None:
+        stats, users_by_discord, fallback_names_by_discord = _all_time_stats(db, mode)
+    else:
+        stats, users_by_discord, fallback_names_by_discord = _window_stats(db, mode, win)
+
+    rows: List[RankingRow] = [
+        _make_row(did, s, mode, users_by_discord, fallback_names_by_discord) for did, s in stats.items()
+    ]
+    rows.sort(key=_sort_key)
+
+    for idx, r in enumerate(rows, start=1):
+        r["rank"] = idx
+    return Ranking(rows, {r["discord_id"]: r for r in rows})
+
+
+def ranked_rows(db: Session, mode: str, discord_ids: List[str]) -> Dict[str, RankingRow]:
+    """
+    전체 기간 랭킹에서 몇 명의 줄만 (rank 포함, build_ranking 과 같은 값).
+
+    랭킹 전체를 만들지 않고 bluewar_player_totals 에서 그 사람들 줄 + 정렬 키 인덱스 COUNT 로
+    순위를 낸다. 정렬 키가 똑같은 사람들만 이름을 읽어서 가른다. 랭킹에 없는 사람은 빠진다.
+    """
+    totals = player_totals.rows(db, mode, discord_ids)
+    if not totals:
+        return {}
+    ahead = {did: player_totals.ahead(db, t) for did, t in totals.items()}
+    tied = {did: player_totals.ties(db, t) for did, t in totals.items()}
+
+    tied_ids = {d for ids in tied.values() for d in ids}
+    extra = player_totals.rows(db, mode, tied_ids - set(totals)) if tied_ids - set(totals) else {}
+    all_totals = {**extra, **totals}
+    users_by_discord, fallback_names_by_discord = _names(db, list(all_totals))
+    made = {
+        did: _make_row(did, _total_stats(t), mode, users_by_discord, fallback_names_by_discord)
+        for did, t in all_totals.items()
+    }
+
+    out: Dict[str, RankingRow] = {}
+    for did in totals:
+        row = made[did]
+        key = _sort_key(row)
+        row["rank"] = ahead[did] + 1 + sum(1 for other in tied[did] if _sort_key(made[other]) < key)
+        out[did] = row
+    return out
+
+
+def _cache_key(mode: str, win: Optional[Window]) -> Tuple:
+    return ("ranking", mode) if win is None else ("ranking", mode, win.start, win.end)
+
+
+def peek_ranking(db: Session, mode: str) -> Optional[Ranking]:
+    """전체 기간 랭킹이 캐시에 최신으로 있으면 그것, 없으면 None (다시 만들지 않는다)."""
+    return ranking_cache.peek(db, _cache_key(mode, None), (generations.MATCHES, generations.USERS))
+
+
+def cached_ranking(db: Session, mode: str, win: Optional[Window] = None) -> Ranking:
+    """세대가 그대로면 app_meta 조회 1번으로 끝난다."""
+    return ranking_cache.get(
+        db, _cache_key(mode, win), (generations.MATCHES, generations.USERS), lambda: build_ranking(db, mode, win)
+    )
+
+
 @router.get("/", response_class=HTMLResponse)
 def ranking_page(
     request: Request,
     db: Session = Depends(get_db),
     _viewer=Depends(get_current_member_or_admin),
     mode: str = "pvp",
+    window: str = "",
     limit: int = 50,
 ):
     """블루전 랭킹.
@@ -67,149 +306,41 @@ def ranking_page(
     1) 순수 승차(net_gap) DESC
     2) 총 승리(기본 전적 포함) DESC
     3) 총 매치 수 DESC
+
+    아카이브로 옮긴 매치는 bluewar_archived_players 합계로 더한다(전체 기간 전적 유지).
+    ?window=7d|30d|season:<id> 면 그 기간(KST 날짜)만, 일별 플레이어 롤업(bluewar_daily_players)을 더해서 만든다.
+    새 매치/유저 변경이 없으면 집계 전에 304 로 끝낸다(ETag).
+    ETag 에는 KST 날짜와 시즌 정의도 섞는다: 자정이 지나면 7d/30d 기간과 시즌 탭이 바뀌고,
+    시즌을 고치면 매치/유저 워터마크는 그대로여도 기간이 바뀐다.
+    다른 사람이 봤던 집계는 워커 캐시(cached_ranking)를 그대로 쓴다(봇 API 와 공유).
     """
 
+    today = rollups.kst_today()
+    defined = seasons.load(db)
+    etag = page_etag(request, db, f"ranking:{today.isoformat()}:{defined!r}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     mode = (mode or "pvp").strip().lower()
     if mode not in {"pvp", "practice", "all"}:
         mode = "pvp"
 
-    q = db.query(models.BlueWarMatch)
-    # "완료"된 매치만 집계 (winner/loser가 있는 경우)
-    q = q.filter(models.BlueWarMatch.winner_discord_id.isnot(None))
-    q = q.filter(models.BlueWarMatch.loser_discord_id.isnot(None))
-
-    if mode != "all":
-        q = q.filter(models.BlueWarMatch.mode == mode)
-
-    matches: List[models.BlueWarMatch] = q.order_by(models.BlueWarMatch.id.desc()).all()
-
-    ids: Set[str] = set()
-    match_ids: List[int] = []
-    for m in matches:
-        match_ids.append(m.id)
-        if m.winner_discord_id:
-            ids.add(m.winner_discord_id)
-        if m.loser_discord_id:
-            ids.add(m.loser_discord_id)
-
-    users_by_discord: Dict[str, models.User] = {}
-    if ids:
-        users = (
-            db.query(models.User)
-            .filter(models.User.discord_id.in_(list(ids)))
-            .all()
-        )
-        users_by_discord = {u.discord_id: u for u in users}
-
-    fallback_names_by_discord: Dict[str, str] = {}
-    if match_ids:
-        parts = (
-            db.query(models.BlueWarParticipant)
-            .filter(models.BlueWarParticipant.match_id.in_(match_ids))
-            .all()
-        )
-        for p in parts:
-            if p.discord_id and p.name and p.discord_id not in fallback_names_by_discord:
-                fallback_names_by_discord[p.discord_id] = p.name
-
-    # stats keyed by discord_id
-    stats: Dict[str, Dict[str, int]] = {}
-    for did in ids:
-        u = users_by_discord.get(did)
-        stats[did] = {
-            "wins": 0,
-            "losses": 0,
-            "gap_plus": 0,
-            "gap_minus": 0,
-            "base_wins": int(u.base_wins) if u else 0,
-            "base_losses": int(u.base_losses) if u else 0,
-        }
-
-    for m in matches:
-        gap = int(m.win_gap or 0)
-
-        if m.winner_discord_id:
-            s = stats.setdefault(
-                m.winner_discord_id,
-                {"wins": 0, "losses": 0, "gap_plus": 0, "gap_minus": 0, "base_wins": 0, "base_losses": 0},
-            )
-            s["wins"] += 1
-            s["gap_plus"] += gap
-
-        if m.loser_discord_id:
-            s = stats.setdefault(
-                m.loser_discord_id,
-                {"wins": 0, "losses": 0, "gap_plus": 0, "gap_minus": 0, "base_wins": 0, "base_losses": 0},
-            )
-            s["losses"] += 1
-            s["gap_minus"] += gap
-
-    rows: List[RankingRow] = []
-    for did, s in stats.items():
-        wins = int(s.get("wins", 0))
-        losses = int(s.get("losses", 0))
-        matches_cnt = wins + losses
-
-        base_wins = int(s.get("base_wins", 0))
-        base_losses = int(s.get("base_losses", 0))
-
-        total_wins = wins + base_wins
-        total_losses = losses + base_losses
-        total_battles = total_wins + total_losses
-
-        gap_plus = int(s.get("gap_plus", 0))
-        gap_minus = int(s.get("gap_minus", 0))
-        net_gap = gap_plus - gap_minus
-
-        win_rate = (total_wins / total_battles * 100.0) if total_battles > 0 else 0.0
-
-        rows.append(
-            {
-                "rank": 0,
-                "discord_id": did,
-                "name": _resolve_display_name(
-                    discord_id=did,
-                    users_by_discord=users_by_discord,
-                    fallback_names_by_discord=fallback_names_by_discord,
-                ),
-                "mode": mode,
-                "matches": matches_cnt,
-                "wins": wins,
-                "losses": losses,
-                "base_wins": base_wins,
-                "base_losses": base_losses,
-                "total_wins": total_wins,
-                "total_losses": total_losses,
-                "win_rate": win_rate,
-                "gap_plus": gap_plus,
-                "gap_minus": gap_minus,
-                "net_gap": net_gap,
-            }
-        )
-
-    # 정렬: net_gap DESC, total_wins DESC, matches DESC, name ASC
-    rows.sort(
-        key=lambda r: (
-            -r["net_gap"],
-            -r["total_wins"],
-            -r["matches"],
-            r["name"],
-        )
-    )
+    win = _parse_window(window, defined, today)
+    ranking = cached_ranking(db, mode, win)
 
-    # rank 부여 + limit 적용
     limit_i = max(1, min(int(limit), 200))
-    ranked: List[RankingRow] = []
-    for idx, r in enumerate(rows[:limit_i], start=1):
-        r2 = dict(r)
-        r2["rank"] = idx
-        ranked.append(r2)  # type: ignore[arg-type]
+    ranked = ranking.rows[:limit_i]
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "ranking.html",
         {
             "request": request,
             "rows": ranked,
             "mode": mode,
+            "window": win,
+            "windows": _window_choices(defined, today),
+            # 오늘이 들어가는 기간이면 새 매치로 표를 바로 고친다(/bluewar/events).
+            "live": settings.SSE_ENABLED and (win is None or win.end > today),
         },
     )
+    return with_etag(response, etag)
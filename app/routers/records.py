@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Set, TypedDict
+from typing import Dict, Iterator, List, Optional, Set, TypedDict
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db, get_current_admin_user
 from app import models
+from app.streaming import BATCH_SIZE, chunked, iter_with_session, stream_template
+from app.templating import templates
 
 
 router = APIRouter(
@@ -18,8 +19,6 @@ router = APIRouter(
     tags=["records"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
-
 
 class MatchRow(TypedDict):
     match: models.BlueWarMatch
@@ -44,23 +43,8 @@ def _resolve_display_name(
     return discord_id
 
 
-@router.get("/", response_class=HTMLResponse)
-def list_records(
-    request: Request,
-    db: Session = Depends(get_db),
-    admin=Depends(get_current_admin_user),
-    limit: int = 200,
-):
-    """블루전 매치 목록 페이지(최신순)."""
-
-    total_matches = db.query(models.BlueWarMatch).count()
-
-    matches: List[models.BlueWarMatch] = (
-        db.query(models.BlueWarMatch)
-        .order_by(models.BlueWarMatch.id.desc())
-        .limit(max(1, min(int(limit), 1000)))
-        .all()
-    )
+def _build_rows(db: Session, matches: List[models.BlueWarMatch]) -> List[MatchRow]:
+    """매치 묶음 하나에 대해 표시 이름을 한 번에 resolve 해서 행으로 만든다."""
 
     # 한 번에 표시 이름을 resolve 하기 위해 필요한 discord_id들을 모은다.
     discord_ids: Set[str] = set()
@@ -117,13 +101,39 @@ def list_records(
                 ),
             }
         )
+    return rows
 
-    return templates.TemplateResponse(
+
+def _iter_rows(db: Session, limit: int) -> Iterator[MatchRow]:
+    q = (
+        db.query(models.BlueWarMatch)
+        .order_by(models.BlueWarMatch.id.desc())
+        .limit(limit)
+        .yield_per(BATCH_SIZE)
+    )
+    for batch in chunked(q, BATCH_SIZE):
+        yield from _build_rows(db, batch)
+
+
+@router.get("/", response_class=HTMLResponse)
+def list_records(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+    limit: int = 200,
+):
+    """블루전 매치 목록 페이지(최신순). 행은 스트리밍으로 내보낸다."""
+
+    total_matches = db.query(models.BlueWarMatch).count()
+    limit_i = max(1, min(int(limit), 1000))
+
+    return stream_template(
+        templates,
         "records_list.html",
         {
             "request": request,
             "total_matches": total_matches,
-            "rows": rows,
+            "rows": iter_with_session(lambda s: _iter_rows(s, limit_i)),
         },
     )
 
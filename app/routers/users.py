@@ -1,22 +1,23 @@
 # app/routers/users.py
 
-from typing import List, Optional
+import math
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Request, Form, HTTPException
+from fastapi import APIRouter, Depends, File, Request, Form, HTTPException, Query, UploadFile
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db, get_current_admin_user
-from app import models
+from app import archive, bulk_users, generations, models, player_totals, players
+from app.streaming import stream_template
+from app.templating import templates
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
-
 
 def get_user_or_404(db: Session, user_id: int) -> models.User:
     user = (
@@ -29,18 +30,119 @@ def get_user_or_404(db: Session, user_id: int) -> models.User:
     return user
 
 
+# 접두사 검색 상한: "abc" → [abc, abc\U0010ffff) 범위 조회 (LIKE 대신 인덱스 range scan)
+_PREFIX_UPPER = "\U0010ffff"
+
+
+def _prefix_filter(column, prefix: str):
+    return and_(column >= prefix, column < prefix + _PREFIX_UPPER)
+
+
+def _match_stats_by_discord(db: Session, discord_ids: List[str]) -> Dict[str, Dict[str, object]]:
+    """
+    페이지에 보이는 유저들의 매치 수 / 승 / 패 / 최근 플레이를 집계 쿼리 1번으로 가져온다.
+    (bluewar_participants(discord_id, match_id) 인덱스 → 매치 PK 조인)
+    아카이브로 옮긴 매치는 bluewar_archived_players 합계를 IN 쿼리 1번으로 더한다.
+    최근 플레이는 뜨거운 테이블 기준 (아카이브 매치는 어차피 더 예전 것).
+    """
+    if not discord_ids:
+        return {}
+    P = models.BlueWarParticipant
+    M = models.BlueWarMatch
+    rows = (
+        db.query(
+            P.discord_id,
+            func.count(func.distinct(P.match_id)),
+            func.sum(case((M.winner_discord_id == P.discord_id, 1), else_=0)),
+            func.sum(case((M.loser_discord_id == P.discord_id, 1), else_=0)),
+            func.max(M.finished_at),
+        )
+        .join(M, M.id == P.match_id)
+        .filter(P.discord_id.in_(discord_ids))
+        .group_by(P.discord_id)
+        .all()
+    )
+    out: Dict[str, Dict[str, object]] = {}
+    for did, matches, wins, losses, last_played in rows:
+        out[did] = {
+            "matches": int(matches or 0),
+            "wins": int(wins or 0),
+            "losses": int(losses or 0),
+            "last_played": last_played,
+        }
+    for did, (matches, wins, losses) in archive.players_totals(db, discord_ids).items():
+        row = out.setdefault(did, {"matches": 0, "wins": 0, "losses": 0, "last_played": None})
+        row["matches"] += matches
+        row["wins"] += wins
+        row["losses"] += losses
+    return out
+
+
 @router.get("/", name="users_list")
-async def users_list(
+def users_list(
     request: Request,
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin_user),
+    q: str = Query(default="", description="디스코드 ID / 닉네임 접두사"),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=10, le=200),
 ):
-    users: List[models.User] = db.query(models.User).order_by(models.User.id.asc()).all()
-    return templates.TemplateResponse(
+    """
+    유저 관리 목록.
+
+    - 검색: discord_id / nickname 접두사 (둘 다 인덱스 range scan)
+    - 페이지네이션
+    - 행마다 매치 수, 승/패, 최근 플레이 (페이지당 집계 쿼리 1번)
+    """
+    query = db.query(models.User)
+
+    q = (q or "").strip()
+    if q:
+        query = query.filter(
+            or_(
+                _prefix_filter(models.User.discord_id, q),
+                _prefix_filter(models.User.nickname, q),
+            )
+        )
+
+    total = query.count()
+    total_pages = max(1, math.ceil(total / page_size))
+    if page > total_pages:
+        page = total_pages
+
+    users: List[models.User] = (
+        query.order_by(models.User.id.asc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    stats_by_discord = _match_stats_by_discord(db, [u.discord_id for u in users])
+    empty = {"matches": 0, "wins": 0, "losses": 0, "last_played": None}
+
+    rows: List[Dict[str, object]] = []
+    for u in users:
+        rows.append(
+            {
+                "id": u.id,
+                "discord_id": u.discord_id,
+                "nickname": u.nickname or "-",
+                "note": u.note or "-",
+                **stats_by_discord.get(u.discord_id, empty),
+            }
+        )
+
+    return stream_template(
+        templates,
         "users_list.html",
         {
             "request": request,
-            "users": users,
+            "users": rows,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "q": q,
         },
     )
 
@@ -73,12 +175,108 @@ async def user_create(
         base_losses=0,
     )
     db.add(user)
+    generations.bump(db, generations.USERS)
     db.commit()
     db.refresh(user)
 
     return RedirectResponse(url="/users/", status_code=303)
 
 
+# ============================
+#   기본 전적 일괄 수정 (CSV/TSV)
+# ============================
+
+# 미리보기 표에 그리는 최대 줄 수 (적용은 전체)
+IMPORT_PREVIEW_ROWS = 500
+IMPORT_MAX_BYTES = 1024 * 1024
+
+
+def _import_page(request: Request, **ctx):
+    context = {
+        "request": request,
+        "text": "",
+        "errors": [],
+        "changes": None,
+        "counts": None,
+        "gen": 0,
+        "stale": False,
+        "done": None,
+        "preview_rows": IMPORT_PREVIEW_ROWS,
+    }
+    context.update(ctx)
+    status_code = 400 if context["errors"] else 200
+    return templates.TemplateResponse("users_import.html", context, status_code=status_code)
+
+
+def _preview(request: Request, db: Session, text: str, *, stale: bool = False):
+    rows, errors = bulk_users.parse(text)
+    if errors:
+        return _import_page(request, text=text, errors=errors)
+    changes = bulk_users.diff(db, rows)
+    counts = {kind: sum(1 for c in changes if c.kind == kind) for kind in ("new", "update", "same")}
+    return _import_page(
+        request,
+        text=bulk_users.dump(rows),
+        changes=[c for c in changes if c.kind != "same"],
+        counts=counts,
+        gen=generations.read(db, (generations.USERS,))[generations.USERS],
+        stale=stale,
+    )
+
+
+@router.get("/import")
+async def users_import_form(
+    request: Request,
+    admin=Depends(get_current_admin_user),
+    done: Optional[int] = None,
+):
+    return _import_page(request, done=done)
+
+
+@router.post("/import")
+async def users_import_preview(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+    file: Optional[UploadFile] = File(None),
+    text: str = Form(""),
+):
+    """
+    1단계: 올린 파일(또는 붙여넣은 내용)을 검증하고 바뀌는 것만 미리보기로 보여준다. DB 는 읽기만.
+    """
+    if file is not None and file.filename:
+        raw = await file.read(IMPORT_MAX_BYTES + 1)
+        if len(raw) > IMPORT_MAX_BYTES:
+            return _import_page(request, errors=["파일은 1MB 까지만 올릴 수 있어"])
+        try:
+            text = raw.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return _import_page(request, errors=["UTF-8 로 저장한 파일만 읽을 수 있어"])
+    return _preview(request, db, text)
+
+
+@router.post("/import/apply")
+async def users_import_apply(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+    text: str = Form(...),
+    gen: int = Form(...),
+):
+    """
+    2단계: 미리보기에서 본 내용을 한 트랜잭션으로 적용한다.
+    그 사이 유저 정보가 바뀌었으면(gen:users) 적용하지 않고 새 미리보기를 다시 보여준다.
+    """
+    if generations.read(db, (generations.USERS,))[generations.USERS] != gen:
+        return _preview(request, db, text, stale=True)
+
+    rows, errors = bulk_users.parse(text)
+    if errors:
+        return _import_page(request, text=text, errors=errors)
+    applied = bulk_users.apply(db, bulk_users.diff(db, rows))
+    return RedirectResponse(url=f"/users/import?done={applied}", status_code=303)
+
+
 @router.get("/{user_id}")
 async def user_detail(
     user_id: int,
@@ -87,11 +285,13 @@ async def user_detail(
     admin=Depends(get_current_admin_user),
 ):
     user = get_user_or_404(db, user_id)
+    recent, _next = players.recent_matches(db, user.discord_id, limit=10)
     return templates.TemplateResponse(
         "user_detail.html",
         {
             "request": request,
             "user": user,
+            "recent": recent,
         },
     )
 
@@ -125,10 +325,16 @@ async def user_edit(
 ):
     user = get_user_or_404(db, user_id)
 
+    old_discord_id = user.discord_id
     user.discord_id = discord_id
     user.nickname = nickname or ""
     user.note = note or ""
 
+    if old_discord_id != discord_id:
+        # 기본 전적이 옛 discord_id 에서 새 discord_id 로 옮겨간다
+        db.flush()
+        player_totals.sync_base(db, [old_discord_id, discord_id])
+    generations.bump(db, generations.USERS)
     db.commit()
     db.refresh(user)
 
@@ -170,6 +376,9 @@ async def user_stats_edit(
     user.base_wins = max(0, int(base_wins))
     user.base_losses = max(0, int(base_losses))
 
+    db.flush()
+    player_totals.sync_base(db, [user.discord_id])
+    generations.bump(db, generations.USERS)
     db.commit()
     db.refresh(user)
 
@@ -0,0 +1,80 @@
+# app/routers/words.py
+"""
+블루전 단어 통계 페이지 (/bluewar/words/).
+
+- 많이 쓴 단어 / 많이 쓴 첫 단어(+ 그 단어로 시작했을 때 승률): bluewar_word_stats 만 읽는다.
+- ?q=브로콜리 : 그 단어 통계 + 쓴 매치 목록 (bluewar_word_uses PK 범위 조회).
+봇용 JSON 은 api_bluewar.py 의 /bluewar/word-stats.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+
+from app.dependencies import get_db, get_current_member_or_admin
+from app import models, words
+from app.etag import etag_matches, not_modified, page_etag, with_etag
+from app.templating import templates
+
+router = APIRouter(
+    prefix="/bluewar/words",
+    tags=["bluewar-words"],
+)
+
+TOP_LIMIT = 30
+MATCH_LIMIT = 50
+# 첫 단어 승률 표에 올리는 최소 판 수 (몇 판 안 된 단어의 100% 같은 건 빼고)
+OPENING_MIN_GAMES = 5
+
+
+@router.get("/", response_class=HTMLResponse)
+def word_stats_page(
+    request: Request,
+    db: Session = Depends(get_db),
+    _viewer=Depends(get_current_member_or_admin),
+    mode: str = Query(default="pvp", description="pvp|practice|all"),
+    q: str = Query(default="", description="단어"),
+    before: Optional[int] = Query(default=None, description="이 매치 ID 보다 예전 것부터"),
+):
+    etag = page_etag(request, db, "words")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    mode = (mode or "pvp").strip().lower()
+    if mode not in {"pvp", "practice", "all"}:
+        mode = "pvp"
+    word = words.normalize(q)
+
+    stats = None
+    uses: List[Dict[str, object]] = []
+    matches_by_id: Dict[int, models.BlueWarMatch] = {}
+    if word:
+        stats = words.word_stats(db, word, mode)
+        if stats:
+            uses = words.matches_with(db, word, mode, limit=MATCH_LIMIT, before_id=before)
+            ids = [u["match_id"] for u in uses]
+            # 아카이브로 옮긴 매치는 여기 없다 → 줄에는 ID/턴만 보이고 상세 링크가 아카이브에서 찾는다.
+            for m in db.query(models.BlueWarMatch).filter(models.BlueWarMatch.id.in_(ids)).all():
+                matches_by_id[m.id] = m
+
+    response = templates.TemplateResponse(
+        "bluewar/words.html",
+        {
+            "request": request,
+            "mode": mode,
+            "q": q.strip(),
+            "word": word,
+            "stats": stats,
+            "uses": uses,
+            "matches_by_id": matches_by_id,
+            "next_before": uses[-1]["match_id"] if len(uses) == MATCH_LIMIT else None,
+            "top_words": words.top_words(db, mode, TOP_LIMIT),
+            "top_openings": words.top_openings(db, mode, TOP_LIMIT, min_games=OPENING_MIN_GAMES),
+            "opening_min_games": OPENING_MIN_GAMES,
+        },
+    )
+    return with_etag(response, etag)
@@ -0,0 +1,30 @@
+# app/routing.py
+"""ASGI 미들웨어들이 같이 쓰는 scope 도우미."""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import Scope
+
+# 지금 처리 중인 요청의 라우트 이름. MetricsMiddleware 가 요청 들어올 때 넣는다
+# (YUME_SQL_STATS 와 상관없이 항상 있는 미들웨어라 slowlog 같은 엔진 이벤트가 이걸 본다).
+current_route: ContextVar[Optional[str]] = ContextVar("yume_route", default=None)
+
+
+def route_label(scope: Scope) -> str:
+    """
+    통계/메트릭용 라우트 이름. 실제 경로 대신 경로 템플릿을 쓴다.
+    예: /bluewar/matches/123 -> /bluewar/matches/{match_id}
+
+    라우팅이 끝난 뒤에 scope["route"] 가 채워지므로, 응답 시점에 부를 것.
+    (매칭되는 라우트가 없거나 /static 마운트면 경로 템플릿이 없다)
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return str(path)
+    if str(scope.get("path", "")).startswith("/static/"):
+        return "/static"
+    return "<unmatched>"
@@ -22,6 +22,29 @@ def ensure_sqlite_schema(engine: Engine) -> None:
         with engine.begin() as conn:
             conn.execute(text("ALTER TABLE member_users ADD COLUMN is_admin BOOLEAN NOT NULL DEFAULT 0;"))
 
+    # users.updated_at (+ 인덱스) : ETag 워터마크용 변경 스탬프
+    if not _has_column(engine, "users", "updated_at"):
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE users ADD COLUMN updated_at DATETIME;"))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);"))
+
+    # bluewar_daily_players 승/패/승차 : 기간·시즌 랭킹용 (채우는 건 rollups.ensure_backfill)
+    for column in ("wins", "losses", "gap_plus", "gap_minus"):
+        if not _has_column(engine, "bluewar_daily_players", column):
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE bluewar_daily_players ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0;"
+                ))
+
+    # 조회용 인덱스 (create_all 은 이미 있는 테이블에 인덱스를 추가하지 않는다)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_nickname ON users (nickname);"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_bluewar_participants_discord_match "
+            "ON bluewar_participants (discord_id, match_id);"
+        ))
+
     # app_meta 테이블은 create_all로 생성되지만, 안전망으로 한 번 더
     with engine.begin() as conn:
         conn.execute(text(
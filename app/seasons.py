@@ -0,0 +1,110 @@
+# app/seasons.py
+"""
+블루전 시즌 구분.
+
+app_meta 의 "bluewar_seasons" 에 JSON 배열로 둔다(날짜는 KST, end 는 그날 0시 직전까지 = 미포함):
+
+    [{"id": "s1", "name": "시즌 1", "start": "2025-09-01", "end": "2026-01-01"}, ...]
+
+정의되지 않은 날짜는 분기 시즌("2026q1" = 2026년 1~3월)으로 본다.
+아카이브 파일(app/archive.py)과 시즌 랭킹이 같은 구분을 쓴다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app import models
+
+META_KEY = "bluewar_seasons"
+
+logger = logging.getLogger("yume.seasons")
+
+_QUARTER_RE = re.compile(r"^(\d{4})q([1-4])$")
+_ID_RE = re.compile(r"^[0-9A-Za-z_-]{1,32}$")
+
+
+@dataclass(frozen=True)
+class Season:
+    id: str
+    name: str
+    start: date  # 포함
+    end: date    # 미포함
+
+    def contains(self, day: date) -> bool:
+        return self.start <= day < self.end
+
+
+def quarter_of(day: date) -> Season:
+    q = (day.month - 1) // 3 + 1
+    start = date(day.year, 3 * (q - 1) + 1, 1)
+    end = date(day.year + 1, 1, 1) if q == 4 else date(day.year, 3 * q + 1, 1)
+    return Season(id=f"{day.year}q{q}", name=f"{day.year}년 {q}분기", start=start, end=end)
+
+
+def parse(raw: Optional[str]) -> List[Season]:
+    """JSON → 시작일 순 시즌 목록. 잘못된 항목은 건너뛴다(로그만)."""
+    if not raw:
+        return []
+    try:
+        items = json.loads(raw)
+    except ValueError:
+        logger.warning("app_meta %s is not valid JSON", META_KEY)
+        return []
+    out: List[Season] = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            sid = str(item["id"]).strip()
+            if not _ID_RE.match(sid):
+                raise ValueError(sid)
+            start = date.fromisoformat(str(item["start"]))
+            end = date.fromisoformat(str(item["end"]))
+            if end <= start:
+                raise ValueError(f"{sid}: end <= start")
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.warning("skip bad season %r: %s", item, exc)
+            continue
+        out.append(Season(id=sid, name=str(item.get("name") or sid), start=start, end=end))
+    out.sort(key=lambda s: s.start)
+    return out
+
+
+def load(db: Session) -> List[Season]:
+    meta = db.get(models.AppMeta, META_KEY)
+    return parse(meta.value if meta else None)
+
+
+def save(db: Session, seasons: List[Season]) -> None:
+    """시즌 정의를 저장한다(커밋은 호출한 쪽)."""
+    raw = json.dumps(
+        [
+            {"id": s.id, "name": s.name, "start": s.start.isoformat(), "end": s.end.isoformat()}
+            for s in sorted(seasons, key=lambda s: s.start)
+        ],
+        ensure_ascii=False,
+    )
+    db.merge(models.AppMeta(key=META_KEY, value=raw))
+
+
+def season_for(day: date, defined: List[Season]) -> Season:
+    for s in defined:
+        if s.contains(day):
+            return s
+    return quarter_of(day)
+
+
+def get(season_id: str, defined: List[Season]) -> Optional[Season]:
+    for s in defined:
+        if s.id == season_id:
+            return s
+    m = _QUARTER_RE.match(season_id or "")
+    if m:
+        return quarter_of(date(int(m.group(1)), 3 * (int(m.group(2)) - 1) + 1, 1))
+    return None
@@ -9,7 +9,7 @@ from typing import Any, Dict
 
 from sqlalchemy.orm import Session
 
-from app import models
+from app import generations, models, player_totals
 
 
 SEED_PATH = Path(__file__).parent / "seed" / "blue_records.json"
@@ -55,6 +55,9 @@ def ensure_blue_records_seed(db: Session) -> bool:
 
     payload = json.loads(raw.decode("utf-8"))
     import_blue_records_base_stats(db, payload)
+    db.flush()
+    player_totals.sync_base(db)
+    generations.bump(db, generations.USERS)
 
     if not meta:
         meta = models.AppMeta(key=META_KEY, value=sha)
@@ -0,0 +1,198 @@
+# app/slowlog.py
+"""
+느린 쿼리 로그 + EXPLAIN QUERY PLAN.
+
+- threshold_ms 를 넘은 쿼리는 "yume.sql" 로거에 SQL / 파라미터 모양 / 시간 / 라우트를 남긴다.
+  (파라미터 값 자체는 남기지 않는다. 개인 정보·리뷰 로그가 들어갈 수 있어서 타입/길이만)
+- 문장 모양(shape)별로 모아 둔다. IN (?, ?, ?) 처럼 개수만 다른 것은 같은 모양으로 본다.
+- 모양마다 처음 느렸을 때 같은 연결에서 EXPLAIN QUERY PLAN 을 1번 돌려서 같이 저장한다.
+- 워커(프로세스) 메모리에만 두고, 최대 max_shapes 개까지 (넘치면 누적 시간이 가장 작은 것부터 버린다).
+  → /admin/perf/slow-queries 에서 확인.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+
+from app import metrics
+from app.routing import current_route
+
+logger = logging.getLogger("yume.sql")
+
+slow_queries = metrics.registry.register(
+    metrics.Counter("yume_sql_slow_queries_total", "느린 쿼리 수 (YUME_SLOW_QUERY_MS 초과)", ("route",))
+)
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def statement_shape(statement: str) -> str:
+    s = _SPACES.sub(" ", statement).strip()
+    return _IN_LIST.sub("(?, ...)", s)
+
+
+def _param_shape(value: Any) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"bytes[{len(value)}]"
+    if isinstance(value, str):
+        return f"str[{len(value)}]"
+    return type(value).__name__
+
+
+def params_shape(parameters: Any, executemany: bool) -> str:
+    if executemany:
+        rows = list(parameters or [])
+        first = params_shape(rows[0], False) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        inner = ", ".join(f"{k}={_param_shape(v)}" for k, v in parameters.items())
+        return "{" + inner + "}"
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 12:
+            head = ", ".join(_param_shape(v) for v in parameters[:12])
+            return f"({head}, ... {len(parameters)} params)"
+        return "(" + ", ".join(_param_shape(v) for v in parameters) + ")"
+    return "()"
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = 200.0, max_shapes: int = 200) -> None:
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def _explain(self, cursor, statement: str, parameters: Any) -> str:
+        head = statement.lstrip()[:10].upper()
+        if not head.startswith(_EXPLAINABLE):
+            return "(EXPLAIN 대상 아님)"
+        try:
+            # 같은 DBAPI 연결에서 새 커서로 돌린다. EXPLAIN QUERY PLAN 은 실제로 실행하지 않는다.
+            cur = cursor.connection.cursor()
+            try:
+                cur.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+        except Exception as exc:  # 계측 때문에 요청이 깨지면 안 된다.
+            return f"(EXPLAIN 실패: {exc})"
+        # (id, parent, notused, detail) → 들여쓰기 트리
+        depth: Dict[int, int] = {0: -1}
+        lines: List[str] = []
+        for row in rows:
+            node, parent, detail = row[0], row[1], row[-1]
+            d = depth.get(parent, -1) + 1
+            depth[node] = d
+            lines.append("  " * d + str(detail))
+        return "\n".join(lines) or "(빈 plan)"
+
+    def record(
+        self,
+        cursor,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        elapsed_ms: float,
+        route: str,
+    ) -> None:
+        shape = statement_shape(statement)
+        pshape = params_shape(parameters, executemany)
+
+        with self._lock:
+            entry = self._entries.get(shape)
+            need_plan = entry is None
+        plan = self._explain(cursor, statement, parameters) if need_plan and not executemany else None
+
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.max_shapes:
+                    victim = min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                    del self._entries[victim]
+                entry = {
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                    "plan": plan or "(executemany - plan 생략)",
+                    "first_seen": now,
+                }
+                self._entries[shape] = entry
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            if elapsed_ms >= entry["max_ms"]:
+                entry["max_ms"] = elapsed_ms
+                entry["max_params"] = pshape
+            entry["last_ms"] = elapsed_ms
+            entry["last_params"] = pshape
+            entry["last_route"] = route
+            entry["last_seen"] = now
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+
+        slow_queries.inc((route,))
+        logger.warning(
+            "slow query %.1fms on %s: %s params=%s",
+            elapsed_ms,
+            route,
+            shape[:500],
+            pshape,
+        )
+
+    def worst(self, limit: int = 50, sort: str = "total") -> List[Dict[str, Any]]:
+        key = {"total": "total_ms", "max": "max_ms", "count": "count"}.get(sort, "total_ms")
+        with self._lock:
+            rows = [dict(e, routes=dict(e["routes"])) for e in self._entries.values()]
+        for r in rows:
+            r["avg_ms"] = r["total_ms"] / r["count"] if r["count"] else 0.0
+            r["routes"] = sorted(r["routes"].items(), key=lambda kv: -kv[1])
+        rows.sort(key=lambda r: -r[key])
+        return rows[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slowlog = SlowQueryLog()
+
+
+def install(engine, *, threshold_ms: float, max_shapes: int = 200) -> None:
+    """engine 에 느린 쿼리 기록 이벤트를 건다. threshold_ms <= 0 이면 아무것도 안 한다."""
+    slowlog.threshold_ms = threshold_ms
+    slowlog.max_shapes = max_shapes
+    if not slowlog.enabled or getattr(engine, "_yume_slowlog", False):
+        return
+    engine._yume_slowlog = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault("yume_slow_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        stack = conn.info.get("yume_slow_start")
+        if not stack:
+            return
+        elapsed_ms = (time.perf_counter() - stack.pop()) * 1000.0
+        if elapsed_ms < slowlog.threshold_ms:
+            return
+        # 라우트는 MetricsMiddleware 가 넣어 둔 것 (요청 밖 - 시작/정비 작업 - 이면 <none>)
+        route = current_route.get() or "<none>"
+        slowlog.record(cursor, statement, parameters, executemany, elapsed_ms, route)
@@ -0,0 +1,261 @@
+# app/sqlstats.py
+"""
+요청별 SQL 계측 (SQLAlchemy 커서 이벤트).
+
+- 요청마다 실행한 쿼리 수 / DB 시간을 모아서 Server-Timing 헤더로 내보낸다.
+      Server-Timing: db;dur=3.2;desc="7 queries"
+  (스트리밍 응답은 헤더가 먼저 나가므로, 본문을 만들면서 실행한 쿼리는 헤더에 안 들어간다.
+   대신 /metrics 의 yume_sql_* 에는 끝까지 다 들어간다.)
+- 같은 SQL 문장(파라미터만 다른 것)이 한 요청에서 threshold 번 이상 나오면 N+1 로 보고
+  "yume.sql" 로거에 경고를 남기고 yume_sql_n_plus_one_total 을 올린다.
+- 스트리밍 본문에서 묶음(batch)마다 도는 쿼리(streaming.iter_with_session)는 반복이 정상이라
+  streamed() 블록 안에서는 N+1 판정에서 뺀다(수/시간은 그대로 센다).
+- 테스트용 assert_max_queries() 로 라우트별 쿼리 수 상한을 걸 수 있다.
+
+요청 구분은 ContextVar 로 한다. 동기 라우트/스트리밍 제너레이터는 스레드풀에서 돌지만
+anyio 가 컨텍스트를 복사해서 넘기므로 같은 RequestStats 객체를 본다.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+from app.routing import route_label
+
+logger = logging.getLogger("yume.sql")
+
+sql_queries = metrics.registry.register(
+    metrics.Counter("yume_sql_queries_total", "요청 중 실행한 SQL 문장 수", ("route",))
+)
+sql_seconds = metrics.registry.register(
+    metrics.Counter("yume_sql_seconds_total", "요청 중 SQL 실행에 쓴 시간(초)", ("route",))
+)
+sql_per_request = metrics.registry.register(
+    metrics.Histogram(
+        "yume_sql_queries_per_request",
+        "요청 1건당 SQL 문장 수",
+        ("route",),
+        (1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    )
+)
+sql_n_plus_one = metrics.registry.register(
+    metrics.Counter("yume_sql_n_plus_one_total", "N+1 로 보이는 반복 쿼리가 나온 요청 수", ("route",))
+)
+
+
+class RequestStats:
+    """요청 1건 동안의 SQL 통계."""
+
+    __slots__ = ("scope", "count", "seconds", "by_statement", "streamed", "in_stream")
+
+    def __init__(self, scope: Optional[Scope] = None) -> None:
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        # 문장(파라미터 자리는 ?) -> [횟수, 누적 시간]
+        self.by_statement: Dict[str, List[float]] = {}
+        # streamed() 안에서 실행한 쿼리 수 (N+1 판정 제외)
+        self.streamed = 0
+        self.in_stream = False
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope) if self.scope is not None else "<none>"
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if self.in_stream:
+            self.streamed += 1
+            return
+        row = self.by_statement.get(statement)
+        if row is None:
+            self.by_statement[statement] = [1, elapsed]
+        else:
+            row[0] += 1
+            row[1] += elapsed
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, float]]:
+        """threshold 번 이상 반복된 문장 (많이 나온 순)."""
+        out = [(s, int(n), t) for s, (n, t) in self.by_statement.items() if n >= threshold]
+        out.sort(key=lambda r: -r[1])
+        return out
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000.0:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("yume_sql_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def streamed() -> Iterator[None]:
+    """
+    블록 안의 쿼리는 N+1 판정에서 뺀다(스트리밍 본문의 묶음별 조회처럼 반복이 정상인 것).
+    응답 헤더는 이미 나간 뒤라 Server-Timing 에도 안 들어간다.
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    prev = stats.in_stream
+    stats.in_stream = True
+    try:
+        yield
+    finally:
+        stats.in_stream = prev
+
+
+# ============================
+#   엔진 이벤트
+# ============================
+
+_captures_lock = threading.Lock()
+_captures: List["QueryLog"] = []
+
+
+def install(engine) -> None:
+    """engine 에 커서 이벤트를 건다 (앱 시작 때 1번)."""
+    if getattr(engine, "_yume_sqlstats", False):
+        return
+    engine._yume_sqlstats = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault("yume_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        stack = conn.info.get("yume_query_start")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if _captures:
+            with _captures_lock:
+                for cap in _captures:
+                    cap.add(stats, statement, elapsed)
+
+
+# ============================
+#   미들웨어
+# ============================
+
+
+class SQLStatsMiddleware:
+    def __init__(self, app: ASGIApp, *, n_plus_one_threshold: int = 5) -> None:
+        self.app = app
+        self.threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(stats)
+
+    def _report(self, stats: RequestStats) -> None:
+        if not stats.count:
+            return
+        route = stats.route
+        sql_queries.inc((route,), stats.count)
+        sql_seconds.inc((route,), stats.seconds)
+        sql_per_request.observe((route,), stats.count)
+
+        repeated = stats.repeated(self.threshold)
+        if repeated:
+            sql_n_plus_one.inc((route,))
+            statement, n, spent = repeated[0]
+            logger.warning(
+                "N+1 suspected on %s: %d x %.1fms %s",
+                route,
+                n,
+                spent * 1000.0,
+                " ".join(statement.split())[:300],
+            )
+
+
+# ============================
+#   테스트 도우미
+# ============================
+
+
+class QueryLog:
+    """capture_queries() 가 모은 쿼리 목록. (route, statement, seconds)"""
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[str, str, float]] = []
+
+    def add(self, stats: Optional[RequestStats], statement: str, elapsed: float) -> None:
+        route = stats.route if stats is not None else "<none>"
+        self.entries.append((route, statement, elapsed))
+
+    def count(self, route: Optional[str] = None) -> int:
+        if route is None:
+            return len(self.entries)
+        return sum(1 for r, _, _ in self.entries if r == route)
+
+    def statements(self, route: Optional[str] = None) -> List[str]:
+        return [s for r, s, _ in self.entries if route is None or r == route]
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """
+    블록 안에서 실행된 모든 쿼리를 모은다(스레드 무관). TestClient 는 다른 스레드에서
+    앱을 돌리기 때문에 ContextVar 대신 전역 목록으로 모은다.
+    """
+    log = QueryLog()
+    with _captures_lock:
+        _captures.append(log)
+    try:
+        yield log
+    finally:
+        with _captures_lock:
+            _captures.remove(log)
+
+
+@contextmanager
+def assert_max_queries(limit: int, *, route: Optional[str] = None) -> Iterator[QueryLog]:
+    """
+    쿼리 수 상한 검사. route 를 주면 그 라우트 템플릿에서 실행된 것만 센다.
+
+        with TestClient(app) as client, assert_max_queries(6, route="/ranking/"):
+            client.get("/ranking/")
+    """
+    with capture_queries() as log:
+        yield log
+    n = log.count(route)
+    if n > limit:
+        listing = "\n".join(f"  {' '.join(s.split())[:200]}" for s in log.statements(route))
+        where = f" on {route}" if route else ""
+        raise AssertionError(f"expected at most {limit} queries{where}, got {n}:\n{listing}")
@@ -0,0 +1,184 @@
+// app/static/js/live.js
+// 매치 목록 / 랭킹 페이지를 /bluewar/events (SSE) 로 받은 새 매치로 직접 고친다.
+// - 매치 목록: 첫 페이지 맨 위에 새 줄을 끼우고 맨 아래 줄을 뺀다(필터가 맞을 때만).
+// - 랭킹: 승자/패자 줄의 숫자를 고치고 다시 정렬한다. 표에 없는 플레이어면 새로고침 안내만 띄운다.
+// 큐가 넘쳐서 "resync" 가 오면 안내만 띄운다(페이지를 멋대로 새로고침하지 않는다).
+(function () {
+    "use strict";
+
+    var body = document.querySelector("tbody[data-live]");
+    if (!body || !window.EventSource) {
+        return;
+    }
+    var kind = body.getAttribute("data-live");
+    var notice = document.querySelector(".live-notice");
+
+    function showNotice() {
+        if (notice) {
+            notice.hidden = false;
+        }
+    }
+
+    function cell(tr, text, className) {
+        var td = document.createElement("td");
+        if (className) {
+            td.className = className;
+        }
+        td.textContent = text;
+        tr.appendChild(td);
+        return td;
+    }
+
+    // ---- 매치 목록 ----
+
+    function onMatch(m) {
+        var mode = body.getAttribute("data-mode");
+        var status = body.getAttribute("data-status");
+        if ((mode !== "all" && m.mode !== mode) || (status !== "all" && m.status !== status)) {
+            return;
+        }
+        if (body.querySelector('tr[data-match-id="' + m.id + '"]')) {
+            return;
+        }
+
+        var tr = document.createElement("tr");
+        tr.setAttribute("data-match-id", m.id);
+
+        var first = document.createElement("td");
+        var link = document.createElement("a");
+        link.href = "/bluewar/matches/" + m.id;
+        link.className = "link";
+        link.textContent = "#" + m.id;
+        first.appendChild(link);
+        if (body.getAttribute("data-admin")) {
+            var sub = document.createElement("div");
+            sub.className = "cell-sub";
+            var admin = document.createElement("a");
+            admin.href = "/records/" + m.id;
+            admin.className = "link-muted";
+            admin.textContent = "관리 상세";
+            sub.appendChild(admin);
+            first.appendChild(sub);
+        }
+        tr.appendChild(first);
+
+        cell(tr, m.mode);
+        cell(tr, m.status);
+        cell(tr, m.starter);
+        cell(tr, m.winner);
+        cell(tr, m.loser);
+        cell(tr, m.win_gap === null ? "-" : String(m.win_gap));
+        cell(tr, m.total_rounds === null ? "-" : String(m.total_rounds));
+        cell(tr, String(m.pcount));
+        var when = cell(tr, "", "cell-muted");
+        when.appendChild(document.createTextNode("S: " + (m.started_at || "-")));
+        when.appendChild(document.createElement("br"));
+        when.appendChild(document.createTextNode("E: " + (m.finished_at || "-")));
+        cell(tr, m.note || "-", "cell-muted");
+
+        body.insertBefore(tr, body.firstChild);
+
+        var pageSize = parseInt(body.getAttribute("data-page-size"), 10) || 50;
+        var rows = body.querySelectorAll("tr[data-match-id]");
+        for (var i = pageSize; i < rows.length; i++) {
+            body.removeChild(rows[i]);
+        }
+        var total = document.getElementById("match-total");
+        if (total) {
+            total.textContent = String((parseInt(total.textContent, 10) || 0) + 1);
+        }
+    }
+
+    // ---- 랭킹 ----
+
+    function num(tr, name) {
+        return parseInt(tr.getAttribute("data-" + name), 10) || 0;
+    }
+
+    function bump(tr, name, by) {
+        tr.setAttribute("data-" + name, String(num(tr, name) + by));
+    }
+
+    function redraw(tr) {
+        var wins = num(tr, "wins");
+        var losses = num(tr, "losses");
+        var totalWins = wins + num(tr, "base-wins");
+        var totalLosses = losses + num(tr, "base-losses");
+        var battles = totalWins + totalLosses;
+        var net = num(tr, "gap-plus") - num(tr, "gap-minus");
+        var tds = tr.children;
+        tds[3].textContent = String(wins + losses);
+        tds[4].textContent = String(wins);
+        tds[5].textContent = String(losses);
+        tds[7].textContent = totalWins + "/" + totalLosses;
+        tds[8].textContent = (battles ? (totalWins / battles) * 100 : 0).toFixed(1) + "%";
+        tds[9].textContent = num(tr, "gap-plus") + "/" + num(tr, "gap-minus");
+        tds[10].textContent = (net >= 0 ? "+" : "") + net;
+    }
+
+    function sortKey(tr) {
+        return [
+            num(tr, "gap-minus") - num(tr, "gap-plus"),
+            -(num(tr, "wins") + num(tr, "base-wins")),
+            -(num(tr, "wins") + num(tr, "losses")),
+        ];
+    }
+
+    function compare(a, b) {
+        var ka = sortKey(a);
+        var kb = sortKey(b);
+        for (var i = 0; i < ka.length; i++) {
+            if (ka[i] !== kb[i]) {
+                return ka[i] - kb[i];
+            }
+        }
+        var na = a.getAttribute("data-name") || "";
+        var nb = b.getAttribute("data-name") || "";
+        return na < nb ? -1 : na > nb ? 1 : 0;
+    }
+
+    function onRanking(m) {
+        var mode = body.getAttribute("data-mode");
+        if (!m.winner_id || !m.loser_id || (mode !== "all" && m.mode !== mode)) {
+            return;
+        }
+        var winner = body.querySelector('tr[data-discord-id="' + CSS.escape(m.winner_id) + '"]');
+        var loser = body.querySelector('tr[data-discord-id="' + CSS.escape(m.loser_id) + '"]');
+        if (!winner || !loser) {
+            showNotice();
+        }
+        var gap = m.win_gap || 0;
+        if (winner) {
+            bump(winner, "wins", 1);
+            bump(winner, "gap-plus", gap);
+            redraw(winner);
+        }
+        if (loser) {
+            bump(loser, "losses", 1);
+            bump(loser, "gap-minus", gap);
+            redraw(loser);
+        }
+        var rows = Array.prototype.slice.call(body.querySelectorAll("tr[data-discord-id]"));
+        rows.sort(compare);
+        rows.forEach(function (tr, i) {
+            tr.children[0].textContent = String(i + 1);
+            body.appendChild(tr);
+        });
+    }
+
+    var source = new EventSource("/bluewar/events");
+    source.addEventListener("match", function (e) {
+        var m;
+        try {
+            m = JSON.parse(e.data);
+        } catch (err) {
+            return;
+        }
+        if (kind === "matches") {
+            onMatch(m);
+        } else if (kind === "ranking") {
+            onRanking(m);
+        }
+    });
+    source.addEventListener("resync", showNotice);
+})();
@@ -0,0 +1,91 @@
+# app/streaming.py
+"""
+큰 목록 페이지용 스트리밍 렌더링 도우미.
+
+- 템플릿을 문자열 하나로 다 만든 뒤 보내는 대신, Jinja 의 generate() 로 조각조각 흘려보낸다.
+- 목록 행은 별도 세션에서 yield_per 로 조금씩 읽어서 템플릿 for 루프에 바로 넘긴다.
+  → 테이블이 커져도 첫 바이트까지 시간(TTFB)과 워커 메모리가 거의 일정하게 유지된다.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TypeVar
+
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+from sqlalchemy.orm import Session
+
+from app import sqlstats
+from app.database import SessionLocal
+
+T = TypeVar("T")
+
+# 한 번에 소켓으로 내보낼 HTML 크기 (Jinja 는 아주 잘게 쪼개서 주기 때문에 모아서 보낸다)
+CHUNK_SIZE = 16 * 1024
+
+# DB 에서 한 번에 가져올 행 수 (Query.yield_per)
+BATCH_SIZE = 200
+
+
+def _buffered(parts: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    buf: List[str] = []
+    size = 0
+    for s in parts:
+        buf.append(s)
+        size += len(s)
+        if size >= chunk_size:
+            yield "".join(buf).encode("utf-8")
+            buf = []
+            size = 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def stream_template(
+    templates: Jinja2Templates,
+    name: str,
+    context: Dict[str, Any],
+    *,
+    status_code: int = 200,
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamingResponse:
+    """
+    TemplateResponse 대신 쓰는 스트리밍 버전.
+
+    context 안의 목록 값은 generator 여도 된다(템플릿의 for 루프가 끝까지 소비한다).
+    Template.generate() 는 동기 generator 라서 Starlette 가 threadpool 에서 돌려준다.
+    (DB 세션도 동기라서 async 렌더링보다 이쪽이 맞다)
+    """
+    template = templates.get_template(name)
+    return StreamingResponse(
+        _buffered(template.generate(context), chunk_size),
+        status_code=status_code,
+        media_type="text/html; charset=utf-8",
+    )
+
+
+def iter_with_session(produce: Callable[[Session], Iterable[T]]) -> Iterator[T]:
+    """
+    응답 스트리밍 동안 쓸 전용 세션을 열어서 produce(db) 의 결과를 흘려준다.
+
+    Depends(get_db) 세션은 응답 본문을 다 보내기 전에 닫힐 수 있어서
+    스트리밍 중에 읽는 행은 여기서 연 세션으로 읽는다. 다 읽으면(또는 중간에 끊기면) 닫는다.
+    여기서 묶음마다 도는 쿼리는 N+1 이 아니므로 sqlstats 판정에서 뺀다.
+    """
+    db = SessionLocal()
+    try:
+        with sqlstats.streamed():
+            yield from produce(db)
+    finally:
+        db.close()
+
+
+def chunked(rows: Iterable[T], size: int = BATCH_SIZE) -> Iterator[List[T]]:
+    """yield_per 로 읽은 행을 size 개씩 묶는다(묶음 단위로 표시 이름 등을 한 번에 조회하기 위함)."""
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
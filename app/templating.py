@@ -0,0 +1,14 @@
+# app/templating.py
+"""
+라우터들이 같이 쓰는 Jinja2Templates 인스턴스.
+
+- base.html 이 asset_url() 로 fingerprint 된 CSS 주소를 넣기 때문에,
+  모든 라우터가 같은 환경(globals)을 써야 한다.
+"""
+
+from fastapi.templating import Jinja2Templates
+
+from app.assets import asset_url
+
+templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["asset_url"] = asset_url
@@ -0,0 +1,278 @@
+# app/words.py
+"""
+복기 로그(review_log) 단어 역색인 + 단어 통계.
+
+- bluewar_word_uses  : 단어 → (match_id, turn, side)  "브로콜리 쓴 매치" = PK 범위 조회
+- bluewar_word_stats : (mode, 단어) → 쓴 횟수 / 나온 매치 수 / 첫 단어 횟수 / 첫 단어로 시작한 판의 승패
+
+create_match 에서 apply_match() 로 한 판씩 갱신하고(같은 트랜잭션),
+rebuild() 는 전체 기록(아카이브 포함 세션)을 다시 읽어 만든다. 예전처럼 review_log LIKE 스캔은 하지 않는다.
+
+복기 로그 읽는 규칙 (split_log):
+- 줄바꿈 / 화살표(→, ->, =>, ➡) / 쉼표로 턴을 나눈다.
+- 턴마다 앞의 "12." 같은 번호, "[시호]" 나 "시호:" 같은 말한 사람 표시, 뒤의 "(3초)" 같은 괄호를 떼고
+  처음 나오는 한글/영문/숫자 덩어리를 단어로 본다. 영문은 소문자로.
+- 턴은 1부터, 사이드는 시작한 사람(starter)이 1 이고 번갈아 간다.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+WU = models.BlueWarWordUse
+WS = models.BlueWarWordStat
+
+BACKFILL_META_KEY = "word_index_backfill_v1"
+
+WORD_MAX = 32      # bluewar_word_uses.word 길이
+MAX_TURNS = 500    # 한 판에서 읽는 최대 턴 수
+REBUILD_BATCH = 2000
+
+# bluewar_word_stats 의 누적 컬럼들
+_COUNTS = ("uses", "matches", "openings", "opening_wins", "opening_decided")
+
+_TURN_SPLIT_RE = re.compile(r"\s*(?:→|➡|->|=>|\n|,)\s*")
+_NUMBER_RE = re.compile(r"^\d+\s*[.)]\s*")
+_SPEAKER_RE = re.compile(r"^(?:\[[^\]]{0,40}\]|[^:：\s][^:：]{0,39}[:：])\s*")
+_TRAILER_RE = re.compile(r"\s*[(\[].*$")
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def normalize(word: str) -> str:
+    """검색어/단어를 저장 형식으로. 단어가 아니면 빈 문자열."""
+    m = _WORD_RE.search((word or "").strip())
+    return m.group(0).lower()[:WORD_MAX] if m else ""
+
+
+def split_log(review_log: Optional[str]) -> List[Tuple[int, int, str]]:
+    """복기 로그 → [(turn, side, word)]. 단어가 없는 조각은 턴으로 세지 않는다."""
+    out: List[Tuple[int, int, str]] = []
+    if not review_log:
+        return out
+    for piece in _TURN_SPLIT_RE.split(review_log):
+        piece = _NUMBER_RE.sub("", piece.strip())
+        piece = _SPEAKER_RE.sub("", piece)
+        piece = _TRAILER_RE.sub("", piece)
+        word = normalize(piece)
+        if not word:
+            continue
+        turn = len(out) + 1
+        out.append((turn, 1 if turn % 2 == 1 else 2, word))
+        if turn >= MAX_TURNS:
+            break
+    return out
+
+
+def _opening_result(starter: Optional[str], winner: Optional[str], loser: Optional[str]) -> Tuple[int, int]:
+    """(시작한 사람이 이겼나, 승패가 났나) → 0/1. AI 한테 진 연습판처럼 승자가 없어도 패자가 있으면 난 판."""
+    decided = 1 if (winner or loser) else 0
+    won = 1 if decided and starter and winner == starter else 0
+    return won, decided
+
+
+def _stat_rows(
+    mode: str, match_id: int, turns: Sequence[Tuple[int, int, str]], won: int, decided: int
+) -> Dict[str, Dict[str, Any]]:
+    """한 판의 단어 통계 증가분: word → 값."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for turn, _side, word in turns:
+        r = rows.get(word)
+        if r is None:
+            r = rows[word] = {
+                "mode": mode, "word": word, "uses": 0, "matches": 1,
+                "openings": 0, "opening_wins": 0, "opening_decided": 0, "last_match_id": match_id,
+            }
+        r["uses"] += 1
+        if turn == 1:
+            r["openings"] = 1
+            r["opening_wins"] = won
+            r["opening_decided"] = decided
+    return rows
+
+
+def _upsert_stats(db: Session, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    stmt = sqlite_insert(WS.__table__)
+    c = WS.__table__.c
+    ex = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["mode", "word"],
+        set_={
+            "uses": c.uses + ex.uses,
+            "matches": c.matches + ex.matches,
+            "openings": c.openings + ex.openings,
+            "opening_wins": c.opening_wins + ex.opening_wins,
+            "opening_decided": c.opening_decided + ex.opening_decided,
+            "last_match_id": func.max(func.coalesce(c.last_match_id, 0), ex.last_match_id),
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def _insert_uses(db: Session, rows: List[Dict[str, Any]]) -> None:
+    if rows:
+        db.execute(sqlite_insert(WU.__table__).on_conflict_do_nothing(), rows)
+
+
+def apply_match(db: Session, match: models.BlueWarMatch) -> int:
+    """매치 1건의 단어를 색인/통계에 반영한다 (커밋은 호출한 쪽). 읽은 단어 수."""
+    turns = split_log(match.review_log)
+    if not turns:
+        return 0
+    _insert_uses(
+        db,
+        [{"word": w, "match_id": match.id, "turn": t, "side": s, "mode": match.mode} for t, s, w in turns],
+    )
+    won, decided = _opening_result(match.starter_discord_id, match.winner_discord_id, match.loser_discord_id)
+    _upsert_stats(db, list(_stat_rows(match.mode, match.id, turns, won, decided).values()))
+    return len(turns)
+
+
+def rebuild(db: Session) -> int:
+    """
+    전체 매치 복기 로그로 다시 만든다(커밋은 호출한 쪽). 색인한 단어 수.
+    아카이브까지 넣으려면 archive.all_tiers() 세션으로 부를 것.
+    """
+    db.execute(text("DELETE FROM bluewar_word_uses"))
+    db.execute(text("DELETE FROM bluewar_word_stats"))
+
+    totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    indexed = 0
+    last_id = 0
+    while True:
+        # 같은 연결로 쓰면서 읽으므로 커서를 열어두지 않고 id 구간씩 끊어 읽는다.
+        batch = db.execute(
+            text(
+                "SELECT id, mode, starter_discord_id, winner_discord_id, loser_discord_id, review_log "
+                "FROM bluewar_matches WHERE id > :last AND review_log IS NOT NULL AND review_log != '' "
+                "ORDER BY id LIMIT :n"
+            ),
+            {"last": last_id, "n": REBUILD_BATCH},
+        ).all()
+        if not batch:
+            break
+        uses: List[Dict[str, Any]] = []
+        for mid, mode, starter, winner, loser, log in batch:
+            turns = split_log(log)
+            uses.extend(
+                {"word": w, "match_id": mid, "turn": t, "side": s, "mode": mode} for t, s, w in turns
+            )
+            won, decided = _opening_result(starter, winner, loser)
+            for word, r in _stat_rows(mode, mid, turns, won, decided).items():
+                acc = totals.get((mode, word))
+                if acc is None:
+                    totals[(mode, word)] = r
+                    continue
+                for k in _COUNTS:
+                    acc[k] += r[k]
+                acc["last_match_id"] = max(acc["last_match_id"], mid)
+        _insert_uses(db, uses)
+        indexed += len(uses)
+        last_id = batch[-1][0]
+
+    rows = list(totals.values())
+    for i in range(0, len(rows), REBUILD_BATCH):
+        _upsert_stats(db, rows[i:i + REBUILD_BATCH])
+    return indexed
+
+
+def ensure_backfill(db: Session) -> bool:
+    """단어 테이블이 처음 생겼을 때 기존 기록으로 1회 채운다. 채웠으면 True."""
+    meta = db.query(models.AppMeta).filter(models.AppMeta.key == BACKFILL_META_KEY).first()
+    if meta:
+        return False
+    rebuild(db)
+    db.add(models.AppMeta(key=BACKFILL_META_KEY, value="done"))
+    db.commit()
+    return True
+
+
+# ============================
+#   조회
+# ============================
+
+
+def _stat_dict(word: str, uses, matches, openings, wins, decided) -> Dict[str, Any]:
+    decided = int(decided or 0)
+    wins = int(wins or 0)
+    return {
+        "word": word,
+        "uses": int(uses or 0),
+        "matches": int(matches or 0),
+        "openings": int(openings or 0),
+        "opening_wins": wins,
+        "opening_decided": decided,
+        "opening_win_rate": round(wins / decided * 100.0, 1) if decided else None,
+    }
+
+
+def _top(db: Session, mode: str, order: str, limit: int, min_games: int = 0) -> List[Dict[str, Any]]:
+    """
+    order 컬럼(uses / openings) 기준 TOP N.
+    모드 하나면 (mode, order) 인덱스를 거꾸로 limit 개만 읽고, all 이면 모드별 줄을 단어로 합친다.
+    """
+    if mode == "all":
+        cols = [func.sum(getattr(WS, k)) for k in _COUNTS]
+        key = func.sum(getattr(WS, order))
+        q = db.query(WS.word, *cols).group_by(WS.word)
+        if order == "openings":
+            q = q.having(key > 0)
+        if min_games:
+            q = q.having(func.sum(WS.opening_decided) >= min_games)
+    else:
+        cols = [getattr(WS, k) for k in _COUNTS]
+        key = getattr(WS, order)
+        q = db.query(WS.word, *cols).filter(WS.mode == mode, key > 0)
+        if min_games:
+            q = q.filter(WS.opening_decided >= min_games)
+    rows = q.order_by(key.desc(), WS.word.asc()).limit(limit).all()
+    return [_stat_dict(*r) for r in rows]
+
+
+def top_words(db: Session, mode: str, limit: int = 30) -> List[Dict[str, Any]]:
+    """많이 쓴 단어."""
+    return _top(db, mode, "uses", limit)
+
+
+def top_openings(db: Session, mode: str, limit: int = 30, min_games: int = 0) -> List[Dict[str, Any]]:
+    """많이 쓴 첫 단어 + 그 단어로 시작했을 때 승률 (min_games: 승패 난 판이 이만큼 이상인 것만)."""
+    return _top(db, mode, "openings", limit, min_games)
+
+
+def word_stats(db: Session, word: str, mode: str) -> Optional[Dict[str, Any]]:
+    """단어 하나의 통계 (PK 조회, all 이면 모드 수만큼)."""
+    q = db.query(*[func.sum(getattr(WS, k)) for k in _COUNTS]).filter(WS.word == word)
+    if mode != "all":
+        q = q.filter(WS.mode == mode)
+    row = q.one()
+    if not row[0]:
+        return None
+    return _stat_dict(word, *row)
+
+
+def matches_with(
+    db: Session, word: str, mode: str, limit: int = 50, before_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    그 단어를 쓴 매치(최근 것부터), 매치당 1줄: 처음 쓴 턴/사이드 + 그 판에서 쓴 횟수.
+    PK (word, match_id, turn) 범위를 거꾸로 읽으며 match_id 로 묶으므로 before_id 로 끊어도 턴이 안 빠진다.
+    """
+    q = db.query(WU.match_id, func.min(WU.turn), WU.mode, func.count()).filter(WU.word == word)
+    if mode != "all":
+        q = q.filter(WU.mode == mode)
+    if before_id:
+        q = q.filter(WU.match_id < before_id)
+    rows = q.group_by(WU.match_id).order_by(WU.match_id.desc()).limit(limit).all()
+    # 사이드는 턴에서 정해진다(split_log: 홀수 턴이 시작한 쪽).
+    return [
+        {"match_id": mid, "turn": turn, "side": 1 if turn % 2 == 1 else 2, "mode": m, "uses": int(n)}
+        for mid, turn, m, n in rows
+    ]
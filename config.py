@@ -15,6 +15,12 @@ class Settings:
     """
 
     def __init__(self) -> None:
+        # DB 주소 (SQLAlchemy URL). 운영은 기본값 그대로 쓴다.
+        self.DATABASE_URL: str = os.getenv(
+            "YUME_DATABASE_URL",
+            "sqlite:////opt/yume-web/yume_admin.db",
+        )
+
         # 세션 시크릿 (운영에서는 .env 로 반드시 지정)
         self.SESSION_SECRET: str = os.getenv(
             "YUME_SESSION_SECRET",
@@ -45,6 +51,76 @@ class Settings:
         # 부트스트랩(초기 1인) 관리자 디스코드 ID (선택)
         self.BOOTSTRAP_ADMIN_DISCORD_ID = os.getenv("YUME_BOOTSTRAP_ADMIN_DISCORD_ID", "1433962010785349634").strip()
 
+        # 응답 압축 (gzip / brotli)
+        # - YUME_COMPRESSION=0 이면 끈다.
+        # - YUME_COMPRESSION_TYPES: "text/html:512,application/json" 처럼 content-type[:최소 바이트]
+        #   (비워두면 HTML/JSON/CSS/JS/CSV/NDJSON 기본 규칙)
+        self.COMPRESSION_ENABLED = os.getenv("YUME_COMPRESSION", "1").strip() not in {"0", "false", "off"}
+        self.COMPRESSION_MIN_SIZE = int(os.getenv("YUME_COMPRESSION_MIN_SIZE", "1024"))
+        self.COMPRESSION_GZIP_LEVEL = int(os.getenv("YUME_COMPRESSION_GZIP_LEVEL", "6"))
+        self.COMPRESSION_BROTLI_QUALITY = int(os.getenv("YUME_COMPRESSION_BROTLI_QUALITY", "4"))
+        self.COMPRESSION_TYPES = os.getenv("YUME_COMPRESSION_TYPES", "")
+
+        # /metrics (Prometheus) 토큰
+        # - 비워두면 /metrics 는 404 (외부에 열지 않는다)
+        # - Prometheus 에서는 Authorization: Bearer <토큰> 으로 긁어간다.
+        self.METRICS_TOKEN = os.getenv("YUME_METRICS_TOKEN", "").strip()
+
+        # 요청별 SQL 계측 (Server-Timing 헤더 + N+1 경고)
+        # - 한 요청에서 같은 SQL 이 YUME_SQL_N_PLUS_ONE 번 이상 나오면 "yume.sql" 로거에 경고
+        self.SQL_STATS_ENABLED = os.getenv("YUME_SQL_STATS", "1").strip() not in {"0", "false", "off"}
+        self.SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("YUME_SQL_N_PLUS_ONE", "5"))
+
+        # 느린 쿼리 로그 (ms). 0 이면 끈다. 모양별 최대 YUME_SLOW_QUERY_KEEP 개까지 메모리에 보관.
+        self.SLOW_QUERY_MS = float(os.getenv("YUME_SLOW_QUERY_MS", "200"))
+        self.SLOW_QUERY_KEEP = int(os.getenv("YUME_SLOW_QUERY_KEEP", "200"))
+
+        # 백그라운드 DB 정비 (app/maintenance.py). 주기는 초 단위, 0 이면 그 작업만 끈다.
+        self.MAINTENANCE_ENABLED = os.getenv("YUME_MAINTENANCE", "1").strip() not in {"0", "false", "off"}
+        self.MAINTENANCE_OPTIMIZE_INTERVAL = float(os.getenv("YUME_MAINT_OPTIMIZE_SEC", str(6 * 3600)))
+        self.MAINTENANCE_CHECKPOINT_INTERVAL = float(os.getenv("YUME_MAINT_CHECKPOINT_SEC", "600"))
+        self.MAINTENANCE_VACUUM_INTERVAL = float(os.getenv("YUME_MAINT_VACUUM_SEC", str(24 * 3600)))
+        self.MAINTENANCE_VACUUM_PAGES = int(os.getenv("YUME_MAINT_VACUUM_PAGES", "200"))
+        self.MAINTENANCE_COMPACTION_INTERVAL = float(os.getenv("YUME_MAINT_COMPACTION_SEC", "3600"))
+        self.MAINTENANCE_HOURLY_KEEP_DAYS = int(os.getenv("YUME_MAINT_HOURLY_KEEP_DAYS", "90"))
+        self.MAINTENANCE_JITTER = float(os.getenv("YUME_MAINT_JITTER", "0.1"))
+
+        # 온라인 백업 (app/backup.py, scripts/backup_db.py)
+        # - YUME_BACKUP_SEC 를 주면 정비 스케줄러가 그 주기로 스냅샷을 뜬다(기본 0 = cron 등 밖에서 돌림).
+        # - 한 단계에 YUME_BACKUP_PAGES 페이지씩 복사하고 YUME_BACKUP_STEP_SLEEP 초 쉰다.
+        self.BACKUP_DIR = os.getenv("YUME_BACKUP_DIR", "/opt/yume-web/backups")
+        self.BACKUP_INTERVAL = float(os.getenv("YUME_BACKUP_SEC", "0"))
+        self.BACKUP_PAGES = int(os.getenv("YUME_BACKUP_PAGES", "256"))
+        self.BACKUP_STEP_SLEEP = float(os.getenv("YUME_BACKUP_STEP_SLEEP", "0.02"))
+        # 원본이 계속 바뀌어서 못 뜨면(BackupBusy) 이만큼 뒤에 다시 (주기를 다 기다리지 않게)
+        self.BACKUP_RETRY_INTERVAL = float(os.getenv("YUME_BACKUP_RETRY_SEC", "600"))
+        self.BACKUP_KEEP_LAST = int(os.getenv("YUME_BACKUP_KEEP", "14"))
+        self.BACKUP_KEEP_DAILY = int(os.getenv("YUME_BACKUP_KEEP_DAILY", "30"))
+
+        # 오래된 매치 아카이브 (app/archive.py)
+        # - YUME_ARCHIVE_AFTER_DAYS 일보다 오래된 매치를 시즌별 파일로 옮긴다. 0 이면 끔(기본).
+        # - 정비 스케줄러가 YUME_ARCHIVE_SEC 주기로 확인한다.
+        self.ARCHIVE_DIR = os.getenv("YUME_ARCHIVE_DIR", "/opt/yume-web/archive")
+        self.ARCHIVE_AFTER_DAYS = int(os.getenv("YUME_ARCHIVE_AFTER_DAYS", "0"))
+        self.ARCHIVE_INTERVAL = float(os.getenv("YUME_ARCHIVE_SEC", str(24 * 3600)))
+
+        # 실시간 매치 알림 SSE (/bluewar/events, app/events.py). 값은 워커(프로세스)별.
+        # - 구독자가 YUME_SSE_MAX_SUBSCRIBERS 명을 넘으면 503 (페이지는 새로고침으로 그대로 쓸 수 있다)
+        # - 구독자마다 YUME_SSE_QUEUE 개까지 쌓아두고, 넘치면 버리고 "resync" 하나만 보낸다
+        # - 다른 워커가 받은 매치는 YUME_SSE_POLL_SEC 주기로 gen:matches 를 보고 가져온다(0 이면 끔)
+        self.SSE_ENABLED = os.getenv("YUME_SSE", "1").strip() not in {"0", "false", "off"}
+        self.SSE_MAX_SUBSCRIBERS = int(os.getenv("YUME_SSE_MAX_SUBSCRIBERS", "200"))
+        self.SSE_QUEUE = int(os.getenv("YUME_SSE_QUEUE", "32"))
+        self.SSE_HEARTBEAT = float(os.getenv("YUME_SSE_HEARTBEAT_SEC", "15"))
+        self.SSE_POLL_INTERVAL = float(os.getenv("YUME_SSE_POLL_SEC", "2"))
+
+        # 로그인/가입/업로드 요청 수 제한 (app/ratelimit.py). 값은 워커(프로세스)별.
+        # - YUME_RATE_LIMITS: "member_login:ip=20/60,ingest:ip=300/60" 처럼 기본 정책 중 바꿀 것만 (횟수/초)
+        # - 정책마다 IP/계정 키를 YUME_RATE_LIMIT_MAX_KEYS 개까지 기억한다(넘으면 오래 안 쓴 것부터 버림)
+        self.RATE_LIMIT_ENABLED = os.getenv("YUME_RATE_LIMIT", "1").strip() not in {"0", "false", "off"}
+        self.RATE_LIMITS = os.getenv("YUME_RATE_LIMITS", "")
+        self.RATE_LIMIT_MAX_KEYS = int(os.getenv("YUME_RATE_LIMIT_MAX_KEYS", "10000"))
+
 
 # 전역 settings 인스턴스
 settings = Settings()
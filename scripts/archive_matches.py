@@ -0,0 +1,91 @@
+"""archive_matches.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+    python scripts/archive_matches.py run --after-days 180 --dry-run   # 시즌별로 몇 판이 옮겨질지만
+    python scripts/archive_matches.py run --after-days 180
+    python scripts/archive_matches.py list
+    python scripts/archive_matches.py rebuild-players                  # 아카이브 파일로 합계 다시 계산
+
+오래된 매치를 시즌별 아카이브 파일(YUME_ARCHIVE_DIR/bluewar_<시즌>.db)로 옮긴다. 자세한 동작은 app/archive.py.
+YUME_ARCHIVE_AFTER_DAYS 를 주면 앱의 정비 스케줄러가 하루 한 번 같은 일을 한다.
+옮긴 뒤 DB 파일 크기를 줄이려면 incremental vacuum(DEPLOY.md 참고) 이나 서비스 정지 후 VACUUM.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Optional, Sequence
+
+from config import settings
+from app.database import Base, SessionLocal, engine
+from app.schema import ensure_sqlite_schema
+from app import archive
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    if args.after_days <= 0:
+        print("[!] --after-days 는 1 이상이어야 합니다")
+        return 2
+    t0 = time.perf_counter()
+    moved = archive.archive_old(
+        engine, args.dir, after_days=args.after_days, batch=args.batch, dry_run=args.dry_run
+    )
+    verb = "would move" if args.dry_run else "moved"
+    if not moved:
+        print(f"[*] nothing older than {args.after_days} days")
+    for sid, n in sorted(moved.items()):
+        print(f"[*] {verb} {n} matches -> {os.path.join(args.dir, archive.archive_file(sid))}")
+    print(f"    {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        rows = archive.list_archives(db)
+    finally:
+        db.close()
+    if not rows:
+        print("[*] no archives")
+    for a in rows:
+        path = os.path.join(args.dir, a.file)
+        size = f"{os.path.getsize(path) / 1024 / 1024:.1f}MB" if os.path.exists(path) else "MISSING"
+        print(f"{a.season_id:<12} {a.matches:>8} matches  ids {a.min_match_id}..{a.max_match_id}  {size:>9}  {a.file}")
+    return 0
+
+
+def cmd_rebuild_players(args: argparse.Namespace) -> int:
+    n = archive.rebuild_players(engine, args.dir)
+    print(f"[*] bluewar_archived_players rebuilt: {n} rows")
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="오래된 블루전 매치를 시즌 아카이브로 옮기기")
+    p.add_argument("--dir", default=settings.ARCHIVE_DIR, help="아카이브 디렉터리 (기본: YUME_ARCHIVE_DIR)")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="옮기기")
+    r.add_argument("--after-days", type=int, default=settings.ARCHIVE_AFTER_DAYS or 180)
+    r.add_argument("--batch", type=int, default=archive.BATCH)
+    r.add_argument("--dry-run", action="store_true")
+    r.set_defaults(fn=cmd_run)
+
+    sub.add_parser("list", help="아카이브 목록").set_defaults(fn=cmd_list)
+    sub.add_parser("rebuild-players", help="아카이브 합계 다시 계산").set_defaults(fn=cmd_rebuild_players)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    ensure_sqlite_schema(engine)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,279 @@
+"""backup_db.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+
+    # 스냅샷 뜨기 + 오래된 것 정리 (cron / systemd timer 에 걸어두면 된다)
+    python scripts/backup_db.py create
+    python scripts/backup_db.py list
+    python scripts/backup_db.py verify                 # 전부, 또는 --name 하나만
+
+    # 복원 (반드시 서비스 정지 후)
+    sudo systemctl stop yume-admin.service
+    python scripts/backup_db.py restore --at "2026-01-01 09:00"   # 이 시각(UTC) 이전 가장 최근 스냅샷
+    python scripts/backup_db.py restore --name yume_admin-20260101-083000.db.gz
+    sudo systemctl start yume-admin.service
+
+    # 백업 중 요청 지연 측정 (합성 DB 복사본, 운영 DB 말고)
+    python scripts/backup_db.py --db /tmp/yume_bench.db bench --members 8 --bots 2 --duration 15
+
+DB 경로는 YUME_DATABASE_URL(기본 /opt/yume-web/yume_admin.db), 백업 위치는 YUME_BACKUP_DIR.
+--db / --dir 로 바꿀 수 있다. 자세한 동작은 app/backup.py.
+
+bench 는 loadtest.py 의 시나리오를 그대로 써서
+"백업 없음" 구간과 "백업을 계속 돌리는" 구간의 p50/p95/p99 를 나란히 보여준다.
+--pages / --step-sleep 을 바꿔가며 운영 값(YUME_BACKUP_PAGES / YUME_BACKUP_STEP_SLEEP)을 고르면 된다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import settings
+from app import backup
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _db_path(args: argparse.Namespace) -> str:
+    path = args.db or backup.sqlite_path(settings.DATABASE_URL)
+    if not path:
+        raise SystemExit(f"[!] not a sqlite file database: {settings.DATABASE_URL}")
+    return path
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f}MB"
+
+
+def cmd_create(args: argparse.Namespace) -> int:
+    db_path = _db_path(args)
+    result = backup.create_snapshot(
+        db_path,
+        args.dir,
+        pages=args.pages,
+        step_sleep=args.step_sleep,
+        archive_dir=None if args.no_archives else settings.ARCHIVE_DIR,
+    )
+    snap = result.snapshot
+    print(
+        f"[*] {snap.path}: {_mb(result.raw_bytes)} -> {_mb(snap.size)}, "
+        f"{result.pages} pages / {result.steps} steps ({result.restarts} restarts), {result.seconds:.1f}s"
+    )
+    print(f"    sha256 {result.sha256}")
+    for path in result.archives:
+        print(f"    archive {path}")
+    if not args.no_rotate:
+        for s in backup.rotate(args.dir, db_path, keep_last=args.keep, keep_daily=args.keep_daily):
+            print(f"    rotated {s.name}")
+    return 0
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    snaps = backup.list_snapshots(args.dir, _db_path(args))
+    if not snaps:
+        print(f"[*] no snapshots in {args.dir}")
+        return 0
+    for s in snaps:
+        print(f"{s.taken_at:%Y-%m-%d %H:%M:%S}Z  {_mb(s.size):>9}  {s.name}")
+    return 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    db_path = _db_path(args)
+    snaps = [backup.pick(args.dir, db_path, name=args.name)] if args.name else backup.list_snapshots(args.dir, db_path)
+    bad = 0
+    for s in snaps:
+        ok = backup.verify(s)
+        bad += 0 if ok else 1
+        print(f"{'ok ' if ok else 'BAD'}  {s.name}")
+    return 1 if bad else 0
+
+
+def cmd_restore(args: argparse.Namespace) -> int:
+    db_path = _db_path(args)
+    at = datetime.strptime(args.at, "%Y-%m-%d %H:%M") if args.at else None
+    snap = backup.pick(args.dir, db_path, name=args.name, at=at)
+    if not args.yes:
+        answer = input(f"restore {snap.name} over {db_path}? (서비스는 멈췄나요?) [y/N] ")
+        if answer.strip().lower() not in {"y", "yes"}:
+            print("[*] cancelled")
+            return 1
+    moved = backup.restore(snap, db_path, check=not args.skip_checksum)
+    print(f"[*] restored {snap.name} -> {db_path}")
+    if moved:
+        print(f"    previous db kept at {moved}")
+    return 0
+
+
+# ============================
+#   bench: 백업 중 요청 지연
+# ============================
+
+
+def _backup_loop(db_path: str, out_dir: str, pages: int, step_sleep: float, stop: threading.Event, runs: List[float]) -> None:
+    while not stop.is_set():
+        for name in os.listdir(out_dir):
+            os.remove(os.path.join(out_dir, name))
+        result = backup.create_snapshot(db_path, out_dir, pages=pages, step_sleep=step_sleep)
+        runs.append(result.seconds)
+        # 같은 초에 두 번 뜨면 이름이 겹친다.
+        stop.wait(1.0)
+
+
+async def _bench(args: argparse.Namespace) -> int:
+    sys.path.insert(0, str(ROOT / "scripts"))
+    import loadtest
+
+    work = args.work or args.db + ".backupbench"
+    loadtest._copy_db(args.db, work)
+    # settings 는 이 스크립트가 이미 읽었으므로 환경변수와 같이 직접 바꿔준다(앱 import 전에).
+    os.environ["YUME_DATABASE_URL"] = settings.DATABASE_URL = f"sqlite:///{work}"
+    # loadtest 세션은 전부 한 IP/한 계정으로 로그인하므로 요청 수 제한은 끈다.
+    os.environ["YUME_RATE_LIMIT"] = "0"
+    settings.RATE_LIMIT_ENABLED = False
+    if args.token:
+        os.environ["YUME_API_TOKEN"] = settings.API_TOKEN = args.token
+    import httpx
+    from app.main import app
+
+    match_ids, player_ids = loadtest._targets(work, args.seed)
+    loadtest.print_journal_mode(work)
+    transport = httpx.ASGITransport(app=app)
+
+    def make_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=transport, base_url="http://backupbench", timeout=60.0)
+
+    async def step() -> Dict[str, Any]:
+        return await loadtest.run_step(
+            make_client,
+            members=args.members,
+            bots=args.bots,
+            duration=args.duration,
+            token=args.token,
+            bot_interval=args.bot_interval,
+            match_ids=match_ids,
+            player_ids=player_ids,
+            seed=args.seed,
+        )
+
+    lifespan = app.router.lifespan_context(app)
+    await lifespan.__aenter__()
+    out_dir = tempfile.mkdtemp(prefix="yume-backupbench-")
+    try:
+        print(f"[*] baseline ({args.duration:.0f}s, no backup)")
+        base = await step()
+
+        print(f"[*] with backup loop (pages={args.pages}, step_sleep={args.step_sleep})")
+        stop = threading.Event()
+        runs: List[float] = []
+        t = threading.Thread(
+            target=_backup_loop, args=(work, out_dir, args.pages, args.step_sleep, stop, runs), daemon=True
+        )
+        t.start()
+        during = await step()
+        stop.set()
+        await asyncio.to_thread(t.join)
+    finally:
+        await lifespan.__aexit__(None, None, None)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    before = {(r["scenario"], r["endpoint"]): r for r in base["endpoints"]}
+    print(f"\n    {'endpoint':<34} {'p50 ms':>15} {'p95 ms':>15} {'p99 ms':>15} {'err':>7}")
+    for r in during["endpoints"]:
+        b = before.get((r["scenario"], r["endpoint"]))
+        if b is None:
+            continue
+        cols = [f"{b[k]:>6.1f}→{r[k]:<7.1f}" for k in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"    {r['endpoint']:<34} {cols[0]:>15} {cols[1]:>15} {cols[2]:>15} {b['errors']:>3}→{r['errors']:<3}")
+    print(
+        f"\n    req/s {base['total_rps']:.1f} → {during['total_rps']:.1f}, "
+        f"locked {base['locked']} → {during['locked']}, "
+        f"backups {len(runs)} (avg {sum(runs) / len(runs) if runs else 0:.2f}s)"
+    )
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        doc = {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "pages": args.pages,
+            "step_sleep": args.step_sleep,
+            "backup_runs_s": runs,
+            "baseline": base,
+            "during_backup": during,
+        }
+        out.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[*] results -> {out}")
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    if not args.db:
+        raise SystemExit("[!] bench 는 --db (합성 DB) 가 필요합니다. 운영 DB 에 돌리지 말 것")
+    return asyncio.run(_bench(args))
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Yume Admin DB 온라인 백업 / 복원")
+    p.add_argument("--db", default=None, help="DB 파일 (기본: YUME_DATABASE_URL)")
+    p.add_argument("--dir", default=settings.BACKUP_DIR, help="스냅샷 디렉터리 (기본: YUME_BACKUP_DIR)")
+    p.add_argument("--pages", type=int, default=settings.BACKUP_PAGES, help="한 단계에 복사할 페이지 수")
+    p.add_argument("--step-sleep", type=float, default=settings.BACKUP_STEP_SLEEP, help="단계 사이 쉬는 시간(초)")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    c = sub.add_parser("create", help="스냅샷 뜨기 + 정리")
+    c.add_argument("--keep", type=int, default=settings.BACKUP_KEEP_LAST, help="최근 N 개는 무조건 남김")
+    c.add_argument("--keep-daily", type=int, default=settings.BACKUP_KEEP_DAILY, help="최근 N 일은 하루 1개씩 남김")
+    c.add_argument("--no-rotate", action="store_true")
+    c.add_argument("--no-archives", action="store_true", help="YUME_ARCHIVE_DIR 아카이브 파일은 안 뜬다")
+    c.set_defaults(fn=cmd_create)
+
+    sub.add_parser("list", help="스냅샷 목록").set_defaults(fn=cmd_list)
+
+    v = sub.add_parser("verify", help="sha256 확인")
+    v.add_argument("--name", default=None)
+    v.set_defaults(fn=cmd_verify)
+
+    r = sub.add_parser("restore", help="스냅샷으로 DB 교체 (서비스 정지 후)")
+    r.add_argument("--name", default=None, help="스냅샷 파일 이름")
+    r.add_argument("--at", default=None, help='이 시각(UTC, "YYYY-MM-DD HH:MM") 이전 가장 최근 스냅샷')
+    r.add_argument("--skip-checksum", action="store_true")
+    r.add_argument("--yes", action="store_true", help="확인 질문 없이")
+    r.set_defaults(fn=cmd_restore)
+
+    b = sub.add_parser("bench", help="백업 중 요청 지연 측정 (합성 DB 복사본)")
+    b.add_argument("--work", default=None, help="복사본 경로 (기본: <db>.backupbench)")
+    b.add_argument("--token", default=os.getenv("YUME_API_TOKEN"))
+    b.add_argument("--members", type=int, default=8)
+    b.add_argument("--bots", type=int, default=2)
+    b.add_argument("--bot-interval", type=float, default=0.5)
+    b.add_argument("--duration", type=float, default=15.0)
+    b.add_argument("--seed", type=int, default=7)
+    b.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    b.set_defaults(fn=cmd_bench)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        return args.fn(args)
+    except backup.BackupError as exc:
+        print(f"[!] {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
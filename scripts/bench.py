@@ -0,0 +1,340 @@
+"""bench.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+    python scripts/gen_bench_db.py --out /tmp/yume_bench.db          # 1번만
+    python scripts/bench.py --db /tmp/yume_bench.db --out bench_results/now.json
+    python scripts/bench.py --db /tmp/yume_bench.db --baseline bench_results/baseline.json
+    python scripts/bench.py --db /tmp/yume_bench.db --save-baseline bench_results/baseline.json
+
+합성 DB 복사본에 앱을 그대로 올려서(in-process, TestClient) 주요 화면/API 시간을 잰다.
+원본 DB 는 건드리지 않는다(--work 경로로 복사해서 쓴다). ETag 없이 매번 전체 렌더링한다.
+
+    - ranking_{pvp,practice,all}     : /ranking/?mode=...
+    - matches_{page1,filter,deep}    : /bluewar/matches/ 목록/필터/깊은 페이지
+    - search_{discord_id,review_log} : /bluewar/matches/?q=...
+    - match_detail / player_profile  : 상세 화면
+    - ingest                         : POST /bluewar/matches (봇 업로드)
+    - seed_import                    : import_blue_records_base_stats (유저 전체, 롤백)
+
+결과는 JSON 으로 저장하고(--out), --baseline 과 비교해서 느려진 항목을 표시한다.
+--fail-on-regression 이면 기준(--threshold, 기본 15%)보다 느려진 게 있을 때 종료 코드 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def _summary(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples_ms),
+        "min_ms": min(samples_ms),
+        "median_ms": statistics.median(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "p95_ms": _percentile(samples_ms, 95),
+        "max_ms": max(samples_ms),
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _db_info(path: str) -> Dict[str, Any]:
+    con = sqlite3.connect(path)
+    try:
+        info: Dict[str, Any] = {"size_mb": round(os.path.getsize(path) / 1024 / 1024, 1)}
+        # 운영은 delete(롤백 저널). 옛 벤치 DB 는 WAL 일 수 있어서 결과에 같이 남긴다.
+        info["journal_mode"] = str(con.execute("PRAGMA journal_mode").fetchone()[0]).lower()
+        for table in ("users", "bluewar_matches", "bluewar_participants"):
+            info[table] = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        return info
+    finally:
+        con.close()
+
+
+class Bench:
+    def __init__(self, client, *, repeat: int, warmup: int) -> None:
+        self.client = client
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, fn: Callable[[int], None], *, repeat: Optional[int] = None) -> None:
+        n = repeat or self.repeat
+        try:
+            for i in range(self.warmup):
+                fn(-1 - i)
+            samples: List[float] = []
+            for i in range(n):
+                t0 = time.perf_counter()
+                fn(i)
+                samples.append((time.perf_counter() - t0) * 1000.0)
+            self.results[name] = _summary(samples)
+            r = self.results[name]
+            print(f"    {name:<24} median {r['median_ms']:9.2f}ms  p95 {r['p95_ms']:9.2f}ms  (n={n})")
+        except Exception as exc:  # 한 항목이 깨져도 나머지는 잰다
+            self.results[name] = {"error": f"{type(exc).__name__}: {exc}"[:500]}
+            print(f"    {name:<24} ERROR {self.results[name]['error']}")
+
+    def get(self, url: str) -> Callable[[int], None]:
+        def fn(_i: int) -> None:
+            r = self.client.get(url)
+            if r.status_code != 200:
+                raise RuntimeError(f"GET {url} -> {r.status_code}")
+
+        return fn
+
+
+def run_suite(db_path: str, *, repeat: int, warmup: int, seed: int) -> Dict[str, Any]:
+    # 앱은 import 시점에 DB 엔진을 만들므로 환경변수를 먼저 넣는다.
+    os.environ["YUME_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("YUME_SLOW_QUERY_MS", "0")
+    os.environ.pop("YUME_API_TOKEN", None)
+    os.environ.pop("YUME_ADMIN_API_TOKEN", None)
+    sys.path.insert(0, str(ROOT))
+
+    from fastapi.testclient import TestClient
+
+    from app.database import SessionLocal
+    from app.main import app
+    from app.seed_import import import_blue_records_base_stats
+
+    con = sqlite3.connect(db_path)
+    try:
+        max_id = con.execute("SELECT max(id) FROM bluewar_matches").fetchone()[0] or 1
+        heavy = [
+            r[0]
+            for r in con.execute(
+                "SELECT discord_id FROM bluewar_participants WHERE discord_id IS NOT NULL "
+                "GROUP BY discord_id ORDER BY count(*) DESC LIMIT 20"
+            )
+        ]
+        all_users = [r[0] for r in con.execute("SELECT discord_id FROM users")]
+    finally:
+        con.close()
+
+    rng = random.Random(seed)
+    detail_ids = [rng.randint(1, max_id) for _ in range(repeat + warmup)]
+    player_ids = [rng.choice(heavy) for _ in range(repeat + warmup)] if heavy else []
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/member/login",
+            data={"discord_id": "시호", "password": "miyo"},
+            follow_redirects=False,
+        )
+        if r.status_code not in (302, 303):
+            raise SystemExit(f"[!] 로그인 실패: {r.status_code}")
+
+        b = Bench(client, repeat=repeat, warmup=warmup)
+
+        for mode in ("pvp", "practice", "all"):
+            b.run(f"ranking_{mode}", b.get(f"/ranking/?mode={mode}"))
+
+        b.run("matches_page1", b.get("/bluewar/matches/"))
+        b.run("matches_filter", b.get("/bluewar/matches/?mode=pvp&status=finished"))
+        b.run("matches_deep", b.get("/bluewar/matches/?page=200&page_size=50"))
+        if heavy:
+            b.run("search_discord_id", b.get(f"/bluewar/matches/?q={heavy[0]}"))
+        b.run("search_review_log", b.get("/bluewar/matches/?q=브로콜리"))
+
+        b.run("match_detail", lambda i: _check(client.get(f"/bluewar/matches/{detail_ids[i]}")))
+        if player_ids:
+            b.run("player_profile", lambda i: _check(client.get(f"/bluewar/players/{player_ids[i]}")))
+
+        base = datetime(2026, 1, 1)
+
+        def ingest(i: int) -> None:
+            a, c = rng.sample(heavy or ["1", "2"], 2)
+            t = base + timedelta(minutes=i + 1000)
+            payload = {
+                "mode": "pvp",
+                "status": "finished",
+                "starter_discord_id": a,
+                "winner_discord_id": a,
+                "loser_discord_id": c,
+                "win_gap": rng.randint(1, 8),
+                "total_rounds": rng.randint(5, 30),
+                "started_at": (t - timedelta(minutes=5)).isoformat(),
+                "finished_at": t.isoformat(),
+                "review_log": "블루아카이브 → 브로콜리 → 리본",
+                "participants": [
+                    {"discord_id": a, "side": 1, "is_winner": True},
+                    {"discord_id": c, "side": 2, "is_winner": False},
+                ],
+            }
+            _check(client.post("/bluewar/matches", json=payload))
+
+        b.run("ingest", ingest, repeat=max(repeat, 20))
+
+        payload = {
+            "users": {
+                did: {"wins": rng.randint(0, 50), "losses": rng.randint(0, 50), "name": None}
+                for did in all_users
+            }
+        }
+
+        def seed_import(_i: int) -> None:
+            db = SessionLocal()
+            try:
+                import_blue_records_base_stats(db, payload)
+                db.flush()
+            finally:
+                db.rollback()
+                db.close()
+
+        b.run("seed_import", seed_import, repeat=max(1, min(repeat, 3)))
+
+    return b.results
+
+
+def _check(r) -> None:
+    if r.status_code != 200:
+        raise RuntimeError(f"{r.request.method} {r.request.url.path} -> {r.status_code}")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """느려진 항목 이름 목록을 돌려주고, 비교 표를 출력한다."""
+    regressions: List[str] = []
+    base_results = baseline.get("results", {})
+    print(f"\n    {'case':<24} {'baseline':>11} {'now':>11} {'ratio':>7}")
+    for name, cur in current["results"].items():
+        old = base_results.get(name)
+        if not old or "median_ms" not in old or "median_ms" not in cur:
+            print(f"    {name:<24} {'-':>11} {cur.get('median_ms', float('nan')):>9.2f}ms {'-':>7}")
+            continue
+        ratio = cur["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  <-- slower"
+            regressions.append(name)
+        elif ratio < 1.0 - threshold:
+            flag = "  faster"
+        print(f"    {name:<24} {old['median_ms']:>9.2f}ms {cur['median_ms']:>9.2f}ms {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Yume Admin 마이크로 벤치마크")
+    p.add_argument("--db", default="/tmp/yume_bench.db", help="gen_bench_db.py 로 만든 DB")
+    p.add_argument("--work", default=None, help="복사본 경로 (기본: <db>.work)")
+    p.add_argument("--repeat", type=int, default=10)
+    p.add_argument("--warmup", type=int, default=2)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench_results/<시각>.json)")
+    p.add_argument("--baseline", default=None, help="비교할 기준 결과 JSON")
+    p.add_argument("--save-baseline", default=None, help="이번 결과를 기준으로 저장할 경로")
+    p.add_argument("--threshold", type=float, default=0.15, help="느려짐 판정 비율 (0.15 = 15%%)")
+    p.add_argument("--fail-on-regression", action="store_true")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"[!] DB 가 없어: {args.db} (먼저 scripts/gen_bench_db.py 실행)")
+        return 2
+
+    work = args.work or args.db + ".work"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(work + suffix):
+            os.remove(work + suffix)
+    src = sqlite3.connect(args.db)
+    dst = sqlite3.connect(work)
+    try:
+        src.backup(dst)  # WAL 에 남은 내용까지 일관된 복사본
+    finally:
+        dst.close()
+        src.close()
+
+    print(f"[*] bench on {work}")
+    info = _db_info(work)
+    print(f"[*] journal_mode={info['journal_mode']}")
+    if info["journal_mode"] != "delete":
+        print("[!] 운영(delete)과 다른 저널 모드. gen_bench_db.py 로 다시 만들면 delete 로 나온다")
+    results = run_suite(work, repeat=args.repeat, warmup=args.warmup, seed=args.seed)
+
+    doc = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "db": info,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+
+    out = Path(args.out) if args.out else ROOT / "bench_results" / (
+        datetime.utcnow().strftime("%Y%m%dT%H%M%S") + ".json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[*] results -> {out}")
+
+    if args.save_baseline:
+        bp = Path(args.save_baseline)
+        bp.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out, bp)
+        print(f"[*] baseline saved -> {bp}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("db") != info:
+            print("[!] 기준 결과와 DB 크기가 달라서 비교가 정확하지 않을 수 있어.")
+        regressions = compare(doc, baseline, args.threshold)
+        if regressions:
+            print(f"[!] slower than baseline: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+
+    failed = [name for name, r in results.items() if "error" in r]
+    if failed and args.fail_on_regression:
+        print(f"[!] failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,27 @@
+"""build_static.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+    python scripts/build_static.py
+
+app/static 아래 CSS/JS 의 .gz(.br) 사전 압축본을 만들고, fingerprint 매핑을 출력한다.
+(앱 시작 때도 같은 작업을 하지만, 배포 직후 한 번 돌려두면 첫 요청이 가볍다)
+"""
+
+from __future__ import annotations
+
+from app.assets import STATIC_DIR, AssetManifest, brotli, precompress
+
+
+def main() -> int:
+    made = precompress(STATIC_DIR)
+    manifest = AssetManifest(STATIC_DIR).build()
+    for logical, hashed in sorted(manifest.by_logical.items()):
+        print(f"    {logical} -> {hashed}")
+    print(f"[*] precompressed files written: {made} (brotli={'on' if brotli else 'off'})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,298 @@
+"""gen_bench_db.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+    python scripts/gen_bench_db.py --out /tmp/yume_bench.db --users 10000 --matches 500000 --seed 42
+
+벤치마크/부하 테스트용 합성 DB 를 만든다. (운영 DB 는 건드리지 않는다)
+같은 --seed / --end 면 항상 같은 내용이 나온다.
+
+분포:
+    - 유저 활동량은 멱법칙(소수의 헤비 유저가 판 수 대부분을 차지)
+    - 모드: pvp 80% / practice 20%,  상태: finished 95% / aborted 3% / running 2%
+    - 종료 시각: 최근 --days 일, KST 저녁(19~24시)에 몰리게
+    - 복기 로그: 한국어 단어 체인 ("블루아카이브 → 브로콜리 → 리본 ...")
+    - 미리 집계 테이블(상대 전적, 일별 롤업)까지 다시 만들어 둔다.
+
+저널 모드: 적재는 메모리 저널로 빠르게 하고, 파일은 --journal-mode(기본 delete = 운영과 같은
+롤백 저널)로 남긴다. journal_mode=WAL 은 파일에 남아서 복사본(bench/loadtest)까지 따라가므로
+운영과 다른 동시성(읽는 쪽이 쓰는 쪽을 안 막음)을 재게 된다. WAL 을 따로 재보고 싶을 때만 --journal-mode wal.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import head_to_head, models, player_totals, rollups, words
+from app.database import Base
+from app.schema import ensure_sqlite_schema
+
+BATCH = 5000
+
+# 닉네임/복기 로그에 쓰는 음절·단어
+_SYLLABLES = "가나다라마바사아자차카타파하유메시호미요노아리세나루코하루키모모레이소라린하나네코"
+_WORDS = [
+    "블루아카이브", "브로콜리", "리본", "본능", "능력", "역사", "사과", "과일", "일기", "기차",
+    "차표", "표범", "범선", "선물", "물감", "감자", "자전거", "거북이", "이야기", "기러기",
+    "기린", "인형", "형광펜", "펜싱", "싱크대", "대나무", "무지개", "개나리", "리듬", "음악",
+    "악어", "어항", "항구", "구름", "음료수", "수박", "박수", "수영", "영화", "화분",
+    "분필", "필통", "통조림", "임금", "금붕어", "어부", "부엉이", "이불", "불꽃", "꽃병",
+    "병아리", "리코더", "더위", "위성", "성냥", "양말", "말씨", "씨앗", "앗싸", "싸움",
+    "움직임", "임무", "무대", "대학교", "교실", "실내화", "화요일", "일요일", "일출", "출구",
+]
+_AI_NAMES = ["유메봇", "쉬움", "보통", "어려움", "지옥"]
+_NOTES = [None] * 18 + ["재경기", "연결 끊김", "이벤트전", "연습"]
+
+
+def _nickname(rng: random.Random) -> str:
+    n = rng.randint(2, 4)
+    return "".join(rng.choice(_SYLLABLES) for _ in range(n))
+
+
+def _review_log(rng: random.Random) -> str:
+    n = rng.randint(3, 25)
+    return " → ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _kst_evening_offset(rng: random.Random) -> timedelta:
+    """하루 안의 UTC 시각 오프셋. KST 19~24시에 60% 몰리게."""
+    if rng.random() < 0.6:
+        kst_hour = rng.randint(19, 23)
+    else:
+        kst_hour = rng.randint(0, 23)
+    utc_hour = (kst_hour - 9) % 24
+    return timedelta(hours=utc_hour, minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+
+
+def _ts(dt: datetime) -> str:
+    # SQLAlchemy(SQLite DateTime) 가 저장하는 형식과 맞춘다.
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _cumulative_weights(n: int, alpha: float) -> List[float]:
+    out: List[float] = []
+    acc = 0.0
+    for rank in range(1, n + 1):
+        acc += 1.0 / (rank ** alpha)
+        out.append(acc)
+    return out
+
+
+def generate(
+    path: str,
+    *,
+    users: int,
+    matches: int,
+    seed: int,
+    end: datetime,
+    days: int,
+    alpha: float = 1.05,
+    quiet: bool = False,
+    journal_mode: str = "delete",
+) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+    for suffix in ("-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    ensure_sqlite_schema(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+
+    con = sqlite3.connect(path)
+    # 적재 중에만 메모리 저널 (파일에 남지 않는다 - WAL 과 달리)
+    con.execute("PRAGMA journal_mode=MEMORY")
+    con.execute("PRAGMA synchronous=OFF")
+    cur = con.cursor()
+
+    # 1) users
+    created = end - timedelta(days=days + 30)
+    ids = [str(100000000000000000 + seed * 1000003 + i * 7919) for i in range(users)]
+    rng.shuffle(ids)
+    user_rows = []
+    for i, did in enumerate(ids):
+        nick = _nickname(rng) if rng.random() < 0.9 else None
+        user_rows.append(
+            (did, nick, None, rng.randint(0, 40), rng.randint(0, 40), _ts(created), _ts(created))
+        )
+    cur.executemany(
+        "INSERT INTO users (discord_id, nickname, note, base_wins, base_losses, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        user_rows,
+    )
+    user_pk = {did: i + 1 for i, did in enumerate(ids)}
+    con.commit()
+
+    # 2) matches + participants
+    cum = _cumulative_weights(users, alpha)
+    start_day = end - timedelta(days=days)
+    match_rows: List[Tuple] = []
+    part_rows: List[Tuple] = []
+    match_id = 0
+
+    def flush() -> None:
+        cur.executemany(
+            "INSERT INTO bluewar_matches (id, mode, status, starter_discord_id, winner_discord_id, "
+            "loser_discord_id, win_gap, total_rounds, started_at, finished_at, note, review_log, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            match_rows,
+        )
+        cur.executemany(
+            "INSERT INTO bluewar_participants (match_id, user_id, discord_id, name, ai_name, side, "
+            "is_winner, score, turns, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            part_rows,
+        )
+        con.commit()
+        match_rows.clear()
+        part_rows.clear()
+
+    # 시간순으로 쌓이도록 날짜를 정렬해서 만든다 (id 순서 == 시간 순서)
+    day_offsets = sorted(rng.random() * days for _ in range(matches))
+    for off in day_offsets:
+        match_id += 1
+        day = start_day + timedelta(days=int(off))
+        finished = day.replace(hour=0, minute=0, second=0, microsecond=0) + _kst_evening_offset(rng)
+        rounds = rng.randint(5, 40)
+        started = finished - timedelta(seconds=rounds * rng.randint(10, 40))
+
+        mode = "pvp" if rng.random() < 0.8 else "practice"
+        r = rng.random()
+        status = "finished" if r < 0.95 else ("aborted" if r < 0.98 else "running")
+
+        a = rng.choices(ids, cum_weights=cum)[0]
+        if mode == "pvp":
+            b = a
+            while b == a:
+                b = rng.choices(ids, cum_weights=cum)[0]
+        else:
+            b = None
+
+        gap = min(10, int(rng.expovariate(0.45)) + 1)
+        winner: Optional[str] = None
+        loser: Optional[str] = None
+        a_wins = rng.random() < 0.5
+        if status == "finished":
+            if mode == "pvp":
+                winner, loser = (a, b) if a_wins else (b, a)
+            elif a_wins:
+                winner = a
+        else:
+            gap = None  # type: ignore[assignment]
+
+        match_rows.append(
+            (
+                match_id, mode, status, a, winner, loser, gap, rounds,
+                _ts(started), _ts(finished), rng.choice(_NOTES),
+                _review_log(rng) if status == "finished" else None,
+                _ts(finished),
+            )
+        )
+        part_rows.append(
+            (match_id, user_pk[a], a, None, None, 1, winner == a, None, rounds // 2, _ts(finished))
+        )
+        if b is not None:
+            part_rows.append(
+                (match_id, user_pk[b], b, None, None, 2, winner == b, None, rounds // 2, _ts(finished))
+            )
+        else:
+            part_rows.append(
+                (match_id, None, None, None, rng.choice(_AI_NAMES), 2, False, None, rounds // 2, _ts(finished))
+            )
+
+        if len(match_rows) >= BATCH:
+            flush()
+            if not quiet and match_id % (BATCH * 20) == 0:
+                print(f"    {match_id}/{matches} matches ...")
+    if match_rows:
+        flush()
+    con.close()
+
+    # 3) 미리 집계 테이블 + startup 백필이 다시 돌지 않도록 app_meta 표시
+    engine = create_engine(f"sqlite:///{path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        head_to_head.rebuild(db)
+        player_totals.rebuild(db)
+        rollups.rebuild(db)
+        words.rebuild(db)
+        for key in (
+            head_to_head.BACKFILL_META_KEY,
+            player_totals.BACKFILL_META_KEY,
+            rollups.BACKFILL_META_KEY,
+            words.BACKFILL_META_KEY,
+        ):
+            db.merge(models.AppMeta(key=key, value="done"))
+        db.commit()
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+    engine.dispose()
+
+    # 파일에 남는 저널 모드를 정한다(기본 delete = 운영과 같은 롤백 저널).
+    con = sqlite3.connect(path)
+    try:
+        mode = con.execute(f"PRAGMA journal_mode={journal_mode}").fetchone()[0]
+    finally:
+        con.close()
+
+    if not quiet:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(
+            f"[*] {path}: {users} users, {matches} matches, {size_mb:.1f}MB, "
+            f"journal_mode={mode}, {time.perf_counter() - t0:.1f}s"
+        )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="벤치마크용 합성 SQLite DB 생성")
+    p.add_argument("--out", default="/tmp/yume_bench.db")
+    p.add_argument("--users", type=int, default=10000)
+    p.add_argument("--matches", type=int, default=500000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--end", default="2026-01-01", help="마지막 날짜(UTC, YYYY-MM-DD). 결과 재현용으로 고정")
+    p.add_argument(
+        "--journal-mode",
+        default="delete",
+        choices=("delete", "wal", "truncate"),
+        help="만든 파일의 저널 모드 (기본 delete = 운영과 같음)",
+    )
+    p.add_argument("--quiet", action="store_true")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    end = datetime.strptime(args.end, "%Y-%m-%d")
+    generate(
+        args.out,
+        users=args.users,
+        matches=args.matches,
+        seed=args.seed,
+        end=end,
+        days=args.days,
+        quiet=args.quiet,
+        journal_mode=args.journal_mode,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,361 @@
+"""loadtest.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+
+    # 1) 앱을 같은 프로세스에 띄워서 (합성 DB 복사본 사용)
+    python scripts/loadtest.py --db /tmp/yume_bench.db --members 8 --bots 2 --duration 20
+
+    # 2) 로컬에 띄운 uvicorn 에 붙어서
+    YUME_DATABASE_URL=sqlite:////tmp/yume_bench.db YUME_RATE_LIMIT=0 uvicorn app.main:app --port 8002 &
+    python scripts/loadtest.py --url http://127.0.0.1:8002 --token "$YUME_API_TOKEN" --members 8 --bots 2
+
+    # 3) 동시 접속을 단계별로 올려 가며 어디서 무너지는지 보기
+    python scripts/loadtest.py --db /tmp/yume_bench.db --steps 1,2,4,8,16,32 --bots 2 --duration 15
+
+시나리오:
+    - member : 회원 로그인 세션으로 /bluewar/matches/ → /ranking/ → 매치 상세 → 플레이어 화면 반복
+    - bot    : 봇처럼 POST /bluewar/matches (X-API-Token) 를 --bot-interval 초마다
+
+단계마다 시나리오/엔드포인트별 처리량(req/s), p50/p95/p99, 오류 수,
+SQLite 잠금 오류("database is locked") 수를 출력한다. --out 으로 JSON 저장.
+
+in-process 모드에서는 앱 예외를 그대로 받아서 잠금 오류를 구분한다.
+--url 모드에서는 5xx 만 보이므로 잠금 여부는 서버 로그(journalctl)에서 확인할 것.
+--url 모드에서는 서버를 YUME_RATE_LIMIT=0 으로 띄울 것. 세션이 전부 한 IP/한 계정이라
+요청 수 제한(app/ratelimit.py)에 걸려 429 만 세게 된다. in-process 모드는 스스로 끈다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LOGIN_ID = "시호"
+LOGIN_PW = "miyo"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+class Recorder:
+    """(시나리오, 엔드포인트) 별 응답 시간/오류. 이벤트 루프 하나에서만 쓰므로 락 없음."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[Tuple[str, str], List[float]] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.locked: Dict[Tuple[str, str], int] = {}
+        self.samples: Dict[str, str] = {}
+
+    def ok(self, scenario: str, name: str, seconds: float) -> None:
+        self.latencies.setdefault((scenario, name), []).append(seconds)
+
+    def fail(self, scenario: str, name: str, seconds: float, detail: str) -> None:
+        key = (scenario, name)
+        self.latencies.setdefault(key, []).append(seconds)
+        self.errors[key] = self.errors.get(key, 0) + 1
+        if "database is locked" in detail or "database table is locked" in detail:
+            self.locked[key] = self.locked.get(key, 0) + 1
+        self.samples.setdefault(f"{scenario} {name}", detail[:300])
+
+    def report(self, elapsed: float) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for (scenario, name), lat in sorted(self.latencies.items()):
+            ms = [x * 1000.0 for x in lat]
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "endpoint": name,
+                    "requests": len(ms),
+                    "rps": len(ms) / elapsed if elapsed else 0.0,
+                    "p50_ms": _percentile(ms, 50),
+                    "p95_ms": _percentile(ms, 95),
+                    "p99_ms": _percentile(ms, 99),
+                    "errors": self.errors.get((scenario, name), 0),
+                    "locked": self.locked.get((scenario, name), 0),
+                }
+            )
+        return rows
+
+
+async def _timed(rec: Recorder, scenario: str, name: str, coro, expect=(200,)) -> Optional[httpx.Response]:
+    t0 = time.perf_counter()
+    try:
+        r = await coro
+    except Exception as exc:  # in-process 모드: 앱 예외가 그대로 올라온다
+        rec.fail(scenario, name, time.perf_counter() - t0, f"{type(exc).__name__}: {exc}")
+        return None
+    dt = time.perf_counter() - t0
+    if r.status_code in expect:
+        rec.ok(scenario, name, dt)
+    else:
+        rec.fail(scenario, name, dt, f"HTTP {r.status_code}: {r.text[:200]}")
+    return r
+
+
+async def member_user(
+    make_client, rec: Recorder, stop_at: float, match_ids: List[int], player_ids: List[str], seed: int
+) -> None:
+    rng = random.Random(seed)
+    async with make_client() as c:
+        r = await _timed(
+            rec,
+            "member",
+            "POST /member/login",
+            c.post("/member/login", data={"discord_id": LOGIN_ID, "password": LOGIN_PW}),
+            expect=(302, 303),
+        )
+        if r is None or r.status_code not in (302, 303):
+            return
+        while time.perf_counter() < stop_at:
+            await _timed(rec, "member", "GET /bluewar/matches/", c.get("/bluewar/matches/"))
+            await _timed(rec, "member", "GET /ranking/", c.get(f"/ranking/?mode={rng.choice(['pvp', 'pvp', 'all'])}"))
+            if match_ids:
+                mid = rng.choice(match_ids)
+                await _timed(rec, "member", "GET /bluewar/matches/{match_id}", c.get(f"/bluewar/matches/{mid}"))
+            if player_ids:
+                pid = rng.choice(player_ids)
+                await _timed(rec, "member", "GET /bluewar/players/{discord_id}", c.get(f"/bluewar/players/{pid}"))
+
+
+async def bot_user(
+    make_client, rec: Recorder, stop_at: float, player_ids: List[str], token: Optional[str], interval: float, seed: int
+) -> None:
+    rng = random.Random(seed)
+    headers = {"X-API-Token": token} if token else {}
+    pool = player_ids if len(player_ids) >= 2 else ["100000000000000001", "100000000000000002"]
+    async with make_client() as c:
+        while time.perf_counter() < stop_at:
+            a, b = rng.sample(pool, 2)
+            now = datetime.utcnow()
+            payload = {
+                "mode": "pvp",
+                "status": "finished",
+                "starter_discord_id": a,
+                "winner_discord_id": a,
+                "loser_discord_id": b,
+                "win_gap": rng.randint(1, 8),
+                "total_rounds": rng.randint(5, 30),
+                "started_at": (now - timedelta(minutes=5)).isoformat(),
+                "finished_at": now.isoformat(),
+                "review_log": "블루아카이브 → 브로콜리 → 리본 → 본능",
+                "participants": [
+                    {"discord_id": a, "side": 1, "is_winner": True},
+                    {"discord_id": b, "side": 2, "is_winner": False},
+                ],
+            }
+            await _timed(rec, "bot", "POST /bluewar/matches", c.post("/bluewar/matches", json=payload, headers=headers))
+            if interval > 0:
+                await asyncio.sleep(interval * (0.5 + rng.random()))
+
+
+async def run_step(
+    make_client, *, members: int, bots: int, duration: float, token: Optional[str],
+    bot_interval: float, match_ids: List[int], player_ids: List[str], seed: int,
+) -> Dict[str, Any]:
+    rec = Recorder()
+    t0 = time.perf_counter()
+    stop_at = t0 + duration
+    tasks = [
+        member_user(make_client, rec, stop_at, match_ids, player_ids, seed * 1000 + i)
+        for i in range(members)
+    ]
+    tasks += [
+        bot_user(make_client, rec, stop_at, player_ids, token, bot_interval, seed * 1000 + 500 + i)
+        for i in range(bots)
+    ]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    rows = rec.report(elapsed)
+    return {
+        "members": members,
+        "bots": bots,
+        "elapsed_s": elapsed,
+        "total_rps": sum(r["requests"] for r in rows) / elapsed if elapsed else 0.0,
+        "errors": sum(r["errors"] for r in rows),
+        "locked": sum(r["locked"] for r in rows),
+        "endpoints": rows,
+        "error_samples": rec.samples,
+    }
+
+
+def print_step(step: Dict[str, Any]) -> None:
+    print(
+        f"\n[*] members={step['members']} bots={step['bots']}  "
+        f"{step['total_rps']:.1f} req/s  errors={step['errors']}  locked={step['locked']}"
+    )
+    print(f"    {'scenario':<7} {'endpoint':<34} {'req':>6} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5} {'lock':>5}")
+    for r in step["endpoints"]:
+        print(
+            f"    {r['scenario']:<7} {r['endpoint']:<34} {r['requests']:>6} {r['rps']:>7.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>5} {r['locked']:>5}"
+        )
+    for k, v in list(step["error_samples"].items())[:5]:
+        print(f"    ! {k}: {v}")
+
+
+def _copy_db(src_path: str, dst_path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(dst_path + suffix):
+            os.remove(dst_path + suffix)
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _journal_mode(db_path: str) -> str:
+    """복사본의 저널 모드. 운영은 delete(롤백 저널)라 다르면 잠금 동작이 달라진다."""
+    con = sqlite3.connect(db_path)
+    try:
+        return str(con.execute("PRAGMA journal_mode").fetchone()[0]).lower()
+    finally:
+        con.close()
+
+
+def print_journal_mode(db_path: str) -> str:
+    mode = _journal_mode(db_path)
+    print(f"[*] journal_mode={mode}")
+    if mode != "delete":
+        print("[!] 운영(delete)과 다른 저널 모드. gen_bench_db.py 로 다시 만들면 delete 로 나온다")
+    return mode
+
+
+def _targets(db_path: str, seed: int) -> Tuple[List[int], List[str]]:
+    con = sqlite3.connect(db_path)
+    try:
+        max_id = con.execute("SELECT max(id) FROM bluewar_matches").fetchone()[0] or 0
+        players = [
+            r[0]
+            for r in con.execute(
+                "SELECT discord_id FROM bluewar_participants WHERE discord_id IS NOT NULL "
+                "GROUP BY discord_id ORDER BY count(*) DESC LIMIT 200"
+            )
+        ]
+    finally:
+        con.close()
+    rng = random.Random(seed)
+    match_ids = [rng.randint(1, max_id) for _ in range(500)] if max_id else []
+    return match_ids, players
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Yume Admin HTTP 부하 테스트")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="in-process 모드: 이 DB 의 복사본으로 앱을 띄운다")
+    target.add_argument("--url", help="외부 서버 주소 (예: http://127.0.0.1:8002)")
+    p.add_argument("--target-db", default=None, help="--url 모드에서 매치/플레이어 ID 를 뽑을 DB 파일 (선택)")
+    p.add_argument("--work", default=None, help="in-process 복사본 경로 (기본: <db>.load)")
+    p.add_argument("--token", default=os.getenv("YUME_API_TOKEN"), help="봇 업로드 토큰 (X-API-Token)")
+    p.add_argument("--members", type=int, default=4, help="동시 회원 세션 수")
+    p.add_argument("--steps", default=None, help="회원 세션 수를 단계별로: 1,2,4,8")
+    p.add_argument("--bots", type=int, default=1, help="동시 봇 업로드 수")
+    p.add_argument("--bot-interval", type=float, default=0.5, help="봇 업로드 간격(초, 평균)")
+    p.add_argument("--duration", type=float, default=20.0, help="단계별 시간(초)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    return p.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    steps = [int(x) for x in args.steps.split(",")] if args.steps else [args.members]
+
+    if args.db:
+        work = args.work or args.db + ".load"
+        _copy_db(args.db, work)
+        # 앱은 import 시점에 DB 엔진을 만들므로 환경변수를 먼저 넣는다.
+        os.environ["YUME_DATABASE_URL"] = f"sqlite:///{work}"
+        # 모든 세션이 한 IP/한 계정으로 로그인하므로 요청 수 제한은 끈다.
+        os.environ["YUME_RATE_LIMIT"] = "0"
+        if args.token:
+            os.environ["YUME_API_TOKEN"] = args.token
+        sys.path.insert(0, str(ROOT))
+        from app.main import app
+
+        match_ids, player_ids = _targets(work, args.seed)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+        startup = app.router.lifespan_context(app)
+        await startup.__aenter__()
+        print(f"[*] in-process on {work}")
+        journal_mode = print_journal_mode(work)
+    else:
+        transport = None
+        base_url = args.url.rstrip("/")
+        match_ids, player_ids = _targets(args.target_db, args.seed) if args.target_db else ([], [])
+        startup = None
+        print(f"[*] target {base_url}")
+        journal_mode = print_journal_mode(args.target_db) if args.target_db else None
+
+    def make_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=transport,
+            base_url=base_url,
+            timeout=60.0,
+            follow_redirects=False,
+        )
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for members in steps:
+            step = await run_step(
+                make_client,
+                members=members,
+                bots=args.bots,
+                duration=args.duration,
+                token=args.token,
+                bot_interval=args.bot_interval,
+                match_ids=match_ids,
+                player_ids=player_ids,
+                seed=args.seed,
+            )
+            print_step(step)
+            results.append(step)
+    finally:
+        if startup is not None:
+            await startup.__aexit__(None, None, None)
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        doc = {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": "in-process" if args.db else "url",
+            "journal_mode": journal_mode,
+            "steps": results,
+        }
+        out.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n[*] results -> {out}")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    return asyncio.run(_main(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,55 @@
+"""rebuild_aggregates.py
+
+사용법:
+    cd /opt/yume-web
+    source venv/bin/activate
+    python scripts/rebuild_aggregates.py
+
+bluewar_matches 전체 기록으로 미리 집계해 둔 테이블을 다시 만든다.
+(평소에는 create_match 에서 한 판씩 갱신되므로, 수동으로 DB 를 고쳤을 때만 필요)
+
+    - bluewar_head_to_head : 상대 전적
+    - bluewar_player_totals : 플레이어별 전체 기간 랭킹 합계
+    - bluewar_daily_stats / bluewar_daily_players / bluewar_hourly_stats : 대시보드 일별 롤업
+    - bluewar_archived_players : 아카이브로 옮긴 매치의 플레이어별 합계
+    - bluewar_word_uses / bluewar_word_stats : 복기 로그 단어 역색인 + 단어 통계
+
+아카이브 파일(YUME_ARCHIVE_DIR)이 있으면 메인 + 아카이브 기록을 모두 합쳐서 만든다.
+"""
+
+from __future__ import annotations
+
+from config import settings
+from app.database import Base, engine
+from app.schema import ensure_sqlite_schema
+from app import archive, generations, head_to_head, player_totals, rollups, words
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+    ensure_sqlite_schema(engine)
+    n = archive.rebuild_players(engine, settings.ARCHIVE_DIR)
+    print(f"[*] bluewar_archived_players rebuilt: {n} rows")
+    with archive.all_tiers(engine, settings.ARCHIVE_DIR) as db:
+        try:
+            n = head_to_head.rebuild(db)
+            db.commit()
+            print(f"[*] bluewar_head_to_head rebuilt: {n} rows")
+            n = player_totals.rebuild(db)
+            db.commit()
+            print(f"[*] bluewar_player_totals rebuilt: {n} rows")
+            n = rollups.rebuild(db)
+            w = words.rebuild(db)
+            # 집계가 바뀌었으니 워커 캐시/ETag 도 다시 만들게 한다.
+            generations.bump(db, generations.MATCHES)
+            db.commit()
+            print(f"[*] bluewar_daily_stats rebuilt: {n} rows")
+            print(f"[*] bluewar_word_uses rebuilt: {w} rows")
+        except Exception:
+            db.rollback()
+            raise
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""
+라우트별 SQL 쿼리 수 상한 (app/sqlstats.py 의 assert_max_queries).
+
+작은 합성 DB(scripts/gen_bench_db.py)로 앱을 띄워서 고쳐둔 화면들의 쿼리 수가
+다시 늘어나면(N+1 회귀) 테스트가 깨지게 한다. 상한은 지금 값 + 약간의 여유.
+
+    python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 라우트 템플릿 → 쿼리 수 상한
+# (지금: 상세 3 / 랭킹 7 / 목록 6. 상세는 p.user lazy load 가 하나만 생겨도 걸리게 딱 맞게)
+BUDGETS = {
+    "/bluewar/matches/{match_id}": 3,   # 매치 + 참가자(joinedload user) + 닉네임 없는 유저 IN
+    "/ranking/": 8,                     # 워터마크 + 시즌 + 플레이어 합계 + 유저 이름 + 대체 이름
+    "/bluewar/matches/": 7,             # 워터마크 + 목록 1페이지 + 참가자 IN 1번
+}
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("yume") / "budget.db"
+    # 앱은 import 시점에 settings/엔진을 만들므로 환경변수를 먼저 넣는다(gen_bench_db 도 app 을 import 한다).
+    os.environ["YUME_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["YUME_SQL_STATS"] = "1"
+    os.environ["YUME_RATE_LIMIT"] = "0"
+    os.environ["YUME_MAINTENANCE"] = "0"
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(ROOT / "scripts"))
+    import gen_bench_db
+
+    gen_bench_db.generate(
+        str(db_path), users=200, matches=2000, seed=3, end=datetime.utcnow(), days=60, quiet=True
+    )
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as c:
+        r = c.post("/auth/login", data={"username": "시호", "password": "miyo"}, follow_redirects=False)
+        assert r.status_code == 303
+        yield c
+
+
+@pytest.fixture(scope="module")
+def pvp_match_id(client):
+    """유저가 연결된 참가자가 둘인 매치 (p.user lazy load 가 생기면 쿼리가 늘어나는 판)."""
+    from app.database import SessionLocal
+    from app import models
+
+    P = models.BlueWarParticipant
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(P.match_id)
+            .filter(P.user_id.isnot(None))
+            .group_by(P.match_id)
+            .having(func.count() >= 2)
+            .order_by(P.match_id.desc())
+            .first()
+        )
+    finally:
+        db.close()
+    assert row is not None
+    return row[0]
+
+
+def test_match_detail_budget(client, pvp_match_id):
+    from app.sqlstats import assert_max_queries
+
+    route = "/bluewar/matches/{match_id}"
+    with assert_max_queries(BUDGETS[route], route=route) as log:
+        r = client.get(f"/bluewar/matches/{pvp_match_id}")
+    assert r.status_code == 200
+    assert log.count(route) > 0
+
+
+@pytest.mark.parametrize(
+    "path, route",
+    [
+        ("/ranking/", "/ranking/"),
+        ("/ranking/?mode=all", "/ranking/"),
+        ("/bluewar/matches/", "/bluewar/matches/"),
+        ("/bluewar/matches/?mode=pvp&page=3", "/bluewar/matches/"),
+    ],
+)
+def test_query_budget(client, path, route):
+    from app.sqlstats import assert_max_queries
+
+    with assert_max_queries(BUDGETS[route], route=route) as log:
+        r = client.get(path)
+    assert r.status_code == 200
+    # 라우트 라벨이 안 맞아서 0개로 통과하는 일이 없게
+    assert log.count(route) > 0